@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import levels
+import simulation
+
+# Each worker process builds its level once and reuses it for every run it is sent
+_worker = None
+
+class Evaluator:
+    def __init__(self, level, physics_changes=None, swept=False, coarse=1):
+        layout = getattr(levels, level)
+        physics = layout['physics']
+        if physics_changes:
+            physics = physics.replace(**physics_changes)
+        if coarse != 1:
+            physics = physics.coarse(coarse)
+        self.simulation = simulation.Simulation(simulation.Course(layout), physics, swept=swept)
+
+    def evaluate(self, jump_ticks):
+        sim = self.simulation
+        sim.reset()
+        sim.run(jump_ticks)
+        return {
+            'outcome': sim.outcome,
+            'distance': sim.distance_traveled,
+            'score': sim.score,
+            'stars': simulation.stars_collected(sim.path),
+            'ticks': sim.ticks,
+        }
+
+def _init_worker(level, physics_changes, swept, coarse):
+    global _worker
+    _worker = Evaluator(level, physics_changes, swept, coarse)
+
+def _run_chunk(chunk):
+    return [(index, _worker.evaluate(jump_ticks)) for index, jump_ticks in chunk]
+
+def _chunks(sequences, size):
+    chunk = []
+    for index, jump_ticks in enumerate(sequences):
+        chunk.append((index, jump_ticks))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_batch(level, sequences, physics_changes=None, swept=False, coarse=1, workers=None, chunk_size=64):
+    # Evaluate jump-tick sequences on every core, yielding (index, result) as runs finish.
+    # Sequences may be a lazy iterable; only a few chunks per worker are in flight at once.
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(sequences, chunk_size)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(level, physics_changes, swept, coarse)) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_run_chunk, chunk))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+def random_sequences(count, level, seed=0, jump_rate=0.02, coarse=1):
+    # Random policies: press jump on each tick with probability jump_rate
+    physics = getattr(levels, level)['physics']
+    ticks = int((physics.finish_x - physics.start_x) / physics.horizontal_speed / coarse) + 2
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield [tick for tick in range(ticks) if rng.random() < jump_rate]
+
+def read_sequences(filename):
+    # One sequence per line: jump ticks separated by spaces or commas
+    with open(filename, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield [int(tick) for tick in line.replace(',', ' ').split()]
+
+def _physics_change(text):
+    name, value = text.split('=', 1)
+    return name, float(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate many jump sequences on a level in parallel.")
+    parser.add_argument('level', choices=levels.level_names())
+    parser.add_argument('--sequences', help="file with one sequence of jump ticks per line")
+    parser.add_argument('--random', type=int, default=0, help="number of random policies to run")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jump-rate', type=float, default=0.02)
+    parser.add_argument('--set', action='append', type=_physics_change, default=[], metavar='NAME=VALUE',
+                        help="override a physics constant, e.g. jump_velocity=0.12")
+    parser.add_argument('--swept', action='store_true',
+                        help="also catch obstacles passed through within a tick; same results at the live speed")
+    parser.add_argument('--coarse', type=int, default=1,
+                        help="tick length multiplier (use with --swept); results approximate the game's")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--quiet', action='store_true', help="only print the summary")
+    args = parser.parse_args(argv)
+    if args.coarse != 1:
+        # Jumps integrate over longer ticks and contacts are tested less often, so a run can
+        # end differently than the same inputs in the game
+        print(f"warning: --coarse {args.coarse} results are not game-equivalent; confirm wins at --coarse 1",
+              file=sys.stderr)
+
+    if args.sequences:
+        sequences = read_sequences(args.sequences)
+    else:
+        sequences = random_sequences(args.random or 1000, args.level, args.seed, args.jump_rate, args.coarse)
+
+    start = time.perf_counter()
+    runs = wins = 0
+    best = None
+    for index, result in run_batch(args.level, sequences, dict(args.set), args.swept, args.coarse, args.workers):
+        runs += 1
+        wins += result['outcome'] == simulation.GAME_WON
+        if best is None or (result['outcome'] == simulation.GAME_WON, result['distance']) > \
+                (best[1]['outcome'] == simulation.GAME_WON, best[1]['distance']):
+            best = (index, result)
+        if not args.quiet:
+            print(json.dumps(dict(result, index=index)), flush=True)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.level}: {wins}/{runs} runs won in {elapsed:.2f} s ({runs / elapsed:.0f} runs/s)", file=sys.stderr)
+    if best is not None:
+        print(f"best run #{best[0]}: {best[1]['outcome']}, distance {best[1]['distance']:.2f}, "
+              f"{best[1]['stars']} stars", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
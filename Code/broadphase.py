@@ -0,0 +1,93 @@
+import bisect
+import itertools
+import math
+
+class SweepIndex:
+    # Obstacles sorted by the start of their x-extent. The ball only ever moves forward,
+    # so a pair of cursors walks the list once per run and each query only touches the
+    # obstacles overlapping the ball's x-window.
+    def __init__(self, items):
+        entries = sorted(enumerate(items), key=lambda entry: entry[1].x_extent()[0])
+        self.items = [item for order, item in entries]
+        self.count = len(self.items)
+        self.order = [order for order, item in entries]  # Position in the level's obstacle list
+        self.min_x = [item.x_extent()[0] for item in self.items]
+        self.max_x = [item.x_extent()[1] for item in self.items]
+        self.max_width = max((hi - lo for lo, hi in zip(self.min_x, self.max_x)), default=0.0)
+        self.start = 0  # First entry that may still overlap the window
+        self.end = 0  # First entry starting past the window
+        self.last_lo = None
+
+    def seek(self, lo, hi):
+        # Interval lookup for resets and jumps backwards
+        self.start = bisect.bisect_left(self.min_x, lo - self.max_width)
+        self.end = bisect.bisect_right(self.min_x, hi)
+        self.start_x = self.bound(self.start)
+        self.end_x = self.bound(self.end)
+        self.last_lo = lo
+
+    def bound(self, i):
+        # Start of entry i's x-extent, read once per cursor step
+        return self.min_x[i] if i < self.count else math.inf
+
+    def window(self, lo, hi):
+        # Advance the cursors and return the sorted range [start, end) that may overlap [lo, hi]
+        if self.last_lo is None or lo < self.last_lo:
+            self.seek(lo, hi)
+        else:
+            floor = lo - self.max_width
+            while self.start_x < floor:
+                self.start += 1
+                self.start_x = self.bound(self.start)
+            while self.end_x <= hi:
+                self.end += 1
+                self.end_x = self.bound(self.end)
+            self.last_lo = lo
+        return self.start, self.end
+
+    def query(self, lo, hi):
+        start, end = self.window(lo, hi)
+        nearby = [i for i in range(start, end) if self.max_x[i] >= lo]
+        if len(nearby) > 1:
+            # Keep the level's order so "first hit wins" rules match a full scan
+            nearby.sort(key=self.order.__getitem__)
+        return [self.items[i] for i in nearby]
+
+class TableIndex(SweepIndex):
+    # A SweepIndex over an obstacle_store table, whose rows are already in this order. The
+    # bounds are computed from its columns as read and queries make views of just the rows
+    # they return.
+    def __init__(self, table):
+        self.items = table
+        self.count = len(table)
+        self.order = table.memory['order']
+        self.min_x = table.starts
+        self.max_x = table.ends
+        x = table.columns['x'].astype(float)
+        extent = table.columns[table.view_class.extent_field].astype(float)
+        widths = (x + extent) - (x - extent)  # The same sums the bounds give, rounding and all
+        self.max_width = widths.max().item() if len(widths) else 0.0
+        self.start = 0
+        self.end = 0
+        self.last_lo = None
+
+class SlabIndex:
+    # Objects sorted by the start of their x-extent, for drawing. Whatever overlaps an x range
+    # is then one contiguous run of that order, so a category baked or instanced in this
+    # order still draws with a single call however much of it is culled.
+    def __init__(self, extents):
+        self.order = sorted(range(len(extents)), key=lambda i: extents[i][0])
+        self.min_x = [extents[i][0] for i in self.order]
+        # Furthest x reached by any entry so far, which only grows along the order
+        self.reach = list(itertools.accumulate((extents[i][1] for i in self.order), max))
+
+    def __len__(self):
+        return len(self.order)
+
+    def window(self, slab):
+        # The run [start, end) of the order that may overlap slab = (lo, hi); empty for None
+        if slab is None:
+            return 0, 0
+        lo, hi = slab
+        start = bisect.bisect_left(self.reach, lo)
+        return start, max(start, bisect.bisect_right(self.min_x, hi))
@@ -0,0 +1,107 @@
+import math
+
+# Time-of-impact tests for a point moving along the segment p0 -> p1 during one tick.
+# Each returns the first t in [0, 1] at which the point is inside the shape, or None.
+# Shapes are already grown by the ball radius where the discrete tests include it.
+
+def segment_box_toi(p0, p1, lo, hi):
+    t_enter = 0.0
+    t_exit = 1.0
+    for axis in range(3):
+        start = p0[axis]
+        delta = p1[axis] - start
+        if delta == 0.0:
+            if not lo[axis] < start < hi[axis]:
+                return None
+            continue
+        t0 = (lo[axis] - start) / delta
+        t1 = (hi[axis] - start) / delta
+        if t0 > t1:
+            t0, t1 = t1, t0
+        t_enter = max(t_enter, t0)
+        t_exit = min(t_exit, t1)
+        if t_enter >= t_exit:
+            return None
+    return t_enter
+
+def _circle_interval(p0, p1, center_x, center_z, radius):
+    # Range of t where the segment's xz projection is inside the circle
+    dx = p0[0] - center_x
+    dz = p0[2] - center_z
+    ux = p1[0] - p0[0]
+    uz = p1[2] - p0[2]
+    a = ux * ux + uz * uz
+    c = dx * dx + dz * dz - radius * radius
+    if a == 0.0:
+        return (0.0, 1.0) if c < 0.0 else None
+    b = 2.0 * (dx * ux + dz * uz)
+    disc = b * b - 4.0 * a * c
+    if disc <= 0.0:
+        return None
+    root = math.sqrt(disc)
+    return (-b - root) / (2.0 * a), (-b + root) / (2.0 * a)
+
+def _y_interval(p0, p1, y_lo, y_hi):
+    # Range of t where the segment's y is strictly between y_lo and y_hi
+    start = p0[1]
+    delta = p1[1] - start
+    if delta == 0.0:
+        return (-math.inf, math.inf) if y_lo < start < y_hi else None
+    t0 = (y_lo - start) / delta
+    t1 = (y_hi - start) / delta
+    return (t0, t1) if t0 < t1 else (t1, t0)
+
+def segment_cylinder_toi(p0, p1, center_x, center_z, radius, y_lo, y_hi):
+    circle = _circle_interval(p0, p1, center_x, center_z, radius)
+    if circle is None:
+        return None
+    span = _y_interval(p0, p1, y_lo, y_hi)
+    if span is None:
+        return None
+    t_enter = max(0.0, circle[0], span[0])
+    t_exit = min(1.0, circle[1], span[1])
+    return t_enter if t_enter < t_exit else None
+
+def segment_sphere_toi(p0, p1, center, radius):
+    d = [p0[axis] - center[axis] for axis in range(3)]
+    u = [p1[axis] - p0[axis] for axis in range(3)]
+    c = d[0] * d[0] + d[1] * d[1] + d[2] * d[2] - radius * radius
+    if c < 0.0:
+        return 0.0
+    a = u[0] * u[0] + u[1] * u[1] + u[2] * u[2]
+    if a == 0.0:
+        return None
+    b = 2.0 * (d[0] * u[0] + d[1] * u[1] + d[2] * u[2])
+    disc = b * b - 4.0 * a * c
+    if disc <= 0.0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2.0 * a)
+    return t if 0.0 <= t <= 1.0 else None
+
+def block_toi(block, p0, p1):
+    lo = (block.x - block.size, block.y - block.size, block.z - block.size)
+    hi = (block.x + block.size, block.y + block.size, block.z + block.size)
+    return segment_box_toi(p0, p1, lo, hi)
+
+def stair_toi(stair, p0, p1, half_depth):
+    # The discrete test includes the top and bottom faces, so nudge y outwards slightly
+    lo = (stair.x - stair.size, stair.y - 1e-12, stair.z - half_depth)
+    hi = (stair.x + stair.size, stair.y + stair.height + 1e-12, stair.z + half_depth)
+    return segment_box_toi(p0, p1, lo, hi)
+
+def cone_toi(cone, p0, p1, radius):
+    if cone.is_hanging:
+        y_lo, y_hi = cone.y - cone.height, cone.y
+    else:
+        y_lo, y_hi = -math.inf, cone.y + cone.height
+    return segment_cylinder_toi(p0, p1, cone.x, cone.z, radius + cone.base_radius, y_lo, y_hi)
+
+def half_sphere_toi(half_sphere, p0, p1, radius):
+    return segment_cylinder_toi(p0, p1, half_sphere.x, half_sphere.z, radius + half_sphere.radius,
+                                -math.inf, half_sphere.y + half_sphere.radius + 1e-12)
+
+def star_toi(star, p0, p1, radius):
+    return segment_sphere_toi(p0, p1, (star.x, star.y, star.z), radius + star.size)
+
+def point_at(p0, p1, t):
+    return tuple(p0[axis] + (p1[axis] - p0[axis]) * t for axis in range(3))
@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+
+# The camera only ever slides along x, so culling is a slab test: find the x range of the
+# level that the view frustum can see, then draw only what overlaps it.
+
+CULL_MARGIN = 0.1  # Keeps wide lines and rounding at the screen edges from popping
+PORTAL_RADIUS = 0.39  # Outer radius plus tube radius of the portal torus
+
+# The 12 edges of the frustum as pairs of corner indices that differ in one coordinate
+FRUSTUM_EDGES = [(i, i | bit) for i in range(8) for bit in (1, 2, 4) if not i & bit]
+
+def frustum_planes(matrix):
+    # (a, b, c, d) with a*x + b*y + c*z + d >= 0 inside, from a view-projection matrix
+    return np.array([matrix[3] + sign * matrix[axis] for axis in range(3) for sign in (1, -1)])
+
+def frustum_corners(matrix):
+    ndc = np.array([(x, y, z, 1.0) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)])
+    corners = ndc @ np.linalg.inv(matrix).T
+    return corners[:, :3] / corners[:, 3:]
+
+def visible_slab(matrix, bounds):
+    # The x range where the frustum meets the box the level occupies in y and z, or None
+    # when it misses the level. The intersection is convex, so its extremes lie on the
+    # box's edges clipped by the frustum, on frustum corners inside the box, or where
+    # frustum edges cross the box's faces.
+    y_lo, y_hi, z_lo, z_hi = bounds
+    xs = []
+    planes = frustum_planes(matrix)
+    for y in (y_lo, y_hi):
+        for z in (z_lo, z_hi):
+            lo, hi = -math.inf, math.inf
+            for a, b, c, d in planes:
+                rest = b * y + c * z + d
+                if a > 0:
+                    lo = max(lo, -rest / a)
+                elif a < 0:
+                    hi = min(hi, -rest / a)
+                elif rest < 0:
+                    lo, hi = math.inf, -math.inf  # Parallel to the plane and outside it
+            if lo <= hi:
+                xs += [lo, hi]
+
+    def inside(point):
+        return y_lo <= point[1] <= y_hi and z_lo <= point[2] <= z_hi
+
+    corners = frustum_corners(matrix)
+    xs += [corner[0] for corner in corners if inside(corner)]
+    for i, j in FRUSTUM_EDGES:
+        p, q = corners[i], corners[j]
+        for axis, value in ((1, y_lo), (1, y_hi), (2, z_lo), (2, z_hi)):
+            if (p[axis] - value) * (q[axis] - value) < 0:
+                point = p + (value - p[axis]) / (q[axis] - p[axis]) * (q - p)
+                point[axis] = value
+                if inside(point):
+                    xs.append(point[0])
+    if not xs:
+        return None
+    return min(xs) - CULL_MARGIN, max(xs) + CULL_MARGIN
+
+def overlaps(extent, slab):
+    return slab is not None and extent[1] >= slab[0] and extent[0] <= slab[1]
+
+def level_bounds(path):
+    # y and z range of the ground and everything that gets culled, each obstacle padded by
+    # its largest dimension
+    boxes = [(-1.0, 0.0, 0.0, 1.5)]  # The ground and its sloping sides
+    reaches = ((path.blocks, lambda block: block.size),
+               (path.stairs, lambda stair: max(stair.size, stair.height, stair.depth)),
+               (path.stars, lambda star: star.size),
+               (path.cones, lambda cone: max(cone.base_radius, cone.height)),
+               (path.half_spheres, lambda half_sphere: half_sphere.radius))
+    for items, reach in reaches:
+        for item in items:
+            r = reach(item)
+            boxes.append((item.y - r, item.y + r, item.z - r, item.z + r))
+    x, y, z = path.portal['position']
+    boxes.append((y - PORTAL_RADIUS, y + PORTAL_RADIUS, z - PORTAL_RADIUS, z + PORTAL_RADIUS))
+    y_lo, y_hi, z_lo, z_hi = zip(*boxes)
+    return min(y_lo), max(y_hi), min(z_lo), max(z_hi)
+
+class CullStats:
+    # Objects drawn and culled in the last frame
+    def __init__(self):
+        self.drawn = 0
+        self.culled = 0
+
+    def reset(self):
+        self.drawn = 0
+        self.culled = 0
+
+    def add(self, drawn, culled):
+        self.drawn += drawn
+        self.culled += culled
@@ -0,0 +1,137 @@
+import ctypes
+from collections import OrderedDict
+
+import numpy as np
+from OpenGL.GL import *
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QImage, QPainter
+
+# Text drawn from a font rasterized once into a texture atlas with QPainter, instead of a
+# glutBitmapCharacter call per character per frame. Each string becomes one array of quads,
+# laid out once and kept while it is in use, and is drawn with a single call.
+
+FONT_FAMILY = 'Helvetica'
+FONT_SIZE = 18  # Pixels, about the size of GLUT_BITMAP_HELVETICA_18
+CHARACTERS = ''.join(chr(code) for code in range(32, 127))
+PADDING = 1  # Empty pixels around each glyph so neighbours never touch
+LAYOUT_LIMIT = 64  # Strings kept laid out, least recently drawn dropped first; the distance changes every frame
+
+class GlyphAtlas:
+    # One row of printable ASCII glyphs in an alpha texture, with each glyph's cell and advance
+    def __init__(self, family=FONT_FAMILY, size=FONT_SIZE):
+        font = QFont(family)
+        font.setPixelSize(size)
+        metrics = QFontMetrics(font)
+        self.ascent = metrics.ascent()
+        self.height = metrics.height()
+        self.glyphs = {}
+        x = PADDING
+        for char in CHARACTERS:
+            width = metrics.horizontalAdvance(char)
+            self.glyphs[char] = (x, width)
+            x += width + 2 * PADDING
+        self.width = x
+
+        image = QImage(self.width, self.height, QImage.Format_ARGB32)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setFont(font)
+        painter.setPen(QColor(255, 255, 255))
+        for char, (x, width) in self.glyphs.items():
+            painter.drawText(x, self.ascent, char)
+        painter.end()
+
+        pixels = image.constBits()
+        pixels.setsize(image.sizeInBytes())
+        rows = np.frombuffer(pixels, np.uint8).reshape(self.height, image.bytesPerLine())
+        alpha = np.ascontiguousarray(rows[:, :self.width * 4].reshape(self.height, self.width, 4)[:, :, 3])
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, self.width, self.height, 0, GL_ALPHA, GL_UNSIGNED_BYTE, alpha)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def layout(self, text):
+        # Interleaved (x, y, s, t) quads in pixels from the start of the baseline, y up
+        quads = []
+        pen = 0
+        top, bottom = self.ascent, self.ascent - self.height
+        for char in text:
+            x, width = self.glyphs.get(char, self.glyphs['?'])
+            s0, s1 = x / self.width, (x + width) / self.width
+            quads.append([(pen, bottom, s0, 1.0), (pen + width, bottom, s1, 1.0),
+                          (pen + width, top, s1, 0.0), (pen, top, s0, 0.0)])
+            pen += width
+        return np.array(quads, dtype=np.float32).reshape(-1, 4)
+
+    def delete(self):
+        glDeleteTextures(1, [self.texture])
+
+class TextRenderer:
+    # Draws strings at normalized device coordinates in the current color, with the
+    # fixed-function matrices at identity the way glRasterPos2f was used
+    def __init__(self, atlas=None):
+        self.atlas = atlas if atlas is not None else GlyphAtlas()
+        self.layouts = OrderedDict()
+        self.viewport = (1, 1)
+
+    def resize(self, width, height):
+        self.viewport = (max(width, 1), max(height, 1))
+
+    def layout(self, text):
+        quads = self.layouts.get(text)
+        if quads is not None:
+            self.layouts.move_to_end(text)  # Labels drawn every frame are never dropped
+            return quads
+        if len(self.layouts) >= LAYOUT_LIMIT:
+            self.layouts.popitem(last=False)
+        quads = self.layouts[text] = self.atlas.layout(text)
+        return quads
+
+    def origin(self, x, y):
+        # The raster position snapped to a pixel, in pixels from the bottom left
+        width, height = self.viewport
+        return round((x + 1) * width / 2), round((y + 1) * height / 2)
+
+    def bounds(self, text, x, y):
+        # The rectangle the string covers as (left, bottom, right, top), in normalized coordinates
+        quads = self.layout(text)
+        if not len(quads):
+            return x, y, x, y
+        (left, bottom), (width, height) = self.origin(x, y), self.viewport
+        low, high = quads[:, :2].min(axis=0), quads[:, :2].max(axis=0)
+        return ((left + low[0]) * 2 / width - 1, (bottom + low[1]) * 2 / height - 1,
+                (left + high[0]) * 2 / width - 1, (bottom + high[1]) * 2 / height - 1)
+
+    def draw(self, text, x, y):
+        quads = self.layout(text)
+        if not len(quads):
+            return
+        (left, bottom), (width, height) = self.origin(x, y), self.viewport
+        glPushMatrix()
+        # From the snapped raster position, one unit per pixel
+        glTranslatef(left * 2 / width - 1, bottom * 2 / height - 1, 0)
+        glScalef(2 / width, 2 / height, 1)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.atlas.texture)
+        glEnable(GL_BLEND)  # In the HUD's blend function
+        glBindBuffer(GL_ARRAY_BUFFER, 0)  # The quads are client memory
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 16, ctypes.c_void_p(quads.ctypes.data))
+        glTexCoordPointer(2, GL_FLOAT, 16, ctypes.c_void_p(quads.ctypes.data + 8))
+        glDrawArrays(GL_QUADS, 0, len(quads))
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisable(GL_BLEND)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glPopMatrix()
+
+    def delete(self):
+        self.atlas.delete()
+        self.layouts.clear()
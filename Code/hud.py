@@ -0,0 +1,240 @@
+from collections import namedtuple
+
+from OpenGL.GL import *
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QFont, QImage, QPainter, QPen
+
+# The score bar, its labels and the game over and win overlays, kept in a texture the size
+# of the viewport. They are drawn into it only when what they show changes, and otherwise
+# cost a few blended quads per frame over just the parts of the view they cover. The texture
+# holds premultiplied alpha so the overlay's translucency composites over the scene the same
+# as drawing it directly.
+
+REGION_PADDING = 2  # Pixels around each region, for the lines drawn on its edges
+
+def merged(rectangles):
+    # Overlapping rectangles joined into their bounding rectangle, so no pixel is blended twice
+    rectangles = list(rectangles)
+    result = []
+    while rectangles:
+        left, bottom, right, top = rectangles.pop()
+        for i, (l, b, r, t) in enumerate(result):
+            if left < r and l < right and bottom < t and b < top:
+                del result[i]
+                rectangles.append((min(left, l), min(bottom, b), max(right, r), max(top, t)))
+                break
+        else:
+            result.append((left, bottom, right, top))
+    return result
+
+class HudLayer:
+    def __init__(self):
+        self.framebuffer = glGenFramebuffers(1)
+        self.texture = glGenTextures(1)
+        self.size = None
+        self.key = None  # What the texture shows, as given to update
+        self.regions = []  # Where it shows anything, as texture coordinate rectangles
+
+    @classmethod
+    def create(cls):
+        # None when the context has no framebuffer objects; the HUD is then drawn every frame
+        if not (glGenFramebuffers and glBlendFuncSeparate):
+            return None
+        try:
+            return cls()
+        except GLError:
+            return None
+
+    def resize(self, width, height):
+        self.size = (max(width, 1), max(height, 1))
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, *self.size, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self.key = None
+
+    def update(self, key, draw, regions):
+        # Redraw into the texture with draw() unless it already shows key. regions() gives
+        # the rectangles draw() covers, as (left, bottom, right, top) in normalized coordinates.
+        if key == self.key:
+            return
+        self.key = key
+        width, height = self.size
+        pad_x, pad_y = 2 * REGION_PADDING / width, 2 * REGION_PADDING / height
+        self.regions = merged((max((left - pad_x + 1) / 2, 0.0), max((bottom - pad_y + 1) / 2, 0.0),
+                               min((right + pad_x + 1) / 2, 1.0), min((top + pad_y + 1) / 2, 1.0))
+                              for left, bottom, right, top in regions())
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)  # QOpenGLWidget's own framebuffer
+        clear = glGetFloatv(GL_COLOR_CLEAR_VALUE)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture, 0)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        # Colors are weighted by their alpha as usual, alpha itself accumulates coverage
+        glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        draw()
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+        glClearColor(*clear)
+
+    def composite(self):
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glPushAttrib(GL_ENABLE_BIT)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+        glBegin(GL_QUADS)
+        for left, bottom, right, top in self.regions:
+            for x, y in ((left, bottom), (right, bottom), (right, top), (left, top)):
+                glTexCoord2f(x, y)
+                glVertex2f(2 * x - 1, 2 * y - 1)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glPopAttrib()
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def delete(self):
+        glDeleteFramebuffers(1, [self.framebuffer])
+        glDeleteTextures(1, [self.texture])
+
+PanelStyle = namedtuple('PanelStyle', 'background border border_width radius font_size color')
+
+class Panel:
+    # A label drawn into the HUD in place of a translucent Qt child widget, so the GL widget
+    # stays a single opaque surface. Answers the QLabel calls the widget makes; its image is
+    # painted with QPainter and uploaded again only when its text changes.
+    def __init__(self, text, rect, style):
+        self._text = text
+        self.rect = rect  # QRect in widget coordinates, like setGeometry
+        self.style = style
+        self.visible = True
+        self.texture = None
+        self.dirty = True
+
+    def text(self):
+        return self._text
+
+    def setText(self, text):
+        if text != self._text:
+            self._text = text
+            self.dirty = True
+
+    def show(self):
+        self.visible = True
+
+    def hide(self):
+        self.visible = False
+
+    def isVisible(self):
+        return self.visible
+
+    def key(self):
+        return self._text, self.visible
+
+    def bounds(self, width, height):
+        # The panel as (left, bottom, right, top) in normalized coordinates
+        rect = self.rect
+        return (2 * rect.left() / width - 1, 1 - 2 * (rect.top() + rect.height()) / height,
+                2 * (rect.left() + rect.width()) / width - 1, 1 - 2 * rect.top() / height)
+
+    def paint(self):
+        style = self.style
+        image = QImage(self.rect.width(), self.rect.height(), QImage.Format_RGBA8888)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        inset = style.border_width / 2
+        painter.setPen(QPen(style.border, style.border_width))
+        painter.setBrush(style.background)
+        painter.drawRoundedRect(QRectF(inset, inset, image.width() - 2 * inset, image.height() - 2 * inset),
+                                style.radius, style.radius)
+        font = QFont()
+        font.setPixelSize(style.font_size)
+        painter.setFont(font)
+        painter.setPen(style.color)
+        painter.drawText(image.rect(), Qt.AlignCenter, self._text)
+        painter.end()
+        return image
+
+    def upload(self):
+        image = self.paint()
+        pixels = image.constBits()
+        pixels.setsize(image.sizeInBytes())
+        if self.texture is None:
+            self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ROW_LENGTH, image.bytesPerLine() // 4)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image.width(), image.height(), 0, GL_RGBA, GL_UNSIGNED_BYTE,
+                     bytes(pixels))
+        glPixelStorei(GL_UNPACK_ROW_LENGTH, 0)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self.dirty = False
+
+    def draw(self, width, height):
+        # One textured quad, with the fixed-function matrices at identity and blending on
+        if not self.visible:
+            return
+        if self.dirty:
+            self.upload()
+        left, bottom, right, top = self.bounds(width, height)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glBegin(GL_QUADS)
+        for s, t, x, y in ((0, 1, left, bottom), (1, 1, right, bottom), (1, 0, right, top), (0, 0, left, top)):
+            glTexCoord2f(s, t)
+            glVertex2f(x, y)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def delete(self):
+        if self.texture is not None:
+            glDeleteTextures(1, [self.texture])
+            self.texture = None
+            self.dirty = True
+
+class Button(Panel):
+    # A Panel answering the QPushButton calls the widget makes; the widget hit-tests clicks
+    def __init__(self, text, rect, style, clicked):
+        super().__init__(text, rect, style)
+        self.clicked = clicked
+
+    def contains(self, pos):
+        return self.visible and self.rect.contains(pos)
+
+    def click(self):
+        self.clicked()
+
+def draw_panels(panels, width, height):
+    # The panels over everything else in the HUD, in widget pixels of a width x height view
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+    glPushAttrib(GL_ENABLE_BIT)
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    glEnable(GL_TEXTURE_2D)
+    glEnable(GL_BLEND)
+    glColor4f(1.0, 1.0, 1.0, 1.0)
+    for panel in panels:
+        panel.draw(width, height)
+    glPopAttrib()
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
@@ -0,0 +1,219 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+
+# Blocks and stairs are all the same unit cube, so it is uploaded once and every obstacle
+# becomes an instance (offset, scale, color). Each category costs one draw for its faces
+# and one for its edges, however many obstacles the level has. Instances are stored in x
+# order, so the ones on screen are a contiguous run and culling only shortens the draw.
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute vec3 normal;
+attribute vec3 offset;
+attribute vec3 scale;
+attribute vec3 color;
+uniform bool lit;
+uniform vec4 edge_color;
+varying vec4 shade;
+
+void main() {
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(offset + position * scale, 1.0);
+    if (!lit) {
+        shade = edge_color;
+        return;
+    }
+    // Fixed-function lighting for the directional GL_LIGHT0, with the instance color as
+    // GL_AMBIENT_AND_DIFFUSE and the current material's specular
+    vec4 material = vec4(color, 1.0);
+    vec3 n = normalize(gl_NormalMatrix * normal);
+    vec3 l = normalize(gl_LightSource[0].position.xyz);
+    float diffuse = max(dot(n, l), 0.0);
+    vec4 result = gl_FrontMaterial.emission + gl_LightModel.ambient * material
+                + gl_LightSource[0].ambient * material + diffuse * gl_LightSource[0].diffuse * material;
+    if (diffuse > 0.0) {
+        float highlight = max(dot(n, normalize(l + vec3(0.0, 0.0, 1.0))), 0.0);
+        result += pow(highlight, gl_FrontMaterial.shininess) * gl_LightSource[0].specular * gl_FrontMaterial.specular;
+    }
+    shade = clamp(vec4(result.rgb, material.a), 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+varying vec4 shade;
+
+void main() {
+    gl_FragColor = shade;
+}
+"""
+
+ATTRIBUTES = ('position', 'normal', 'offset', 'scale', 'color')
+
+def unit_cube():
+    # Faces as 4 vertices each with the face normal, plus the 12 edges over the 8 corners,
+    # in the same order as Block.draw_cube
+    corners = np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                        [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]], dtype=np.float32) * 0.5
+    faces = np.array([[0, 1, 2, 3], [4, 5, 6, 7], [0, 1, 5, 4], [2, 3, 7, 6], [0, 3, 7, 4], [1, 2, 6, 5]])
+    normals = np.array([[0, 0, -1], [0, 0, 1], [0, -1, 0], [0, 1, 0], [-1, 0, 0], [1, 0, 0]], dtype=np.float32)
+    face_vertices = np.concatenate([corners[faces.reshape(-1)], np.repeat(normals, 4, axis=0)], axis=1)
+    quads = np.arange(24).reshape(6, 4)
+    face_indices = quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1)
+    edges = np.array([(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4),
+                      (0, 4), (1, 5), (2, 6), (3, 7)]).reshape(-1)
+    edge_vertices = np.concatenate([corners, np.zeros_like(corners)], axis=1)
+    return face_vertices, face_indices, edge_vertices, edges
+
+def supported():
+    return bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)
+
+def link_program(vertex_shader, fragment_shader, locations=None):
+    program = glCreateProgram()
+    for source, kind in ((vertex_shader, GL_VERTEX_SHADER), (fragment_shader, GL_FRAGMENT_SHADER)):
+        glAttachShader(program, shaders.compileShader(source, kind))
+    # Some compatibility drivers need attribute 0 in use, so position takes it by default
+    for name, location in (locations or {'position': 0}).items():
+        glBindAttribLocation(program, location, name)
+    glLinkProgram(program)
+    if not glGetProgramiv(program, GL_LINK_STATUS):
+        raise RuntimeError(glGetProgramInfoLog(program))
+    return program
+
+def static_buffer(target, data):
+    buffer = glGenBuffers(1)
+    glBindBuffer(target, buffer)
+    glBufferData(target, data.nbytes, data, GL_STATIC_DRAW)
+    glBindBuffer(target, 0)
+    return buffer
+
+class CubeMesh:
+    def __init__(self):
+        face_vertices, face_indices, edge_vertices, edge_indices = unit_cube()
+        self.faces = (static_buffer(GL_ARRAY_BUFFER, face_vertices),
+                      static_buffer(GL_ELEMENT_ARRAY_BUFFER, face_indices.astype(np.uint32)), len(face_indices))
+        self.edges = (static_buffer(GL_ARRAY_BUFFER, edge_vertices),
+                      static_buffer(GL_ELEMENT_ARRAY_BUFFER, edge_indices.astype(np.uint32)), len(edge_indices))
+
+    def delete(self):
+        for vbo, ibo, count in (self.faces, self.edges):
+            glDeleteBuffers(2, [vbo, ibo])
+
+class CubeInstances:
+    # One category of cuboid obstacles as a per-instance buffer: offset, scale and color,
+    # in the order of the category's SlabIndex
+    def __init__(self, offsets, scales, colors, view):
+        self.view = view
+        columns = [np.array(column, dtype=np.float32).reshape(-1, 3) for column in (offsets, scales, colors)]
+        data = np.ascontiguousarray(np.concatenate(columns, axis=1))
+        self.count = len(data)
+        self.buffer = static_buffer(GL_ARRAY_BUFFER, data) if self.count else None
+
+    def delete(self):
+        if self.buffer is not None:
+            glDeleteBuffers(1, [self.buffer])
+
+class InstancedCubes:
+    def __init__(self, blocks, stairs, block_view, stair_view):
+        self.program = link_program(VERTEX_SHADER, FRAGMENT_SHADER)
+        self.attributes = {name: glGetAttribLocation(self.program, name) for name in ATTRIBUTES}
+        self.lit = glGetUniformLocation(self.program, 'lit')
+        self.edge_color = glGetUniformLocation(self.program, 'edge_color')
+        self.mesh = CubeMesh()
+        # Blocks are cubes of side `size` centered on the obstacle; stairs scale the unit cube
+        blocks = [blocks[i] for i in block_view.order]
+        stairs = [stairs[i] for i in stair_view.order]
+        self.blocks = CubeInstances([(block.x, block.y, block.z) for block in blocks],
+                                    [(block.size,) * 3 for block in blocks],
+                                    [block.color[:3] for block in blocks], block_view)
+        self.stairs = CubeInstances([(stair.x, stair.y, stair.z) for stair in stairs],
+                                    [(stair.size, stair.height, stair.depth) for stair in stairs],
+                                    [(0.0, 0.0, 0.0)] * len(stairs), stair_view)
+
+    @classmethod
+    def create(cls, path):
+        # None when the context cannot draw instanced; the obstacles then draw themselves
+        if not supported():
+            return None
+        try:
+            return cls(path.blocks, path.stairs, path.views['blocks'], path.views['stairs'])
+        except (GLError, RuntimeError):
+            return None
+
+    def visible(self, instances, slab, stats):
+        # The run of instances that may overlap the slab, as (first, count)
+        start, end = instances.view.window(slab)
+        stats.add(end - start, instances.count - (end - start))
+        return start, end - start
+
+    def draw(self, slab, stats):
+        glUseProgram(self.program)
+        first, count = self.visible(self.blocks, slab, stats)
+        if count:
+            self.draw_category(self.blocks, first, count, line_width=3.0, edge_color=(0.0, 0.0, 0.0, 1.0))
+        first, count = self.visible(self.stairs, slab, stats)
+        if count:
+            # Stairs are black; set it as the current material the way StairBlock.draw_stair does,
+            # since later draws in the frame inherit it
+            black = [0.0, 0.0, 0.0, 1.0]
+            glMaterialfv(GL_FRONT, GL_AMBIENT, black)
+            glMaterialfv(GL_FRONT, GL_DIFFUSE, black)
+            glMaterialfv(GL_FRONT, GL_SPECULAR, black)
+            glMaterialf(GL_FRONT, GL_SHININESS, 0.0)
+            self.draw_category(self.stairs, first, count, line_width=2.0, edge_color=(1.0, 1.0, 1.0, 1.0))
+        glUseProgram(0)
+        glColor3f(1, 1, 1)  # Leave the current color white like the immediate-mode path
+
+    def draw_category(self, instances, first, count, line_width, edge_color):
+        # Faces of every instance go down before any edges, so push them back slightly or the
+        # edges shared between neighbouring obstacles lose the depth test
+        glUniform1i(self.lit, 1)
+        glEnable(GL_POLYGON_OFFSET_FILL)
+        glPolygonOffset(1.0, 1.0)
+        self.draw_instanced(self.mesh.faces, instances, first, count, GL_TRIANGLES)
+        glDisable(GL_POLYGON_OFFSET_FILL)
+        glUniform1i(self.lit, 0)
+        glUniform4f(self.edge_color, *edge_color)
+        glLineWidth(line_width)
+        self.draw_instanced(self.mesh.edges, instances, first, count, GL_LINES)
+
+    def draw_instanced(self, mesh, instances, first, instance_count, mode):
+        vbo, ibo, count = mesh
+        position, normal = self.attributes['position'], self.attributes['normal']
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glEnableVertexAttribArray(position)
+        glVertexAttribPointer(position, 3, GL_FLOAT, GL_FALSE, 24, ctypes.c_void_p(0))
+        if normal >= 0:
+            glEnableVertexAttribArray(normal)
+            glVertexAttribPointer(normal, 3, GL_FLOAT, GL_FALSE, 24, ctypes.c_void_p(12))
+
+        per_instance = [name for name in ('offset', 'scale', 'color') if self.attributes[name] >= 0]
+        glBindBuffer(GL_ARRAY_BUFFER, instances.buffer)
+        for i, name in enumerate(('offset', 'scale', 'color')):
+            location = self.attributes[name]
+            if location < 0:
+                continue  # Optimized out of the program
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, 3, GL_FLOAT, GL_FALSE, 36, ctypes.c_void_p(36 * first + 12 * i))
+            glVertexAttribDivisor(location, 1)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ibo)
+        glDrawElementsInstanced(mode, count, GL_UNSIGNED_INT, None, instance_count)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        for name in per_instance:
+            glVertexAttribDivisor(self.attributes[name], 0)
+            glDisableVertexAttribArray(self.attributes[name])
+        glDisableVertexAttribArray(position)
+        if normal >= 0:
+            glDisableVertexAttribArray(normal)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def delete(self):
+        self.mesh.delete()
+        self.blocks.delete()
+        self.stairs.delete()
+        glDeleteProgram(self.program)
@@ -6,27 +6,49 @@ from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtOpenGL import QGLWidget
 import cv2
 
+from video import DEFAULT_FPS, Decoder, FrameRing, PlaybackClock, StreamingTexture, open_cache
+
+VIDEO_PATH = r"D:\fcg2024\Tutorial\FCG-2024_Mini Project\IMAGES_VIDEOS\welcome_video.mp4"
+
 class GLWidget(QGLWidget):
     def __init__(self, parent=None):
         super(GLWidget, self).__init__(parent)
-        self.cap = cv2.VideoCapture(r"D:\fcg2024\Tutorial\FCG-2024_Mini Project\IMAGES_VIDEOS\welcome_video.mp4")
-        if not self.cap.isOpened():
-            print("Error: Could not open video.")
-            sys.exit()
         self.frame = None
-        self.texture_id = None
+        self.uploaded = False  # Whether the texture already holds self.frame
+        self.texture = None
+        self.decoder = None
+        # Frames come from the cache 'python video.py <video>' builds, when there is one
+        self.frames = open_cache(VIDEO_PATH)
+        if self.frames is not None:
+            fps = self.frames.fps
+        else:
+            self.cap = cv2.VideoCapture(VIDEO_PATH)
+            if not self.cap.isOpened():
+                print("Error: Could not open video.")
+                sys.exit()
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+        # Playback follows the file's own frame rate, whenever the timer fires
+        self.clock = PlaybackClock(fps if fps > 0 else DEFAULT_FPS)
         self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self.update_frame)
+        if self.frames is None:
+            # Decoding and color conversion run on their own thread, ahead of the display
+            self.frames = FrameRing()
+            self.decoder = Decoder(self.cap, self.frames, self.clock)
+            self.decoder.start()
 
     def initializeGL(self):
         glutInit(sys.argv)
         glClearColor(0.0, 0.0, 0.0, 1.0)
-        self.texture_id = glGenTextures(1)
+        self.texture = StreamingTexture()
 
     def update_frame(self):
-        ret, self.frame = self.cap.read()
-        if not ret:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, self.frame = self.cap.read()
+        frame = self.frames.take(self.clock.index())
+        if frame is None:
+            return  # Nothing new is due yet, or the decoder has not caught up
+        self.frame = frame
+        self.uploaded = False
         self.update()
 
     def paintGL(self):
@@ -36,27 +58,26 @@ class GLWidget(QGLWidget):
         glFlush()
 
     def draw_background_video(self):
-        frame_rgb = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
-        frame_rgb = cv2.flip(frame_rgb, 0)
-        height, width, _ = frame_rgb.shape
-
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, frame_rgb)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        # Each new frame is uploaded once, however often the widget repaints
+        if not self.uploaded:
+            self.texture.upload(self.frame)
+            self.uploaded = True
 
+        # The frame's rows run top to bottom, so t = 0 is the top of the quad
+        glBindTexture(GL_TEXTURE_2D, self.texture.texture)
         glEnable(GL_TEXTURE_2D)
         glBegin(GL_QUADS)
-        glTexCoord2f(0.0, 0.0)
+        glTexCoord2f(0.0, 1.0)
         glVertex2f(-1.0, -1.0)
-        glTexCoord2f(1.0, 0.0)
-        glVertex2f(1.0, -1.0)
         glTexCoord2f(1.0, 1.0)
+        glVertex2f(1.0, -1.0)
+        glTexCoord2f(1.0, 0.0)
         glVertex2f(1.0, 1.0)
-        glTexCoord2f(0.0, 1.0)
+        glTexCoord2f(0.0, 0.0)
         glVertex2f(-1.0, 1.0)
         glEnd()
         glDisable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, 0)
 
     def resizeGL(self, w, h):
         glViewport(0, 0, w, h)
@@ -67,9 +88,21 @@ class GLWidget(QGLWidget):
         glLoadIdentity()
 
     def closeEvent(self, event):
-        self.cap.release()
+        if self.decoder is not None:
+            self.decoder.stop()  # Releases the capture
+        if self.texture is not None:
+            self.makeCurrent()
+            self.texture.delete()
+            self.texture = None
+            self.doneCurrent()
         super(GLWidget, self).closeEvent(event)
 
     def start_video_timer(self):
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)
+        # Safe to call while already playing
+        self.clock.start()
+        if not self.timer.isActive():
+            self.timer.start(self.clock.interval())
+
+    def stop_video_timer(self):
+        self.clock.stop()
+        self.timer.stop()
@@ -0,0 +1,165 @@
+import numpy as np
+
+# Fields copied into contiguous arrays for each obstacle category
+BLOCK_FIELDS = ('x', 'y', 'z', 'size')
+STAIR_FIELDS = ('x', 'y', 'z', 'size', 'height', 'depth')
+STAR_FIELDS = ('x', 'y', 'z', 'size')
+CONE_FIELDS = ('x', 'y', 'z', 'base_radius', 'height', 'is_hanging')
+HALF_SPHERE_FIELDS = ('x', 'y', 'z', 'radius')
+
+class CategoryArrays:
+    # One obstacle category as a structure of arrays, in SweepIndex order. Windows compute
+    # in float64 whatever the columns store.
+    def __init__(self, columns, items, order, box_function, first=0):
+        self.columns = columns
+        self.items = items  # The whole category; entry i of this window is items[first + i]
+        self.first = first
+        self.order = order  # Position of each entry in the level's obstacle list
+        self.box_function = box_function  # One of the *_box functions below
+        self.box = None  # Set on the windows made by window()
+        self.last_bounds = None
+        self.last_window = None
+        for name, column in columns.items():
+            setattr(self, name, column)
+
+    @classmethod
+    def from_index(cls, index, fields, box_function):
+        columns = {}
+        for name in fields:
+            dtype = np.bool_ if name == 'is_hanging' else np.float64
+            columns[name] = np.array([getattr(item, name) for item in index.items], dtype=dtype)
+        return cls(columns, index.items, np.array(index.order, dtype=np.intp), box_function)
+
+    @classmethod
+    def from_table(cls, table, fields, box_function):
+        # An obstacle_store table is already columns in this order: share them
+        return cls({name: table.columns[name] for name in fields}, table, table.columns['order'], box_function)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, window):
+        # Slicing float64 columns gives views, so a broadphase window costs no copies of them;
+        # float32 ones are widened, a copy of just the window's rows
+        columns = {name: column[window].astype(np.float64, copy=False) if column.dtype.kind == 'f'
+                   else column[window] for name, column in self.columns.items()}
+        return CategoryArrays(columns, self.items, self.order[window], self.box_function,
+                              self.first + window.start)
+
+    def window(self, start, end):
+        # The broadphase window only moves every few ticks, so the last one is kept, along
+        # with the box around its entries
+        if (start, end) != self.last_bounds:
+            self.last_bounds = (start, end)
+            self.last_window = self[start:end]
+            self.last_window.box = self.box_function(self.last_window) if end > start else EMPTY_BOX
+        return self.last_window
+
+    def item(self, i):
+        return self.items[self.first + i]
+
+class ObstacleArrays:
+    def __init__(self, path):
+        if path.store is not None:
+            store = path.store
+            self.blocks = CategoryArrays.from_table(store.blocks, BLOCK_FIELDS, block_box)
+            self.stairs = CategoryArrays.from_table(store.stairs, STAIR_FIELDS, stair_box)
+            self.stars = CategoryArrays.from_table(store.stars, STAR_FIELDS, star_box)
+            self.cones = CategoryArrays.from_table(store.cones, CONE_FIELDS, cone_box)
+            self.half_spheres = CategoryArrays.from_table(store.half_spheres, HALF_SPHERE_FIELDS, half_sphere_box)
+            return
+        self.blocks = CategoryArrays.from_index(path.block_index, BLOCK_FIELDS, block_box)
+        self.stairs = CategoryArrays.from_index(path.stair_index, STAIR_FIELDS, stair_box)
+        self.stars = CategoryArrays.from_index(path.star_index, STAR_FIELDS, star_box)
+        self.cones = CategoryArrays.from_index(path.cone_index, CONE_FIELDS, cone_box)
+        self.half_spheres = CategoryArrays.from_index(path.half_sphere_index, HALF_SPHERE_FIELDS,
+                                                      half_sphere_box)
+
+def _ball(value):
+    # A scalar tests one ball against N obstacles -> shape (N,);
+    # an array of M balls becomes a column -> shape (M, N)
+    if isinstance(value, float):
+        return value  # Python floats already broadcast, at float64
+    return np.asarray(value, dtype=np.float64)[..., None]
+
+def block_hits(blocks, x, y, z):
+    x, y, z = _ball(x), _ball(y), _ball(z)
+    return ((blocks.x - blocks.size < x) & (x < blocks.x + blocks.size) &
+            (blocks.y - blocks.size < y) & (y < blocks.y + blocks.size) &
+            (blocks.z - blocks.size < z) & (z < blocks.z + blocks.size))
+
+def stair_contacts(stairs, x, y, z, radius, uses_depth):
+    # Returns (standing on or inside the stair, landing on its top face)
+    x, y, z = _ball(x), _ball(y), _ball(z)
+    half_depth = stairs.depth / 2 if uses_depth else stairs.size
+    top = stairs.y + stairs.height
+    inside = ((stairs.x - stairs.size < x) & (x < stairs.x + stairs.size) &
+              (stairs.z - half_depth < z) & (z < stairs.z + half_depth) &
+              (stairs.y <= y) & (y <= top))
+    return inside, inside & (y > top - radius)
+
+def star_hits(stars, x, y, z, radius):
+    x, y, z = _ball(x), _ball(y), _ball(z)
+    dx = x - stars.x
+    dy = y - stars.y
+    dz = z - stars.z
+    return np.sqrt(dx * dx + dy * dy + dz * dz) < radius + stars.size
+
+def cone_hits(cones, x, y, z, radius):
+    x, y, z = _ball(x), _ball(y), _ball(z)
+    dx = x - cones.x
+    dz = z - cones.z
+    reach = radius + cones.base_radius
+    around = dx * dx + dz * dz < reach * reach
+    hanging = (cones.y - cones.height < y) & (y < cones.y)
+    standing = y < cones.y + cones.height
+    return around & np.where(cones.is_hanging, hanging, standing)
+
+def half_sphere_hits(half_spheres, x, y, z, radius):
+    x, y, z = _ball(x), _ball(y), _ball(z)
+    dx = x - half_spheres.x
+    dz = z - half_spheres.z
+    reach = radius + half_spheres.radius
+    return (dx * dx + dz * dz < reach * reach) & (y <= half_spheres.y + half_spheres.radius)
+
+EMPTY_BOX = (np.inf, -np.inf, np.inf, -np.inf)
+
+def _box(x_lo, x_hi, y_lo, y_hi):
+    return x_lo.min().item(), x_hi.max().item(), y_lo.min().item(), y_hi.max().item()
+
+# (x_lo, x_hi, y_lo, y_hi) around a window's entries, from the same sums the kernels compare
+# against, so a ball outside it, padded by its radius, can hit nothing and no kernel need run
+def block_box(blocks):
+    return _box(blocks.x - blocks.size, blocks.x + blocks.size, blocks.y - blocks.size, blocks.y + blocks.size)
+
+def stair_box(stairs):
+    return _box(stairs.x - stairs.size, stairs.x + stairs.size, stairs.y, stairs.y + stairs.height)
+
+def star_box(stars):
+    return _box(stars.x - stars.size, stars.x + stars.size, stars.y - stars.size, stars.y + stars.size)
+
+def cone_box(cones):
+    # Standing cones reach down without limit
+    bottom = np.where(cones.is_hanging, cones.y - cones.height, -np.inf)
+    top = np.where(cones.is_hanging, cones.y, cones.y + cones.height)
+    return _box(cones.x - cones.base_radius, cones.x + cones.base_radius, bottom, top)
+
+def half_sphere_box(half_spheres):
+    bottom = np.full(len(half_spheres), -np.inf)
+    return _box(half_spheres.x - half_spheres.radius, half_spheres.x + half_spheres.radius,
+                bottom, half_spheres.y + half_spheres.radius)
+
+def near(box, x, y, reach):
+    # Whether a ball at (x, y) may touch the box; reach is its radius plus a rounding margin
+    return box[0] - reach < x < box[1] + reach and box[2] - reach < y < box[3] + reach
+
+def hits_in_order(category, mask):
+    # Indices of the hits, in the level's obstacle list order so "first hit wins" rules hold
+    hits = mask.nonzero()[0]
+    if len(hits) < 2:
+        return hits
+    return hits[np.argsort(category.order[hits], kind='stable')]
+
+def any_hits(mask):
+    # Far cheaper than mask.any() on the few entries of a broadphase window
+    return np.count_nonzero(mask) > 0
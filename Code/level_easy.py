@@ -2,7 +2,6 @@ import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton
 from PyQt5.QtCore import Qt
 from OpenGL.GL import *
-from OpenGL.GLUT import *
 from LEVEL1 import OpenGLWidget as Level1OpenGLWidget  
 
 class EasyLevelWidget(QWidget):
@@ -47,7 +46,6 @@ class EasyLevelWidget(QWidget):
         
 
 if __name__ == "__main__":
-    glutInit()
     app = QApplication(sys.argv)
     window = EasyLevelWidget(None, None)
     window.show()
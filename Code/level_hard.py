@@ -2,7 +2,6 @@ import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton
 from PyQt5.QtCore import Qt
 from OpenGL.GL import *
-from OpenGL.GLUT import *
 from LEVEL3 import OpenGLWidget as Level3OpenGLWidget  
 import math
 
@@ -46,7 +45,6 @@ class HardLevelWidget(QWidget):
         self.stacked_widget.hide() 
 
 if __name__ == "__main__":
-    glutInit()  
     app = QApplication(sys.argv)
     window = HardLevelWidget(None, None)  
     window.show()
@@ -0,0 +1,1120 @@
+import os
+import sys
+from PyQt5.QtWidgets import QApplication, QOpenGLWidget, QMainWindow, QPushButton
+from PyQt5.QtCore import QTimer, Qt, QPoint, QUrl, QRect
+from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer, QMediaPlaylist
+from PyQt5.QtGui import QImage, QOpenGLTexture, QKeyEvent, QFont, QColor, QPainter
+from PyQt5.QtWidgets import QLabel
+from OpenGL.GL import *
+from OpenGL.GLU import *
+import math
+import numpy as np
+from broadphase import SlabIndex
+import culling
+from glyphs import TextRenderer
+from hud import Button, HudLayer, Panel, PanelStyle, draw_panels
+import levels
+import replay
+from instancing import InstancedCubes
+import lod
+from meshes import MeshCache
+import render_queue
+from renderer import ShaderRenderer, look_at, perspective
+import simulation
+from timestep import FixedTimestep, lerp
+
+# Colors
+WHITE = [1, 1, 1]
+BLACK = [0, 0, 0]
+
+# 'fixed' draws with fixed-function OpenGL, 'shader' with the GLSL renderer in renderer.py
+RENDERER = os.environ.get('BOUNCING_BALL_RENDERER', 'fixed')
+# 'widgets' shows the labels and restart button as Qt widgets over the scene, 'gl' draws
+# them into the GL HUD so the widget stays a single opaque surface
+OVERLAYS = os.environ.get('BOUNCING_BALL_OVERLAYS', 'widgets')
+# '1' prints what one frame in every STATS_INTERVAL drew
+STATS = os.environ.get('BOUNCING_BALL_STATS', '0') == '1'
+STATS_INTERVAL = 60
+CAMERA_RAIL = (9.0, 10.0)  # The camera's y and z; it follows the ball along x
+
+# The labels' and restart button's looks when they are drawn into the GL HUD
+LABEL_STYLE = PanelStyle(QColor(255, 255, 255, 200), QColor(0, 0, 0), 2, 15, 20, QColor(0, 0, 0))
+BUTTON_STYLE = PanelStyle(QColor(225, 225, 225), QColor(173, 173, 173), 1, 3, 13, QColor(0, 0, 0))
+
+texture = None  # Global variable for texture
+
+class Ball(simulation.Ball):
+    def __init__(self, r, c, h, x, z, path, physics):
+        super().__init__(r, h, x, z, path, physics)
+        self.color = c
+
+    def submit(self, queue, meshes, alpha=1.0):
+        # The ball in its texture, lit in its color, and the flat black shadow under it
+        image = render_queue.textured(texture.textureId(), self.color) if texture is not None else \
+            render_queue.lit_fill(self.color)
+        queue.submit(image, lambda: self.draw(meshes, alpha))
+        queue.submit(render_queue.unlit((0.0, 0.0, 0.0, 0.5)), lambda: self.draw_shadow(meshes, alpha))
+
+    def draw(self, meshes, alpha=1.0):
+        glPushMatrix()
+        position = (lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha), self.z)
+        glTranslated(*position)
+        glRotatef(lerp(self.prev_rotation_angle, self.rotation_angle, alpha), 0, 0, 1)
+        meshes.draw_detailed(meshes.lod.distance(position), 'sphere', self.radius, 30, 30)
+        glPopMatrix()
+
+    def draw_shadow(self, meshes, alpha=1.0):
+        glPushMatrix()
+
+        shadow_y = self.baseHeight - 0.08
+
+        shadow_offset = 0.05
+        shadow_x = lerp(self.prev_x, self.x, alpha) - shadow_offset
+        shadow_z = self.z
+
+        glTranslatef(shadow_x, shadow_y, shadow_z)
+        glScalef(1.0, 0.0, 1.0)
+
+        meshes.draw_detailed(meshes.lod.distance((shadow_x, shadow_y, shadow_z)), 'sphere', self.radius, 32, 32)
+
+        glPopMatrix()
+
+class Star(simulation.Star):
+    __slots__ = ()
+
+    def draw(self, meshes):
+        # Lit in whatever material the path passes it; the star's own color never showed
+        if not self.collected:
+            glPushMatrix()
+            glTranslatef(self.x, self.y, self.z)
+            glScalef(self.size, self.size, self.size)
+            meshes.draw('star', 5)
+            glPopMatrix()
+
+def draw_box_faces(width, height, length):
+    half_width = width / 2.0
+    half_height = height / 2.0
+    half_length = length / 2.0
+
+    vertices = box_vertices(half_width, half_height, half_length)
+
+    faces = [
+        [0, 1, 2, 3],  # Back face
+        [4, 5, 6, 7],  # Front face
+        [0, 1, 5, 4],  # Bottom face
+        [2, 3, 7, 6],  # Top face
+        [0, 3, 7, 4],  # Left face
+        [1, 2, 6, 5]   # Right face
+    ]
+
+    normals = [
+        [0, 0, -1],  # Back face normal
+        [0, 0, 1],   # Front face normal
+        [0, -1, 0],  # Bottom face normal
+        [0, 1, 0],   # Top face normal
+        [-1, 0, 0],  # Left face normal
+        [1, 0, 0]    # Right face normal
+    ]
+
+    glBegin(GL_QUADS)
+    for face, normal in zip(faces, normals):
+        glNormal3fv(normal)
+        for vertex in face:
+            glVertex3fv(vertices[vertex])
+    glEnd()
+
+def draw_box_edges(width, height, length):
+    vertices = box_vertices(width / 2.0, height / 2.0, length / 2.0)
+    edges = [
+        (0, 1), (1, 2), (2, 3), (3, 0),  # Back face edges
+        (4, 5), (5, 6), (6, 7), (7, 4),  # Front face edges
+        (0, 4), (1, 5), (2, 6), (3, 7)   # Side edges
+    ]
+    glBegin(GL_LINES)
+    for edge in edges:
+        for vertex in edge:
+            glVertex3fv(vertices[vertex])
+    glEnd()
+
+def box_vertices(half_width, half_height, half_length):
+    return [
+        [-half_width, -half_height, -half_length],
+        [half_width, -half_height, -half_length],
+        [half_width, half_height, -half_length],
+        [-half_width, half_height, -half_length],
+        [-half_width, -half_height, half_length],
+        [half_width, -half_height, half_length],
+        [half_width, half_height, half_length],
+        [-half_width, half_height, half_length]
+    ]
+
+class Block(simulation.Block):
+    __slots__ = ()
+
+    def parts(self, meshes):
+        # (state, geometry) pairs: faces in the block's color, then thick black edges
+        return [(render_queue.lit_fill(self.color), self.draw_faces),
+                (render_queue.unlit(BLACK, 3.0), self.draw_edges)]
+
+    def draw_faces(self):
+        glPushMatrix()
+        glTranslated(self.x, self.y, self.z)
+        draw_box_faces(self.size, self.size, self.size)
+        glPopMatrix()
+
+    def draw_edges(self):
+        glPushMatrix()
+        glTranslated(self.x, self.y, self.z)
+        draw_box_edges(self.size, self.size, self.size)
+        glPopMatrix()
+
+class StairBlock(simulation.StairBlock):
+    __slots__ = ()
+
+    def parts(self, meshes):
+        # Black faces and thin white edges. The black specular they also need is set once
+        # per frame by Path.draw.
+        return [(render_queue.lit_fill(BLACK), self.draw_faces),
+                (render_queue.unlit(WHITE, 2.0), self.draw_edges)]
+
+    def draw_faces(self):
+        glPushMatrix()
+        glTranslated(self.x, self.y, self.z)
+        glScalef(self.size, self.height, self.depth)  # Scale the block with different height
+        draw_box_faces(1, 1, 1)  # Draw a unit stair block scaled appropriately
+        glPopMatrix()
+
+    def draw_edges(self):
+        glPushMatrix()
+        glTranslated(self.x, self.y, self.z)
+        glScalef(self.size, self.height, self.depth)
+        draw_box_edges(1, 1, 1)
+        glPopMatrix()
+
+class Cone(simulation.Cone):
+    __slots__ = ()
+
+    def parts(self, meshes):
+        # The lit cone, its two thick black edges and the thin black outline of its base,
+        # detailed for the closest the camera gets since they are baked
+        distance = meshes.lod.closest((self.x, self.y, self.z))
+        return [(render_queue.lit_fill(self.color), lambda: self.draw_cone(meshes, distance)),
+                (render_queue.unlit(BLACK, 3.0), lambda: self.draw_edges(meshes)),
+                (render_queue.unlit(BLACK, 2.0), lambda: self.draw_base_outline(meshes, distance))]
+
+    def draw_cone(self, meshes, distance):
+        glPushMatrix()
+        glTranslatef(self.x, self.y, self.z)
+        if self.is_hanging:
+            glRotatef(180, 1, 0, 0)  # Rotate around the x-axis by 180 degrees if the cone is hanging
+
+        meshes.draw_detailed(distance, 'cone', self.base_radius, self.height, 30, 30)  # Upright cone with its base disk
+        glPopMatrix()
+
+    def draw_edges(self, meshes):
+        glPushMatrix()
+        glTranslatef(self.x, self.y, self.z)
+        if self.is_hanging:
+            glRotatef(180, 1, 0, 0)  # Rotate the edges if the cone is hanging
+
+        # One edge at angle 0 and one on the opposite side (pi + 0.3)
+        meshes.draw('cone_edges', self.base_radius, self.height)
+
+        glPopMatrix()
+
+    def draw_base_outline(self, meshes, distance):
+        glPushMatrix()
+        glTranslatef(self.x, self.y, self.z)
+        meshes.draw_detailed(distance, 'circle', self.base_radius, 30)  # Up to 30 segments, matching the cone's base
+        glPopMatrix()
+        
+class HalfSphere(simulation.HalfSphere):
+    __slots__ = ('animation_phase',)
+
+    def __init__(self, x, y, z, radius, color):
+        super().__init__(x, y, z, radius, color)
+        self.animation_phase = 0  # Add this line to track the animation phase
+
+    def update_color(self):
+        # Update the animation phase
+        self.animation_phase += 5
+        if self.animation_phase > 360:
+            self.animation_phase -= 360
+        
+        # Calculate color based on sine wave for smooth transition
+        t = self.animation_phase / 360.0
+        r = 0.5 * (1 + math.sin(2 * math.pi * (t + 0 / 3)))
+        g = 0.5 * (1 + math.sin(2 * math.pi * (t + 1 / 3)))
+        b = 0.5 * (1 + math.sin(2 * math.pi * (t + 2 / 3)))
+        self.color = [r, g, b]
+
+    def draw(self, meshes):
+        glPushMatrix()
+        glTranslatef(self.x, self.y, self.z)
+        meshes.draw_detailed(meshes.lod.distance((self.x, self.y, self.z)), 'half_sphere', self.radius, 30, 30)
+        glPopMatrix()
+
+class Path(simulation.Course):
+    block_class = Block
+    stair_class = StairBlock
+    star_class = Star
+    cone_class = Cone
+    half_sphere_class = HalfSphere
+
+    def __init__(self, level):
+        super().__init__(level)
+        self.palette = level['palette']
+        self.end_x = level['path']['end_x']  # The path runs a little past the portal
+        self.portal = level['portal']
+        self.top_color = self.palette[level['path']['top_color']]
+        self.side_color = self.palette[level['path']['side_color']]
+        self.groundListIds = None  # The ground's parts as (state, list id), baked once per GL context
+        self.meshes = None  # MeshCache of the widget's GL context
+        self.cubes = None  # Instanced blocks and stairs, when the context supports it
+        # Drawing order of each obstacle category, for culling against the camera's slab
+        self.views = {name: SlabIndex([item.x_extent() for item in getattr(self, name)])
+                      for name in levels.OBSTACLES}
+        self.bounds = culling.level_bounds(self)
+        x = self.portal['position'][0]
+        self.portal_extent = (x - culling.PORTAL_RADIUS, x + culling.PORTAL_RADIUS)
+        self.baked = []  # Static obstacles with a display list per part, in x order
+        self.baked_view = None
+        self.bakedListIds = None  # Per baked obstacle, its parts as (state, list id)
+        self.stats = culling.CullStats()  # Objects drawn and culled in the last frame
+
+    def top_quads(self):
+        # Extend the top_coords to make the path longer
+        return [
+            ((0, 0, 0), (6, 0, 0), (6, 0, 1), (0, 0, 1)),   # Top face of platform
+            ((6, 0, 0), (12, 0, 0), (12, 0, 1), (6, 0, 1)), # Top face of path segment
+            ((10, 0, 0), (self.end_x, 0, 0), (self.end_x, 0, 1), (10, 0, 1)) # Extend to the end of the level
+            # Add more segments as needed
+        ]
+
+    def side_quads(self):
+        # Extend the side_coords to make the path longer vertically
+        return [
+            # Left side face of platform
+            ((0, 0, 1), (0, -1, 1.5), (6, -1, 1.5), (6, 0, 1)),
+            # Right side face of platform
+            ((0, 0, 0), (0, -1, 0.5), (6, -1, 0.5), (6, 0, 0)),
+            # Left side face of path segment
+            ((6, 0, 1), (6, -1, 1.5), (12, -1, 1.5), (12, 0, 1)),
+            # Right side face of path segment
+            ((6, 0, 0), (6, -1, 0.5), (12, -1, 0.5), (12, 0, 0)),
+            # Additional segments to extend the path vertically
+            ((12, 0, 1), (12, -1, 1.5), (self.end_x, -1, 1.5), (self.end_x, 0, 1)),
+            ((12, 0, 0), (12, -1, 0.5), (self.end_x, -1, 0.5), (self.end_x, 0, 0)),
+        ]
+
+    def create(self):
+        # Bake the ground and every part of every obstacle that never changes into display
+        # lists of geometry and transforms only; the render queue sets the state they are
+        # drawn in. They are kept for the life of the GL context and reused across restarts.
+        if self.groundListIds is not None:
+            return
+        self.groundListIds = [
+            (render_queue.lit_fill(self.top_color, offset=True), self.bake(self.draw_top)),
+            (render_queue.unlit(BLACK, 2.0), self.bake(self.draw_outline)),
+            (render_queue.lit_fill(self.side_color), self.bake(self.draw_sides)),
+        ]
+
+        # Static obstacles; instanced blocks and stairs are already retained in their own
+        # buffers. They are kept in x order so the ones on screen are always a consecutive run.
+        baked = list(self.cones) if self.cubes is not None else self.blocks + self.stairs + self.cones
+        self.baked_view = SlabIndex([item.x_extent() for item in baked])
+        self.baked = [baked[i] for i in self.baked_view.order]
+        self.bakedListIds = [[(state, self.bake(draw)) for state, draw in item.parts(self.meshes)]
+                             for item in self.baked]
+
+    def bake(self, draw):
+        listId = glGenLists(1)
+        glNewList(listId, GL_COMPILE)
+        draw()
+        glEndList()
+        return listId
+
+    def draw_top(self):
+        # Draw top faces of the path
+        glBegin(GL_QUADS)
+        top_coords = self.top_quads()
+        normals = [(0, 1, 0)] * len(top_coords)  # Normals for the top faces
+        for quad, normal in zip(top_coords, normals):
+            glNormal3f(*normal)
+            for vertex in quad:
+                glVertex3f(*vertex)
+        glEnd()
+
+    def draw_outline(self):
+        # Draw the black outline on the top faces
+        glBegin(GL_LINES)
+        for quad in self.top_quads():
+            for i in range(4):
+                start_vertex = quad[i]
+                end_vertex = quad[(i + 1) % 4]
+                # Only draw vertical lines (left and right edges)
+                if i == 0 or i == 2:
+                    glVertex3f(*start_vertex)
+                    glVertex3f(*end_vertex)
+        glEnd()
+
+    def draw_sides(self):
+        # Draw side faces of the path
+        glBegin(GL_QUADS)
+        side_coords = self.side_quads()
+        side_normals = [
+            (0, 1, 0), (0, 1, 0), (0, 1, 0), (0, 1, 0),
+            (0, 1, 0), (0, 1, 0), (0, 1, 0), (0, 1, 0)
+        ] * (len(side_coords) // 4)
+        for quad, normal in zip(side_coords, side_normals):
+            glNormal3f(*normal)
+            for vertex in quad:
+                glVertex3f(*vertex)
+        glEnd()
+
+    def delete(self):
+        if self.groundListIds is not None:
+            for state, listId in self.groundListIds:
+                glDeleteLists(listId, 1)
+            self.groundListIds = None
+        if self.bakedListIds is not None:
+            for parts in self.bakedListIds:
+                for state, listId in parts:
+                    glDeleteLists(listId, 1)
+            self.bakedListIds = None
+        if self.cubes is not None:
+            self.cubes.delete()
+            self.cubes = None
+
+    def inherited_color(self):
+        # Stars and the portal set no material of their own and show whichever was set last
+        if self.half_spheres:
+            return self.half_spheres[-1].color
+        if self.cones:
+            return self.cones[-1].color
+        return self.side_color
+
+    def draw(self, slab, queue):
+        # Only what overlaps the camera's x range is drawn. Instanced cubes are drawn right
+        # away; everything else is submitted to the queue with its state.
+        self.stats.reset()
+        if self.stairs:
+            # Stairs leave a black specular material behind, whether or not any are on screen
+            glMaterialfv(GL_FRONT, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
+            glMaterialf(GL_FRONT, GL_SHININESS, 0.0)
+        if self.cubes is not None:
+            self.cubes.draw(slab, self.stats)
+        for state, listId in self.groundListIds:
+            queue.submit(state, listId)
+        start, end = self.baked_view.window(slab)
+        for parts in self.bakedListIds[start:end]:
+            for state, listId in parts:
+                queue.submit(state, listId)
+        self.stats.add(end - start, len(self.baked) - (end - start))
+
+        for half_sphere in self.half_spheres:
+            half_sphere.update_color()  # Animates off screen too
+        start, end = self.views['half_spheres'].window(slab)
+        for i in self.views['half_spheres'].order[start:end]:
+            half_sphere = self.half_spheres[i]
+            queue.submit(render_queue.lit_fill(half_sphere.color), lambda item=half_sphere: item.draw(self.meshes))
+        self.stats.add(end - start, len(self.half_spheres) - (end - start))
+        inherited = render_queue.lit_fill(self.inherited_color())
+
+        start, end = self.views['stars'].window(slab)
+        visible = [self.stars[i] for i in self.views['stars'].order[start:end] if not self.stars[i].collected]
+        for star in visible:
+            queue.submit(inherited, lambda item=star: item.draw(self.meshes))
+        self.stats.add(len(visible), len(self.stars) - (end - start))
+        if culling.overlaps(self.portal_extent, slab):
+            queue.submit(inherited, self.draw_portal)
+            self.stats.add(1, 0)
+        else:
+            self.stats.add(0, 1)
+            
+    def draw_portal(self):
+        glPushMatrix()
+        glTranslatef(*self.portal['position'])  # Position the torus in the scene
+        glRotatef(90, 7, 90, 0)  # Rotate 90 degrees around the x-axis to face the path
+
+        self.meshes.draw_detailed(self.meshes.lod.distance(self.portal['position']), 'torus', 0.09, 0.3, 30, 30)
+
+        glPopMatrix()
+
+class OpenGLWidget(QOpenGLWidget):
+    def __init__(self, level_name, parent=None, renderer=None, quality=None, overlays=None):
+        super(OpenGLWidget, self).__init__(parent)
+        self.level_name = level_name
+        self.renderer_name = renderer or RENDERER
+        self.overlays = overlays or OVERLAYS
+        self.renderer = None  # ShaderRenderer when it is selected and the context can run it
+        # Tessellation by size on screen; quality above 1 is finer, below coarser
+        self.lod = lod.LevelOfDetail(lod.QUALITY if quality is None else quality, rail=CAMERA_RAIL)
+        self.level = levels.get(level_name)  # Obstacles, physics, assets and score files
+        self.setFocusPolicy(Qt.StrongFocus)  # Set focus policy to receive keyboard events
+        self.background_texture = None  # Separate texture for the background
+        self.meshes = None  # Created with the GL context in initializeGL
+        self.text = None  # Glyph atlas text, also created in initializeGL
+        self.hud = None  # The score bar and overlays, redrawn only when they change
+        self.projection = np.identity(4)  # Set in resizeGL
+        self.queue = render_queue.RenderQueue()  # The fixed-function scene, sorted by GL state
+        self.state = render_queue.StateCache()
+        self.frames = 0  # Painted so far, for STATS
+        self.path = Path(self.level)
+        self.running = False  # Control whether the scene is running
+        self.timestep = FixedTimestep()  # Simulation ticks at a fixed rate, independent of repaints
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.updateScene)
+        self.timer.start(16)  # ~60 FPS
+        
+        # Initialize the media player and playlist
+        self.player = QMediaPlayer()
+        self.playlist = QMediaPlaylist()
+        
+        # Set the media file and play it
+        url = QUrl.fromLocalFile(self.level['assets']['song'])
+        content = QMediaContent(url)
+        self.playlist.addMedia(content)  # Add QMediaContent to the playlist
+        self.playlist.setCurrentIndex(0)
+        self.playlist.setPlaybackMode(QMediaPlaylist.Loop)  # Set the playback mode to loop
+        self.player.setPlaylist(self.playlist)
+        self.player.play()
+        self.high_score = 0.0
+        self.running = False
+        self.game_over = False  # Add this line        
+        physics = self.level['physics']
+        self.ball = Ball(0.1, WHITE, 0.1, physics.start_x, 0.5, self.path, physics)  # Instantiate Ball object here
+        self.simulation = simulation.Simulation(self.path, physics, self.ball)  # Headless game state and rules
+        self.recorder = replay.Recorder(self.simulation, level_name)  # Tick-stamped inputs of the current run
+        self.replayer = None  # Set while playing back a recording
+        if self.overlays == 'gl':
+            self.restart_button = Button('Restart', QRect(247, 241, 100, 50), BUTTON_STYLE, self.restart_game)
+        else:
+            self.restart_button = QPushButton('Restart', self)
+            self.restart_button.setGeometry(247, 241, 100, 50)
+            self.restart_button.clicked.connect(self.restart_game)
+        self.restart_button.hide()  # Hide it initially
+        self.game_won = False
+        
+        # Add the QLabel for "LEVEL 2" title
+        if self.overlays == 'gl':
+            self.level_label = Panel(self.level['label'], QRect(230, 13, 150, 50), LABEL_STYLE)
+        else:
+            self.level_label = QLabel(self.level['label'], self)
+            self.level_label.setAlignment(Qt.AlignCenter)
+            self.level_label.setStyleSheet("""
+                QLabel {
+                    background-color: rgba(255, 255, 255, 200);
+                    border: 2px solid black;  
+                    border-radius: 15px;
+                    padding: 10px;
+                    font-size: 20px;
+                    color: black;
+                }
+            """)
+            self.level_label.setGeometry(230, 13, 150, 50)  # Adjusted width and height
+        self.high_score = self.load_high_score()  # Load high score from file
+        if self.overlays == 'gl':
+            self.points_collected_label = Panel('Points Collected: 0', QRect(220, 73, 170, 50),
+                                                LABEL_STYLE._replace(font_size=16))
+        else:
+            self.points_collected_label = QLabel('Points Collected: 0', self)
+            self.points_collected_label.setAlignment(Qt.AlignCenter)
+            self.points_collected_label.setStyleSheet("""
+                QLabel {
+                    background-color: rgba(255, 255, 255, 200);
+                    border: 2px solid black;  
+                    border-radius: 15px;
+                    padding: 10px;
+                    font-size: 16px;
+                    color: black;
+                }
+            """)
+            self.points_collected_label.setGeometry(220, 73, 170, 50)  # Adjust these values as needed
+        self.points_collected = self.load_points_collected()  # Load points collected from file
+        self.points_collected_label.setText(f'Points Collected: {self.points_collected}')
+        # What the HUD draws in place of child widgets
+        self.panels = [self.level_label, self.points_collected_label, self.restart_button] \
+            if self.overlays == 'gl' else []
+
+
+    def load_high_score(self):
+        try:
+            with open(self.level['scores']['high_score'], 'r') as file:
+                return float(file.read().strip())
+        except FileNotFoundError:
+            return 0.0
+
+    def save_high_score(self):
+        with open(self.level['scores']['high_score'], 'w') as file:
+            file.write(f"{self.high_score:.2f}")
+            
+    def save_points_collected(self):
+        with open(self.level['scores']['points_collected'], 'w') as file:
+            file.write(f"{self.simulation.score}")
+            
+    def load_points_collected(self):
+        try:
+            with open(self.level['scores']['points_collected'], 'r') as file:
+                return int(file.read().strip())
+        except FileNotFoundError:
+            return 0
+
+    def closeEvent(self, event):
+        global texture
+        self.makeCurrent()
+        if texture is not None:
+            texture.destroy()
+            texture = None
+        if self.meshes is not None:
+            self.meshes.delete()
+        if self.text is not None:
+            self.text.delete()
+            self.text = None
+        if self.hud is not None:
+            self.hud.delete()
+            self.hud = None
+        for panel in self.panels:
+            panel.delete()
+        self.path.delete()
+        if self.renderer is not None:
+            self.renderer.delete()
+            self.renderer = None
+        if self.background_texture is not None:
+            self.background_texture.destroy()
+            self.background_texture = None
+        self.doneCurrent()
+        super().closeEvent(event)
+        
+    def cleanupTextures(self):
+        global texture
+        if texture is not None:
+            texture.destroy()
+            texture = None
+        if self.background_texture is not None:
+            self.background_texture.destroy()
+            self.background_texture = None
+            
+    def initializeGL(self):
+        self.makeCurrent()
+        glEnable(GL_DEPTH_TEST)  # Enable depth testing
+        glEnable(GL_LIGHTING)
+        glEnable(GL_LIGHT0)
+        glEnable(GL_TEXTURE_2D)
+        
+        glShadeModel(GL_SMOOTH)  # Enable smooth shading
+
+        glLightfv(GL_LIGHT0, GL_DIFFUSE, [1.0, 1.0, 1.0, 1.0])  # Increase diffuse reflection intensity
+        glLightfv(GL_LIGHT0, GL_AMBIENT, [0.4, 0.4, 0.4, 1.0])  # Increase ambient light intensity
+
+        # Set the position of the light source to shine directly on the path
+        glLightfv(GL_LIGHT0, GL_POSITION, [-3.0, 2.0, -1.0, 0.0])  # Directional light from below
+
+        # Set material properties
+        glMaterialfv(GL_FRONT, GL_SPECULAR, WHITE)
+        glMaterialf(GL_FRONT, GL_SHININESS, 30)
+
+        # Load and set up texture
+        self.load_texture()
+        self.load_background_texture()  # Load the background texture separately
+
+        self.lod.resize(self.height())
+        self.text = TextRenderer()  # Both renderers draw the score bar's labels with it
+        self.text.resize(self.width(), self.height())
+        self.hud = HudLayer.create()
+        if self.hud is not None:
+            self.hud.resize(self.width(), self.height())
+        if self.renderer_name == 'shader':
+            self.renderer = ShaderRenderer.create(self, texture)
+        if self.renderer is None:
+            self.meshes = MeshCache(self.lod)  # Primitive meshes, built once per GL context
+            self.preload_meshes()
+            self.path.meshes = self.meshes
+            self.path.cubes = InstancedCubes.create(self.path)
+            self.path.create()
+        
+        self.ball.path = self.path  # Pass the Path instance to the Ball after Path creation
+        self.doneCurrent()
+
+    def load_texture(self):
+        global texture
+        file_path = self.level['assets']['ball_texture']
+        image = QImage(file_path)
+
+        texture = QOpenGLTexture(image)
+        texture.setMinificationFilter(QOpenGLTexture.Linear)
+        texture.setMagnificationFilter(QOpenGLTexture.Linear)
+        texture.setWrapMode(QOpenGLTexture.ClampToEdge)
+
+    def load_background_texture(self):
+        file_path = self.level['assets']['background_texture']
+        image = QImage(file_path)
+    
+        self.background_texture = QOpenGLTexture(image)
+        self.background_texture.setMinificationFilter(QOpenGLTexture.Linear)
+        self.background_texture.setMagnificationFilter(QOpenGLTexture.Linear)
+        self.background_texture.setWrapMode(QOpenGLTexture.ClampToEdge)
+        
+    def preload_meshes(self):
+        # Every level of detail of what moves at the current scale, and the stars, so no mesh
+        # is built mid-game
+        self.meshes.preload('sphere', self.ball.radius, 30, 30)
+        self.meshes.preload('sphere', self.ball.radius, 32, 32)
+        for radius in {half_sphere.radius for half_sphere in self.path.half_spheres}:
+            self.meshes.preload('half_sphere', radius, 30, 30)
+        self.meshes.preload('torus', 0.09, 0.3, 30, 30)
+        self.meshes.preload('star', 5)
+
+    def resizeGL(self, w, h):
+        glViewport(0, 0, w, h)
+        self.projection = perspective(10.0, float(w) / float(h), 1.0, 150.0)  # For culling and the shader path
+        self.lod.resize(h)
+        if self.meshes is not None:
+            self.preload_meshes()  # Before the first frame at the new size needs them
+        if self.text is not None:
+            self.text.resize(w, h)
+        if self.hud is not None:
+            self.hud.resize(w, h)
+        if self.renderer is not None:
+            return
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluPerspective(10.0, float(w) / float(h), 1.0, 150.0)
+        glMatrixMode(GL_MODELVIEW)
+
+    def paintGL(self):
+        # Interpolate between the last two simulation ticks
+        alpha = self.timestep.alpha if self.running else 1.0
+        scene_x = lerp(self.simulation.prev_scene_x, self.simulation.scene_x, alpha)
+        eye, center, up = (-2 + scene_x, *CAMERA_RAIL), (2 + scene_x, 0, 0), (0.0, 1.0, 0.0)
+        self.lod.look_from(eye)
+        view = look_at(eye, center, up)
+        slab = culling.visible_slab(self.projection @ view, self.path.bounds)  # The x range on screen
+
+        if self.game_over or self.game_won:
+            self.finish_run()
+        if self.renderer is not None:
+            self.renderer.paint(self, alpha, view, slab)
+            self.log_stats()
+            return
+
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glLoadIdentity()
+
+        # Adjust the camera position
+        gluLookAt(*eye, *center, *up)
+
+        # Queue the background, the path and other objects, and the ball and its shadow, then
+        # draw them grouped by state
+        if self.background_texture is not None:
+            self.queue.submit(render_queue.textured(self.background_texture.textureId()), self.drawBackground)
+        self.path.draw(slab, self.queue)  # This will also draw the portal
+        self.ball.submit(self.queue, self.meshes, alpha)
+        self.queue.flush(self.state)
+
+        self.paint_hud(self.draw_hud, self.draw_live_hud)
+
+        glFlush()
+        self.log_stats()
+
+    def log_stats(self):
+        self.frames += 1
+        if not STATS or self.frames % STATS_INTERVAL:
+            return
+        stats = [f"{self.path.stats.drawn} drawn, {self.path.stats.culled} culled"]
+        if self.renderer is None:
+            # Setting each object's state itself against what the sorted queue issued
+            stats.append(f"state calls {self.state.per_object} per object, {self.state.issued} issued")
+        print(f"{self.level_name} frame {self.frames}: " + ', '.join(stats))
+
+    def paint_hud(self, draw, draw_live):
+        # Composite the retained HUD, redrawing it with draw() first if what it shows changed.
+        # During play the progress fill and distance change every tick, so draw_live() draws
+        # them over it each frame; while stopped they are kept in the texture as well.
+        if self.hud is None:
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            draw()
+            draw_live()
+            return
+        if self.running:
+            self.hud.update(self.hud_key(), draw, self.hud_regions)
+            self.hud.composite()
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            draw_live()
+        else:
+            self.hud.update(self.hud_key() + self.live_key(), lambda: (draw(), draw_live()),
+                            lambda: self.hud_regions() + [self.text.bounds(*self.distance_label())])
+            self.hud.composite()
+
+    def hud_key(self):
+        # Everything the retained HUD shows, as it is shown: the message and labels as printed
+        message = 'GAME OVER!' if self.game_over else 'YOU WIN!' if self.game_won else None
+        return (message,) + tuple(text for text, x, y in self.score_labels()) + \
+            tuple(panel.key() for panel in self.panels)
+
+    def live_key(self):
+        # The progress fill in whole pixels and the distance as printed
+        return round(self.progress() * 0.3 * self.width() / 2), self.distance_label()[0]
+
+    def hud_regions(self):
+        if self.game_over or self.game_won:
+            return [(-1.0, -1.0, 1.0, 1.0)]  # The overlay darkens the whole view
+        bar = (-0.95, 0.5, -0.65, 0.6)
+        return [bar] + [self.text.bounds(*label) for label in self.score_labels()] + \
+            [panel.bounds(self.width(), self.height()) for panel in self.panels if panel.isVisible()]
+
+    def score_labels(self):
+        # The score bar's labels that stay put during play, as (text, x, y)
+        return [("Progress :", -0.95, 0.65),
+                (f"Highest: {self.high_score:.2f}", 0.55, 0.78)]
+
+    def distance_label(self):
+        # Changes every tick, so it is drawn each frame rather than kept in the HUD texture
+        return f"Dist: {self.simulation.distance_traveled:.2f}", 0.55, 0.87
+
+    def progress(self):
+        physics = self.simulation.physics
+        if self.ball.x <= physics.finish_x:
+            return (self.ball.x - physics.start_x) / (physics.finish_x - physics.start_x)
+        return 1.0
+
+    def draw_hud(self):
+        # Draw overlays if the game is over or won
+        if self.game_over:
+            self.show_game_over_overlay()
+        elif self.game_won:
+            self.show_game_won_overlay()
+
+        # Draw the score bar
+        self.draw_score_bar()
+        self.draw_panels()
+
+    def draw_live_hud(self):
+        # The progress fill and distance, over the retained HUD
+        self.draw_progress()
+
+    def draw_panels(self):
+        # The labels and restart button, on top like the child widgets they replace
+        if self.panels:
+            draw_panels(self.panels, self.width(), self.height())
+
+
+    def draw_ball(self):
+        self.ball.draw(self.meshes)
+        
+    def finish_run(self):
+        self.player.stop()  # Stop the music
+
+        if self.simulation.distance_traveled > self.high_score:
+            self.high_score = self.simulation.distance_traveled
+            self.save_high_score()  # Save the new high score
+
+        self.save_points_collected()  # Save the points collected
+
+        # Show the restart button
+        self.restart_button.show()
+
+    def show_game_over_overlay(self):
+        glPushMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(-1.0, 1.0, -1.0, 1.0, -1.0, 1.0)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glEnable(GL_BLEND)
+
+        # Draw semi-transparent black rectangle to act as overlay
+        glColor4f(0.0, 0.0, 0.0, 0.6)
+        glBegin(GL_QUADS)
+        glVertex2f(-1, 1)
+        glVertex2f(1, 1)
+        glVertex2f(1, -1)
+        glVertex2f(-1, -1)
+        glEnd()
+
+        # Draw "GAME OVER!" text
+        glColor3f(1.0, 1.0, 1.0)
+        self.render_text("GAME OVER!", -0.19, - 0.01)
+
+        glDisable(GL_BLEND)
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_LIGHTING)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+
+    def show_game_won_overlay(self):
+        glPushMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(-1.0, 1.0, -1.0, 1.0, -1.0, 1.0)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glEnable(GL_BLEND)
+
+        # Draw semi-transparent black rectangle to act as overlay
+        glColor4f(0.0, 0.0, 0.0, 0.6)
+        glBegin(GL_QUADS)
+        glVertex2f(-1, 1)
+        glVertex2f(1, 1)
+        glVertex2f(1, -1)
+        glVertex2f(-1, -1)
+        glEnd()
+
+        # Draw "YOU WIN!" text
+        glColor3f(1.0, 1.0, 1.0)
+        self.render_text("YOU WIN!", -0.158, -0.01)
+
+        glDisable(GL_BLEND)
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_LIGHTING)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+
+    def draw_shadow(self):
+        self.ball.draw_shadow(self.meshes)
+
+    def drawBackground(self):
+        # Unlit and white under the background texture, as queued in paintGL
+        glBegin(GL_QUADS)
+        for texcoord, vertex in self.background_quad():
+            glTexCoord2f(*texcoord)
+            glVertex3f(*vertex)
+        glEnd()
+
+    def background_quad(self):
+        # Calculate aspect ratio of the background image
+        image_width = self.background_texture.width()
+        image_height = self.background_texture.height()
+        aspect_ratio = image_width / image_height
+
+        # Define texture coordinates and vertices to maintain aspect ratio
+        quad_height = 2.3
+
+        # Adjust this scaling factor to increase or decrease height
+        height_scaling_factor = 1.0  # Keep the height scaling factor the same
+        quad_height *= height_scaling_factor
+
+        # Define width scaling factor to make the background wider
+        width_scaling_factor = self.level['background']['width_scale']  # Increase this value to make the background wider
+
+        # Define quad width based on adjusted height and width scaling factor
+        quad_width = quad_height * aspect_ratio * width_scaling_factor
+
+        # Horizontal offset to move the background to the right
+        offset_x = self.level['background']['offset_x'] # Adjust this value if needed
+
+        return [
+            ((0.0, 1.0), (-quad_width + offset_x, -quad_height, -2)),  # Bottom-left corner
+            ((1.0, 1.0), (quad_width + offset_x, -quad_height, -2)),   # Bottom-right corner
+            ((1.0, 0.0), (quad_width + offset_x, quad_height, -2)),    # Top-right corner
+            ((0.0, 0.0), (-quad_width + offset_x, quad_height, -2)),   # Top-left corner
+        ]
+
+    def draw_score_bar(self):
+        glPushMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(-1.0, 1.0, -1.0, 1.0, -1.0, 1.0)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+
+        glColor3f(0.8, 0.8, 0.8)
+        glBegin(GL_QUADS)
+        glVertex2f(-0.95, 0.6)
+        glVertex2f(-0.65, 0.6)
+        glVertex2f(-0.65, 0.5)
+        glVertex2f(-0.95, 0.5)
+        glEnd()
+
+        glColor3f(0.0, 0.0, 0.0)
+        glLineWidth(2.0)
+        glBegin(GL_LINE_LOOP)
+        glVertex2f(-0.95, 0.6)
+        glVertex2f(-0.65, 0.6)
+        glVertex2f(-0.65, 0.5)
+        glVertex2f(-0.95, 0.5)
+        glEnd()
+
+        glColor3f(1.0, 1.0, 1.0)
+        for text, x, y in self.score_labels():
+            self.render_text(text, x, y)
+
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_LIGHTING)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+
+    def draw_progress(self):
+        glPushMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(-1.0, 1.0, -1.0, 1.0, -1.0, 1.0)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+
+        progress = self.progress()
+
+        progress_height_adjustment = 0.005
+
+        glColor3f(0.0, 0.5, 1.0)
+        glBegin(GL_QUADS)
+        glVertex2f(-0.95, 0.6 - progress_height_adjustment)
+        glVertex2f(-0.95 + 0.3 * progress, 0.6 - progress_height_adjustment)
+        glVertex2f(-0.95 + 0.3 * progress, 0.5 + progress_height_adjustment)
+        glVertex2f(-0.95, 0.5 + progress_height_adjustment)
+        glEnd()
+
+        glColor3f(1.0, 1.0, 1.0)
+        self.render_text(*self.distance_label())
+
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_LIGHTING)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        
+    def render_text(self, text, x, y):
+        self.text.draw(text, x, y)
+
+    def updateScene(self):
+        if self.running:
+            self.timestep.advance(self.tick)
+        else:
+            self.timestep.reset()
+        self.update()
+
+    def tick(self):
+        # One fixed simulation step: camera, distance, ball physics and scoring
+        if not self.running:
+            return
+        if self.replayer is not None:
+            events = self.replayer.step()
+        else:
+            events = self.simulation.step()
+        for kind, obstacle in events:
+            self.handle_simulation_event(kind)
+
+    def handle_simulation_event(self, kind):
+        if kind in (simulation.STAR_COLLECTED, simulation.SCENE_RESET):
+            self.points_collected_label.setText(f'Points Collected: {self.simulation.score}')
+        elif kind == simulation.GAME_OVER:
+            self.game_over = True
+            self.running = False
+            self.restart_button.show()
+            self.save_recording()
+        elif kind == simulation.GAME_WON:
+            self.game_won = True
+            self.running = False
+            self.restart_button.show()
+            self.save_recording()
+
+    def save_recording(self):
+        if self.replayer is None:
+            self.recorder.recording().save(replay.recording_file(self.level['scores']['last_run']))
+
+    def replay_last_run(self):
+        # The last run saved on this level, if it was made on the level as it is now
+        try:
+            recording = replay.Recording.load(replay.recording_file(self.level['scores']['last_run']))
+            self.start_replay(recording)
+        except (OSError, ValueError, TypeError):
+            pass  # No run saved yet, or not one this version can play
+
+    def start_replay(self, recording):
+        # Play a recorded run back through the live widget; keyboard input is ignored meanwhile
+        replay.check_version(recording)
+        self.restart_game()
+        self.replayer = replay.Replayer(recording, self.simulation)
+        self.running = True
+
+    def mousePressEvent(self, event):
+        # The restart button is hit-tested here when the HUD draws it
+        if self.restart_button in self.panels and self.restart_button.contains(event.pos()):
+            self.restart_button.click()
+            return
+        super().mousePressEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Space:
+            if self.replayer is not None and not (self.game_over or self.game_won):
+                return
+            if not self.running:
+                self.running = True  # Start the scene on the first spacebar press
+                self.waiting_for_start = False  # Set waiting_for_start to False
+            if not self.game_over:
+                self.recorder.jump()
+            else:
+                self.restart_game()
+        elif event.key() == Qt.Key_R and not self.running:
+            self.replay_last_run()  # Before starting or once a run has ended
+
+    def reset_scene(self):
+        self.simulation.reset_scene()
+        self.points_collected_label.setText(f'Points Collected: {self.simulation.score}')
+
+    def restart_game(self):
+        self.running = False
+        self.timestep.reset()
+        self.simulation.reset()  # Reset the ball, stars, score and distance traveled
+        self.recorder.reset()
+        self.replayer = None
+        self.restart_button.hide()
+        
+        self.points_collected = 0  # Reset the points collected
+        self.points_collected_label.setText(f'Points Collected: {self.points_collected}')
+        
+        self.game_over = False
+        self.game_won = False  # Reset game_won state
+
+        # Restart the music
+        self.player.stop()
+        self.playlist.setCurrentIndex(0)
+        self.player.play()
+        self.update()
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, level_name):
+        super(MainWindow, self).__init__()
+        self.setWindowTitle("3D Path with PyQt5")
+        self.opengl_widget = OpenGLWidget(level_name, self)
+        self.setCentralWidget(self.opengl_widget)
+        self.resize(800, 600)
+        self.opengl_widget.setFocus()
+
+def main(level_name='LEVEL1'):
+    app = QApplication(sys.argv)
+    window = MainWindow(level_name)
+    window.show()
+    sys.exit(app.exec_())
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'LEVEL1')
\ No newline at end of file
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+import time
+
+from simulation import Physics
+
+# Levels are data files in level_data/: obstacles, physics, palette, assets and score files.
+# Each is parsed once and stored compiled next to it (like .pyc files), keyed by the file's
+# hash, so later loads skip parsing. levels.LEVEL1 etc. load on first use.
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'level_data')
+CACHE_DIR = os.path.join(LEVEL_DIR, '__pycache__')
+OBSTACLES = ('blocks', 'stairs', 'stars', 'cones', 'half_spheres')
+COLOR_COLUMN = {'blocks': 4, 'stairs': 6, 'stars': 4, 'cones': 5, 'half_spheres': 4}
+FORMAT_VERSION = 1  # Of compile_level's output; bump whenever it changes so old caches are ignored
+
+_levels = {}
+
+def compile_level(source):
+    # Resolve palette names to color tuples; the result is plain data marshal can store
+    data = json.loads(source)
+    palette = {name: tuple(float(channel) for channel in color) for name, color in data['palette'].items()}
+    level = {key: value for key, value in data.items() if key not in OBSTACLES}
+    level['palette'] = palette
+    for key in OBSTACLES:
+        column = COLOR_COLUMN[key]
+        rows = []
+        for row in data.get(key, []):
+            rows.append(tuple(row[:column]) + (palette[row[column]],) + tuple(row[column + 1:]))
+        level[key] = rows
+    return level
+
+def load(filename):
+    with open(filename, 'rb') as file:
+        source = file.read()
+    digest = hashlib.sha256(source).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    cache_file = os.path.join(CACHE_DIR, f"{stem}.{digest}.v{FORMAT_VERSION}.marshal{marshal.version}")
+    try:
+        with open(cache_file, 'rb') as file:
+            level = marshal.loads(file.read())  # Much faster than marshal.load on a file
+    except (OSError, EOFError, ValueError, TypeError):
+        level = compile_level(source)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file, 'wb') as file:
+                file.write(marshal.dumps(level))
+            # Caches of earlier contents or formats of this file are never read again
+            for entry in os.listdir(CACHE_DIR):
+                if entry.startswith(stem + '.') and os.path.join(CACHE_DIR, entry) != cache_file:
+                    os.remove(os.path.join(CACHE_DIR, entry))
+        except OSError:
+            pass  # Read-only install: compile every time
+    level['physics'] = Physics(**level['physics'])
+    return level
+
+def level_file(name):
+    return os.path.join(LEVEL_DIR, name.lower() + '.json')
+
+def level_names():
+    return sorted(os.path.splitext(entry)[0].upper() for entry in os.listdir(LEVEL_DIR) if entry.endswith('.json'))
+
+def get(name):
+    if name not in _levels:
+        _levels[name] = load(level_file(name))
+    return _levels[name]
+
+def __getattr__(name):
+    if name.isupper() and os.path.exists(level_file(name)):
+        return get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def report(names):
+    # Compare reading and parsing each level file with loading its compiled form
+    for name in names or level_names():
+        filename = level_file(name)
+        load(filename)  # Make sure the compiled form exists
+        start = time.perf_counter()
+        for _ in range(100):
+            with open(filename, 'rb') as file:
+                compile_level(file.read())
+        parse_time = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        for _ in range(100):
+            load(filename)
+        load_time = (time.perf_counter() - start) / 100
+        print(f"{name}: parse {parse_time * 1e6:.0f} us, compiled load {load_time * 1e6:.0f} us")
+
+if __name__ == '__main__':
+    report(sys.argv[1:])
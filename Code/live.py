@@ -1,22 +1,23 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QLabel, QStackedWidget, QGraphicsDropShadowEffect
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QPixmap
-from OpenGL.GLUT import *
+from PyQt5.QtGui import QPainter
 
 from level_easy import EasyLevelWidget  
 from level_medium import MediumLevelWidget
 from level_hard import HardLevelWidget
+import pixmaps
 
 class BackgroundWidget(QWidget):
     def __init__(self, image_path, parent=None):
         super().__init__(parent)
         self.image_path = image_path
-        self.image = QPixmap(self.image_path)
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        scaled_image = self.image.scaled(self.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        # Scaled once per size and shared, not on every paint
+        scaled_image = pixmaps.cache.get(self.image_path, self.size(), Qt.KeepAspectRatioByExpanding,
+                                         Qt.SmoothTransformation)
         x = (self.width() - scaled_image.width()) // 2
         y = (self.height() - scaled_image.height()) // 2
         painter.drawPixmap(x, y, scaled_image)
@@ -127,7 +128,6 @@ class MyGameWindow(QMainWindow):
         self.setCentralWidget(self.live_widget)
 
 def main():
-    glutInit()  
     app = QApplication(sys.argv)
     window = MyGameWindow()
     window.show()
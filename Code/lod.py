@@ -0,0 +1,85 @@
+import math
+import os
+
+# Tessellation by size on screen. Each curved primitive uses the fewest segments whose flat
+# sides stay within TOLERANCE pixels of the true outline, never more than the detail it
+# was written with. The quality knob divides the tolerance: above 1 is finer, below coarser.
+
+QUALITY = float(os.environ.get('BOUNCING_BALL_QUALITY', '1.0'))
+TOLERANCE = 0.5  # Pixels between a segment and the curve it stands for, at quality 1
+SEGMENTS = (6, 8, 10, 12, 16, 20, 24)  # Coarser levels, tried before the primitive's own count
+
+def segments(radius_px, full, quality):
+    # Segments for a circle radius_px pixels across: the first level close enough, else full
+    tolerance = TOLERANCE / quality
+    for count in SEGMENTS:
+        if count < full and radius_px * (1 - math.cos(math.pi / count)) <= tolerance:
+            return count
+    return full
+
+class LevelOfDetail:
+    def __init__(self, quality=QUALITY, fovy=10.0, height=600, rail=(9.0, 10.0)):
+        self.quality = quality
+        self.fovy = fovy
+        self.rail = rail  # The camera's y and z; it only moves along x
+        self.eye = None
+        self.resize(height)
+
+    def resize(self, height):
+        # Pixels per world unit at distance 1
+        self.scale = height / (2 * math.tan(math.radians(self.fovy) / 2))
+
+    def look_from(self, eye):
+        self.eye = eye
+
+    def distance(self, position):
+        # From this frame's eye
+        return math.dist(self.eye, position)
+
+    def closest(self, position):
+        # Nearest the camera ever gets, for meshes baked once per level
+        return math.hypot(position[1] - self.rail[0], position[2] - self.rail[1])
+
+    def segments(self, radius, distance, full):
+        return segments(self.scale * radius / max(distance, 1e-6), full, self.quality)
+
+    def detail(self, kind, params, distance):
+        # The parameters of a meshes.py primitive with its tessellation cut to its size on
+        # screen; stacks follow slices so the proportions stay the same
+        if kind in ('sphere', 'half_sphere'):
+            radius, slices, stacks = params
+            count = self.segments(radius, distance, slices)
+            return radius, count, stacks * count // slices
+        if kind == 'cone':
+            base_radius, height, slices, stacks = params
+            count = self.segments(base_radius, distance, slices)
+            return base_radius, height, count, stacks * count // slices
+        if kind == 'circle':
+            radius, count = params
+            return radius, self.segments(radius, distance, count)
+        if kind == 'torus':
+            inner_radius, outer_radius, sides, rings = params
+            return (inner_radius, outer_radius, self.segments(inner_radius, distance, sides),
+                    self.segments(inner_radius + outer_radius, distance, rings))
+        return params
+
+    def lengths(self, kind, params):
+        # The world-space radii detail() sizes the primitive's segments by
+        if kind in ('sphere', 'half_sphere', 'cone', 'circle'):
+            return params[:1]
+        if kind == 'torus':
+            inner_radius, outer_radius = params[:2]
+            return inner_radius, inner_radius + outer_radius
+        return ()
+
+    def levels(self, kind, params):
+        # Every set of parameters detail() can return for the primitive, for building them
+        # up front. The choice only changes where some radius crosses a level's threshold, so
+        # sampling either side of each threshold for every length involved finds them all.
+        tolerance = TOLERANCE / self.quality
+        distances = {1e-6, math.inf}
+        for length in self.lengths(kind, params):
+            for count in SEGMENTS:
+                threshold = self.scale * length * (1 - math.cos(math.pi / count)) / tolerance
+                distances.update((threshold * 0.999, threshold * 1.001))
+        return sorted({self.detail(kind, params, distance) for distance in distances})
@@ -3,23 +3,25 @@ import os
 from OpenGL.GLUT import *
 from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QLabel, QHBoxLayout, QStackedWidget
 from PyQt5.QtCore import Qt, QUrl
-from PyQt5.QtGui import QPainter, QLinearGradient, QColor, QPixmap
+from PyQt5.QtGui import QPainter, QLinearGradient, QColor
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 
 from introduction import GLWidget as IntroductionWidget
 from how_to import OpenGLContent as HowToWidget
 from score import ScoreWidget  
 from live import LiveWidget
+import pixmaps
 
 class BackgroundWidget(QWidget):
     def __init__(self, image_path, parent=None):
         super().__init__(parent)
         self.image_path = image_path
-        self.image = QPixmap(self.image_path)
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        scaled_image = self.image.scaled(self.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        # Scaled once per size and shared, not on every paint
+        scaled_image = pixmaps.cache.get(self.image_path, self.size(), Qt.KeepAspectRatioByExpanding,
+                                         Qt.SmoothTransformation)
         x = (self.width() - scaled_image.width()) // 2
         y = (self.height() - scaled_image.height()) // 2
         painter.drawPixmap(x, y, scaled_image)
@@ -138,9 +140,11 @@ class MyGameWindow(QMainWindow):
             self.layout.removeItem(self.center_layout)
             self.center_layout = None
 
-        # Start the video update timer if the IntroductionWidget is displayed
+        # Play the intro video only while the IntroductionWidget is displayed
         if widget_class == IntroductionWidget:
             self.widgets[widget_class].start_video_timer()
+        elif IntroductionWidget in self.widgets:
+            self.widgets[IntroductionWidget].stop_video_timer()
 
         # Control music based on the button clicked
         if widget_class == LiveWidget:
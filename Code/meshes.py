@@ -0,0 +1,195 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from lod import LevelOfDetail
+
+# Primitive meshes generated once with numpy and kept in vertex buffers. The layouts follow
+# gluSphere, gluCylinder/gluDisk and glutSolidTorus so they look the same as before.
+
+def _quad_strips(first, second):
+    # Triangles for bands of quads between two rows of vertex indices, shape (bands, columns)
+    a, b = first[:, :-1], second[:, :-1]
+    c, d = first[:, 1:], second[:, 1:]
+    return np.stack([a, b, c, b, d, c], axis=-1).reshape(-1)
+
+def _ring(slices):
+    # sin/cos around a circle of slices steps, with the last entry closing it exactly
+    theta = 2 * np.pi * np.arange(slices + 1) / slices
+    sin, cos = np.sin(theta), np.cos(theta)
+    sin[-1], cos[-1] = sin[0], cos[0]
+    return sin, cos
+
+def sphere(radius, slices, stacks):
+    sin_t, cos_t = _ring(slices)
+    rho = np.pi * np.arange(stacks + 1) / stacks
+    sin_r, cos_r = np.sin(rho), np.cos(rho)
+    sin_r[0] = sin_r[-1] = 0.0
+    cos_r[-1] = -1.0
+    normals = np.stack(np.broadcast_arrays(sin_r[:, None] * sin_t, sin_r[:, None] * cos_t, cos_r[:, None]), -1)
+    s, t = np.meshgrid(1 - np.arange(slices + 1) / slices, 1 - np.arange(stacks + 1) / stacks)
+    grid = np.arange((stacks + 1) * (slices + 1)).reshape(stacks + 1, slices + 1)
+    return (GL_TRIANGLES, normals.reshape(-1, 3) * radius, normals.reshape(-1, 3), np.stack([s, t], -1).reshape(-1, 2),
+            _quad_strips(grid[1:], grid[:-1]))
+
+def cone(base_radius, height, slices, stacks):
+    # gluCylinder narrowing to a point plus its base disk, already turned to point along +y
+    sin_t, cos_t = _ring(slices)
+    level = np.arange(stacks + 1) / stacks
+    radius = base_radius * (1 - level)
+    length = np.hypot(base_radius, height)
+    side = np.stack(np.broadcast_arrays(radius[:, None] * sin_t, radius[:, None] * cos_t, height * level[:, None]), -1)
+    side_normals = np.stack(np.broadcast_arrays(sin_t * height / length, cos_t * height / length,
+                                                base_radius / length), -1)
+    side_normals = np.broadcast_to(side_normals, side.shape)
+    grid = np.arange((stacks + 1) * (slices + 1)).reshape(stacks + 1, slices + 1)
+    side_indices = _quad_strips(grid[:-1], grid[1:])
+
+    center = len(grid.flat)
+    rim = np.stack([base_radius * sin_t[::-1], base_radius * cos_t[::-1], np.zeros(slices + 1)], -1)
+    disk = np.concatenate([[[0.0, 0.0, 0.0]], rim])
+    ring = center + 1 + np.arange(slices + 1)
+    disk_indices = np.stack([np.full(slices, center), ring[:-1], ring[1:]], -1).reshape(-1)
+
+    vertices = np.concatenate([side.reshape(-1, 3), disk])
+    normals = np.concatenate([side_normals.reshape(-1, 3), np.tile([0.0, 0.0, 1.0], (slices + 2, 1))])
+    upright = [0, 2, 1]  # The old glRotatef(-90, 1, 0, 0): (x, y, z) -> (x, z, -y)
+    vertices, normals = vertices[:, upright], normals[:, upright]
+    vertices[:, 2] *= -1
+    normals[:, 2] *= -1
+    return GL_TRIANGLES, vertices, normals, None, np.concatenate([side_indices, disk_indices])
+
+def cone_edges(base_radius, height):
+    # Two slanted lines from the base to the tip
+    angles = np.array([0.0, np.pi + 0.3])
+    base = np.stack([base_radius * np.cos(angles), np.zeros(2), base_radius * np.sin(angles)], -1)
+    tip = np.tile([0.0, height, 0.0], (2, 1))
+    return GL_LINES, np.stack([base, tip], 1).reshape(-1, 3), None, None, None
+
+def circle(radius, segments):
+    angles = 2 * np.pi * np.arange(segments) / segments
+    vertices = np.stack([radius * np.cos(angles), np.zeros(segments), radius * np.sin(angles)], -1)
+    return GL_LINE_LOOP, vertices, None, None, None
+
+def half_sphere(radius, slices, stacks):
+    # The bands HalfSphere used to build per frame; latitude steps are 2 pi / stacks
+    sin_t, cos_t = _ring(slices)
+    theta = np.arange(stacks // 2 + 1) * 2 * np.pi / stacks - np.pi / 2
+    normals = np.stack(np.broadcast_arrays(np.cos(theta)[:, None] * cos_t, np.sin(theta)[:, None],
+                                           np.cos(theta)[:, None] * sin_t), -1).reshape(-1, 3)
+    grid = np.arange(len(theta) * (slices + 1)).reshape(len(theta), slices + 1)
+    return GL_TRIANGLES, normals * radius, normals, None, _quad_strips(grid[1:], grid[:-1])
+
+def star(points):
+    angles = 2 * np.pi * np.arange(points) / points
+    outer = np.stack([np.cos(angles), np.sin(angles), np.zeros(points)], -1)
+    skip = np.roll(outer, -2, axis=0)
+    vertices = np.stack([np.zeros((points, 3)), outer, skip], 1).reshape(-1, 3)
+    # Stars used to inherit the normal left over from the half-sphere strips, which pointed
+    # almost straight up; an explicit up normal keeps their shading without that coupling
+    normals = np.tile([0.0, 1.0, 0.0], (len(vertices), 1))
+    return GL_TRIANGLES, vertices, normals, None, None
+
+def torus(inner_radius, outer_radius, sides, rings):
+    # glutSolidTorus: rings around the z axis, sides around the tube
+    psi = 2 * np.pi * np.arange(rings) / rings
+    phi = -2 * np.pi * np.arange(sides) / sides
+    tube = outer_radius + np.cos(phi) * inner_radius
+    normals = np.stack(np.broadcast_arrays(np.cos(psi)[:, None] * np.cos(phi), np.sin(psi)[:, None] * np.cos(phi),
+                                           np.sin(phi)), -1).reshape(-1, 3)
+    vertices = np.stack(np.broadcast_arrays(np.cos(psi)[:, None] * tube, np.sin(psi)[:, None] * tube,
+                                            np.sin(phi) * inner_radius), -1).reshape(-1, 3)
+    j, i = np.meshgrid(np.arange(rings + 1) % rings, np.arange(sides + 1) % sides, indexing='ij')
+    grid = j * sides + i
+    return GL_TRIANGLES, vertices, normals, None, _quad_strips(grid.T[:-1], grid.T[1:])
+
+GENERATORS = {
+    'sphere': sphere,
+    'cone': cone,
+    'cone_edges': cone_edges,
+    'circle': circle,
+    'half_sphere': half_sphere,
+    'star': star,
+    'torus': torus,
+}
+
+class Mesh:
+    # One static vertex buffer (positions, then normals and texture coordinates if any)
+    # plus an optional index buffer, drawn with a single call
+    def __init__(self, mode, vertices, normals=None, texcoords=None, indices=None):
+        self.mode = mode
+        columns = [vertices] + [column for column in (normals, texcoords) if column is not None]
+        data = np.ascontiguousarray(np.concatenate(columns, axis=1), dtype=np.float32)
+        self.stride = data.shape[1] * 4
+        self.normal_offset = 12 if normals is not None else None
+        self.texcoord_offset = (24 if normals is not None else 12) if texcoords is not None else None
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.ibo = None
+        self.count = len(data)
+        if indices is not None:
+            indices = np.ascontiguousarray(indices, dtype=np.uint32)
+            self.ibo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            self.count = len(indices)
+
+    def draw(self):
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, self.stride, ctypes.c_void_p(0))
+        if self.normal_offset is not None:
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glNormalPointer(GL_FLOAT, self.stride, ctypes.c_void_p(self.normal_offset))
+        if self.texcoord_offset is not None:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glTexCoordPointer(2, GL_FLOAT, self.stride, ctypes.c_void_p(self.texcoord_offset))
+        if self.ibo is not None:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glDrawElements(self.mode, self.count, GL_UNSIGNED_INT, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        else:
+            glDrawArrays(self.mode, 0, self.count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def delete(self):
+        glDeleteBuffers(1, [self.vbo])
+        if self.ibo is not None:
+            glDeleteBuffers(1, [self.ibo])
+
+class MeshCache:
+    # The meshes of one GL context, keyed by (type, dimensions and tessellation) and built
+    # on first use, or up front for every level of detail with preload
+    def __init__(self, lod=None):
+        self.meshes = {}
+        self.lod = lod if lod is not None else LevelOfDetail()
+
+    def get(self, kind, *params):
+        key = (kind,) + params
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            mesh = self.meshes[key] = Mesh(*GENERATORS[kind](*params))
+        return mesh
+
+    def draw(self, kind, *params):
+        self.get(kind, *params).draw()
+
+    def draw_detailed(self, distance, kind, *params):
+        # The primitive tessellated for its size on screen from this far away
+        self.draw(kind, *self.lod.detail(kind, params, distance))
+
+    def preload(self, kind, *params):
+        for detailed in self.lod.levels(kind, params):
+            self.get(kind, *detailed)
+
+    def delete(self):
+        for mesh in self.meshes.values():
+            mesh.delete()
+        self.meshes.clear()
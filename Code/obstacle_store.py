@@ -0,0 +1,240 @@
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+class Palette:
+    # Colors shared by index instead of one list per obstacle
+    def __init__(self):
+        self.colors = []
+        self.indices = {}
+
+    def add(self, color):
+        color = tuple(float(channel) for channel in color)
+        if color not in self.indices:
+            self.indices[color] = len(self.colors)
+            self.colors.append(color)
+        return self.indices[color]
+
+def _geometry(values):
+    # float32 when that keeps every value exactly, else float64: levels are built with
+    # obstacles exactly touching the ball's path, so rounding an edge changes runs
+    narrow = np.array(values, dtype=np.float32)
+    wide = np.array(values, dtype=np.float64)
+    return narrow if np.array_equal(narrow, wide) else wide
+
+def _narrow(value):
+    # The nearest float32 value; generated levels put their geometry there
+    return float(np.float32(value))
+
+def _column(name):
+    # Reads and writes go through a memoryview of the column, which gives plain Python values
+    # far faster than indexing the numpy array
+    def get(self):
+        return self._memory[name][self._row]
+
+    def set(self, value):
+        self._memory[name][self._row] = value
+    return property(get, set)
+
+class ObstacleView:
+    # A lightweight handle on one row of an ObstacleTable, made only for an obstacle an event
+    # reports and not kept, so a compact course holds no Python object per obstacle
+    __slots__ = ('_table', '_memory', '_row')
+    extent_field = 'size'  # Half-width along x used by the broadphase
+
+    def __init__(self, table, row):
+        self._table = table
+        self._memory = table.memory
+        self._row = row
+
+    def __eq__(self, other):
+        return isinstance(other, ObstacleView) and self._table is other._table and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._table), self._row))
+
+    @property
+    def color(self):
+        return self._table.palette.colors[self._memory['color'][self._row]]
+
+    def x_extent(self):
+        return self._table.starts[self._row], self._table.ends[self._row]
+
+class BlockView(ObstacleView):
+    __slots__ = ()
+    fields = ('x', 'y', 'z', 'size')
+    flags = ()
+
+class StairView(ObstacleView):
+    __slots__ = ()
+    fields = ('x', 'y', 'z', 'size', 'height', 'depth')
+    flags = ()
+
+class StarView(ObstacleView):
+    __slots__ = ()
+    fields = ('x', 'y', 'z', 'size')
+    flags = ('collected',)
+
+class ConeView(ObstacleView):
+    __slots__ = ()
+    fields = ('x', 'y', 'z', 'base_radius', 'height')
+    flags = ('is_hanging',)
+    extent_field = 'base_radius'
+
+class HalfSphereView(ObstacleView):
+    __slots__ = ()
+    fields = ('x', 'y', 'z', 'radius')
+    flags = ()
+    extent_field = 'radius'
+
+for view_class in (BlockView, StairView, StarView, ConeView, HalfSphereView):
+    for name in view_class.fields + view_class.flags:
+        setattr(view_class, name, _column(name))
+
+class Bounds:
+    # One end of every row's x-extent, worked out from the x and extent columns when read
+    # instead of stored, so the broadphase can bisect and walk it like a list
+    def __init__(self, table, sign):
+        self.x = table.memory['x']
+        self.extent = table.memory[table.view_class.extent_field]
+        self.sign = sign
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, row):
+        return self.x[row] + self.sign * self.extent[row]
+
+class ObstacleTable:
+    # One obstacle category as contiguous columns: float32 geometry where exact, bool flags
+    # and a uint16 palette index per row. Rows are sorted by the start of their x-extent, the
+    # order SweepIndex keeps, with 'order' holding each row's position in the level's list.
+    def __init__(self, view_class, rows, palette):
+        self.view_class = view_class
+        self.palette = palette
+        columns = {}
+        for i, name in enumerate(view_class.fields):
+            columns[name] = _geometry([row[i] for row in rows])
+        color_at = len(view_class.fields)
+        columns['color'] = np.array([palette.add(row[color_at]) for row in rows], dtype=np.uint16)
+        for name in view_class.flags:
+            if name == 'is_hanging':
+                values = [len(row) > color_at + 1 and bool(row[color_at + 1]) for row in rows]
+            else:
+                values = [False] * len(rows)
+            columns[name] = np.array(values, dtype=np.bool_)
+        # Sort on the stored values, so the order agrees with the bounds read back later
+        starts = columns['x'].astype(np.float64) - columns[view_class.extent_field].astype(np.float64)
+        order = np.argsort(starts, kind='stable').astype(np.int32)
+        self.columns = {name: column[order] for name, column in columns.items()}
+        self.columns['order'] = order
+        self.memory = {name: memoryview(column) for name, column in self.columns.items()}
+        self.starts = Bounds(self, -1.0)
+        self.ends = Bounds(self, 1.0)
+
+    def __len__(self):
+        return len(self.columns['x'])
+
+    def __getitem__(self, row):
+        return self.view_class(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.view_class(self, row)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+class ObstacleStore:
+    def __init__(self, layout):
+        self.palette = Palette()
+        self.blocks = ObstacleTable(BlockView, layout['blocks'], self.palette)
+        self.stairs = ObstacleTable(StairView, layout['stairs'], self.palette)
+        self.stars = ObstacleTable(StarView, layout['stars'], self.palette)
+        self.cones = ObstacleTable(ConeView, layout['cones'], self.palette)
+        self.half_spheres = ObstacleTable(HalfSphereView, layout['half_spheres'], self.palette)
+
+    def tables(self):
+        return [self.blocks, self.stairs, self.stars, self.cones, self.half_spheres]
+
+    def __len__(self):
+        return sum(len(table) for table in self.tables())
+
+    @property
+    def nbytes(self):
+        return sum(table.nbytes for table in self.tables()) + 24 * 3 * len(self.palette.colors)
+
+def generate_layout(count, seed=0):
+    # A long random level, used to measure the store against plain obstacle objects
+    rng = random.Random(seed)
+    colors = [[1.0, 1.0, 0.5], [0.0, 0.0, 0.0], [0.8, 0.4, 0.6], [0.5, 0.0, 0.5]]
+    layout = {'blocks': [], 'stairs': [], 'stars': [], 'cones': [], 'half_spheres': []}
+    for i in range(count):
+        x = i * 0.2
+        kind = rng.randrange(5)
+        if kind == 0:
+            layout['blocks'].append((x, rng.choice([0.2, 0.9, 1.68]), 0.6, 0.2, list(colors[0])))
+        elif kind == 1:
+            layout['stairs'].append((x, rng.uniform(0.2, 0.8), 0.6, 0.2, rng.uniform(0.09, 0.3), 0.2, list(colors[1])))
+        elif kind == 2:
+            layout['stars'].append((x, rng.uniform(0.2, 0.9), 0.6, 0.1, list(colors[0])))
+        elif kind == 3:
+            hanging = rng.random() < 0.3
+            layout['cones'].append((x, 1.5 if hanging else 0.1, 0.6, 0.1, 0.3, list(colors[3 if hanging else 2]), hanging))
+        else:
+            layout['half_spheres'].append((x, 0.01, 0.5, 0.1, list(colors[0])))
+    for name, rows in layout.items():
+        layout[name] = [tuple(_narrow(value) if isinstance(value, float) else value for value in row)
+                        for row in rows]
+    return layout
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+def _step_time(course, physics, vectorized, steps=5000, repeat=3):
+    # Average time of a Simulation.step along the course, carrying on through deaths; the
+    # best of a few runs, as timeit reports
+    import simulation
+    best = math.inf
+    for _ in range(repeat):
+        sim = simulation.Simulation(course, physics, vectorized=vectorized)
+        start = time.perf_counter()
+        for _ in range(steps):
+            sim.step()
+            sim.outcome = None
+        best = min(best, (time.perf_counter() - start) / steps)
+        course.reset()
+    return best
+
+def report(count=100000):
+    # Whole courses, everything a Simulation needs: obstacles, broadphase, arrays and store.
+    # Compact courses always collide through the vectorized kernels.
+    import simulation
+
+    layout = generate_layout(count)
+    physics = simulation.Physics(finish_x=count * 0.2)
+    print(f"{count} obstacles")
+    for name, compact, vectorized in (('objects', False, False), ('objects+vectorized', False, True),
+                                      ('compact+vectorized', True, True)):
+        def build():
+            course = simulation.Course(layout, compact=compact)
+            if vectorized and course.arrays is None:
+                course.build_arrays()
+            return course
+        build()  # Leave one-off import and allocator free-list costs out
+        course, used = _measure(build)
+        print(f"  {name:18s}: {used / count:6.1f} bytes/obstacle, "
+              f"{_step_time(course, physics, vectorized) * 1e6:5.1f} us/step")
+
+if __name__ == '__main__':
+    report(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
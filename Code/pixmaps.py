@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+
+# Background images read once and scaled once per size, shared by every widget that shows
+# them. A repaint, such as a button's hover effect over a background, then only draws a
+# pixmap it already has. The least recently used pixmaps are dropped past BUDGET.
+
+BUDGET = 64 * 1024 * 1024  # Bytes of pixel data kept
+
+class PixmapCache:
+    def __init__(self, budget=BUDGET):
+        self.budget = budget
+        self.pixmaps = OrderedDict()  # (path, size, aspect, transform) -> QPixmap, oldest first
+        self.used = 0
+
+    def get(self, path, size=None, aspect=Qt.IgnoreAspectRatio, transform=Qt.SmoothTransformation):
+        # The image at path, scaled to size (a QSize) if given
+        key = (path, None if size is None else (size.width(), size.height()), aspect, transform)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            return pixmap
+        if size is None:
+            pixmap = QPixmap(path)
+        else:
+            pixmap = self.get(path).scaled(size, aspect, transform)
+        self.add(key, pixmap)
+        return pixmap
+
+    def add(self, key, pixmap):
+        self.pixmaps[key] = pixmap
+        self.used += nbytes(pixmap)
+        while self.used > self.budget and len(self.pixmaps) > 1:
+            _, oldest = self.pixmaps.popitem(last=False)
+            self.used -= nbytes(oldest)
+
+    def clear(self):
+        self.pixmaps.clear()
+        self.used = 0
+
+def nbytes(pixmap):
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+cache = PixmapCache()
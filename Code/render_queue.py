@@ -0,0 +1,128 @@
+from collections import namedtuple
+
+from OpenGL.GL import *
+
+# Draws are queued along with the GL state they need and submitted sorted by it: lit fills,
+# then unlit edges, then textured surfaces. Each state is set once per group rather than once
+# per object, and StateCache drops any call that would set what is already set. Everything
+# queued is depth tested and opaque, so the order does not change the picture.
+
+LIT, UNLIT, TEXTURED = 0, 1, 2  # Stages, in submission order
+
+WHITE = (1.0, 1.0, 1.0, 1.0)
+POLYGON_OFFSET = (1.0, 1.0)  # Factor and units that keep filled faces behind their edges
+
+State = namedtuple('State', 'stage lighting texture offset material color line_width')
+
+def rgba(color):
+    return tuple(color[:3]) + (color[3] if len(color) > 3 else 1.0,)
+
+def lit_fill(material, offset=False):
+    # Lit faces in a GL_AMBIENT_AND_DIFFUSE material, optionally pushed back behind their edges
+    return State(LIT, True, None, offset, rgba(material), None, None)
+
+def unlit(color, line_width=None):
+    return State(UNLIT, False, None, False, None, rgba(color), line_width)
+
+def textured(texture, material=None):
+    # Lit in the material when there is one, otherwise the plain image
+    if material is None:
+        return State(TEXTURED, False, texture, False, None, WHITE, None)
+    return State(TEXTURED, True, texture, False, rgba(material), None, None)
+
+def state_calls(state):
+    # The (key, value, function, args) calls that set state, what drawing with it on its own
+    # would take
+    calls = [(GL_LIGHTING, state.lighting, glEnable if state.lighting else glDisable, (GL_LIGHTING,)),
+             (GL_TEXTURE_2D, state.texture is not None, glEnable if state.texture is not None else glDisable,
+              (GL_TEXTURE_2D,))]
+    if state.texture is not None:
+        calls.append((GL_TEXTURE_BINDING_2D, state.texture, glBindTexture, (GL_TEXTURE_2D, state.texture)))
+    calls.append((GL_POLYGON_OFFSET_FILL, state.offset, glEnable if state.offset else glDisable,
+                  (GL_POLYGON_OFFSET_FILL,)))
+    if state.offset:
+        calls.append((GL_POLYGON_OFFSET_FACTOR, POLYGON_OFFSET, glPolygonOffset, POLYGON_OFFSET))
+    if state.material is not None:
+        calls.append((GL_AMBIENT_AND_DIFFUSE, state.material, glMaterialfv,
+                      (GL_FRONT, GL_AMBIENT_AND_DIFFUSE, state.material)))
+    if state.color is not None:
+        calls.append((GL_CURRENT_COLOR, state.color, glColor4f, state.color))
+    if state.line_width is not None:
+        calls.append((GL_LINE_WIDTH, state.line_width, glLineWidth, (state.line_width,)))
+    return calls
+
+def sort_key(state):
+    return (state.stage, state.offset, state.texture or 0, state.material or (), state.color or (),
+            state.line_width or 0.0)
+
+class StateCache:
+    # What this frame has set, so only changes reach GL. Counts the state calls the frame
+    # would have made with every draw setting its own state, and those actually issued.
+    def __init__(self):
+        self.current = {}
+        self.per_object = 0
+        self.issued = 0
+
+    def reset(self):
+        # Forget what is set; code outside the queue may have changed any of it
+        self.current.clear()
+        self.per_object = 0
+        self.issued = 0
+
+    def set(self, key, value, apply, *args):
+        if key in self.current and self.current[key] == value:
+            return
+        apply(*args)
+        self.current[key] = value
+        self.issued += 1
+
+    def capability(self, capability, enabled):
+        self.set(capability, enabled, glEnable if enabled else glDisable, capability)
+
+    def apply(self, state):
+        for key, value, apply, args in state_calls(state):
+            self.set(key, value, apply, *args)
+
+    def restore(self):
+        # What the rest of the frame expects: lighting on, no texture, white
+        self.capability(GL_LIGHTING, True)
+        self.set(GL_TEXTURE_BINDING_2D, 0, glBindTexture, GL_TEXTURE_2D, 0)
+        self.capability(GL_TEXTURE_2D, False)
+        self.capability(GL_POLYGON_OFFSET_FILL, False)
+        self.set(GL_CURRENT_COLOR, WHITE, glColor4f, *WHITE)
+
+class RenderQueue:
+    def __init__(self):
+        self.items = []
+
+    def submit(self, state, draw):
+        # draw is a display list id, or a callable that only issues geometry and transforms
+        self.items.append((state, draw))
+
+    def flush(self, cache):
+        # Sorted by state; runs of display lists in the same state go out as one glCallLists
+        cache.reset()
+        cache.per_object = sum(len(state_calls(state)) for state, draw in self.items)
+        self.items.sort(key=lambda item: sort_key(item[0]))
+        current = None
+        lists = []
+        for state, draw in self.items:
+            if state != current:
+                self.call_lists(lists)
+                cache.apply(state)
+                current = state
+            if callable(draw):
+                self.call_lists(lists)
+                draw()
+            else:
+                lists.append(draw)
+        self.call_lists(lists)
+        cache.restore()
+        self.items.clear()
+
+    def call_lists(self, lists):
+        if len(lists) == 1:
+            glCallList(lists[0])
+        elif lists:
+            glCallLists(lists)
+        lists.clear()
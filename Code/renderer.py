@@ -0,0 +1,632 @@
+import ctypes
+import itertools
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+import culling
+import meshes
+from broadphase import SlabIndex
+from instancing import link_program, static_buffer, unit_cube
+from timestep import lerp
+
+# Draws a level with GLSL programs instead of fixed-function state. Everything that
+# never moves is baked in world space into one vertex buffer when the level loads; the
+# ball, shadow, half spheres, stars, portal and score bar are instances whose matrices
+# and colors are computed with numpy and uploaded in a single call per frame. Both are kept
+# in x order so culling to the camera's slab only narrows each draw.
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute vec3 normal;
+attribute vec2 texcoord;
+attribute vec4 color;
+attribute float lit;
+attribute mat4 model;
+attribute mat3 normal_matrix;
+attribute vec4 instance_color;
+uniform mat4 view_projection;
+uniform mat3 view;  // Rotation part of the view, for normals
+uniform vec3 light_direction;
+uniform vec4 ambient;
+uniform vec4 diffuse;
+uniform vec4 specular;
+uniform float shininess;
+varying vec4 shade;
+varying vec2 uv;
+
+void main() {
+    gl_Position = view_projection * (model * vec4(position, 1.0));
+    uv = texcoord;
+    vec4 material = color * instance_color;
+    if (lit < 0.5) {
+        shade = material;
+        return;
+    }
+    // GL_LIGHT0 the way the fixed-function pipeline lights it. GL_NORMALIZE is off there,
+    // so the normal keeps whatever length the object's scale gives it.
+    vec3 n = view * (normal_matrix * normal);
+    float lambert = dot(n, light_direction);
+    vec4 result = ambient * material + max(lambert, 0.0) * diffuse * material;
+    if (lambert > 0.0 && shininess > 0.0) {
+        float highlight = max(dot(n, normalize(light_direction + vec3(0.0, 0.0, 1.0))), 0.0);
+        result += pow(highlight, shininess) * specular;
+    }
+    shade = clamp(vec4(result.rgb, material.a), 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+varying vec4 shade;
+
+void main() {
+    gl_FragColor = shade;
+}
+"""
+
+# Only the background and the ball are textured. They get their own program rather than a
+# branch, which software rasterizers pay for on every fragment.
+TEXTURED_FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D image;
+varying vec4 shade;
+varying vec2 uv;
+
+void main() {
+    gl_FragColor = shade * texture2D(image, uv);
+}
+"""
+
+# Per-vertex and per-instance attributes as (name, floats, locations)
+VERTEX_FORMAT = [('position', 3, 1), ('normal', 3, 1), ('texcoord', 2, 1), ('color', 4, 1), ('lit', 1, 1)]
+INSTANCE_FORMAT = [('model', 4, 4), ('normal_matrix', 3, 3), ('instance_color', 4, 1)]
+VERTEX_SIZE = sum(size * count for name, size, count in VERTEX_FORMAT)
+INSTANCE_SIZE = sum(size * count for name, size, count in INSTANCE_FORMAT)
+UNIFORMS = ('view_projection', 'view', 'light_direction', 'ambient', 'diffuse', 'specular', 'shininess', 'image')
+
+BALL_UNIT, BACKGROUND_UNIT = 1, 2  # Texture units the two images stay bound to
+THIN_LINE, THICK_LINE = 2.0, 3.0
+PIECE_WIDTH = 1.0  # The ground is baked in pieces this long so it can be culled too
+
+def attribute_locations():
+    # Fixed locations in format order, so both programs work with the same vertex arrays
+    locations, location = {}, 0
+    for name, size, count in VERTEX_FORMAT + INSTANCE_FORMAT:
+        locations[name] = location
+        location += count
+    return locations
+
+def translate(x, y, z):
+    matrix = np.identity(4)
+    matrix[:3, 3] = x, y, z
+    return matrix
+
+def scale(x, y, z):
+    return np.diag([x, y, z, 1.0])
+
+def rotate(angle, x, y, z):
+    # Same matrix as glRotatef
+    x, y, z = np.array([x, y, z], dtype=float) / math.sqrt(x * x + y * y + z * z)
+    c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    matrix = np.identity(4)
+    matrix[:3, :3] = [[x * x * (1 - c) + c, x * y * (1 - c) - z * s, x * z * (1 - c) + y * s],
+                      [y * x * (1 - c) + z * s, y * y * (1 - c) + c, y * z * (1 - c) - x * s],
+                      [x * z * (1 - c) - y * s, y * z * (1 - c) + x * s, z * z * (1 - c) + c]]
+    return matrix
+
+def look_at(eye, center, up):
+    # Same matrix as gluLookAt
+    eye = np.array(eye, dtype=float)
+    forward = np.array(center, dtype=float) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    matrix = np.identity(4)
+    matrix[:3, :3] = [side, np.cross(side, forward), -forward]
+    return matrix @ translate(*-eye)
+
+def perspective(fovy, aspect, near, far):
+    # Same matrix as gluPerspective
+    f = 1.0 / math.tan(math.radians(fovy) / 2)
+    return np.array([[f / aspect, 0, 0, 0],
+                     [0, f, 0, 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                     [0, 0, -1, 0]])
+
+def rgba(color):
+    return tuple(color[:3]) + (color[3] if len(color) > 3 else 1.0,)
+
+def vertices(positions, normals=None, texcoords=None, color=(1.0, 1.0, 1.0), lit=1.0):
+    data = np.zeros((len(positions), VERTEX_SIZE), dtype=np.float32)
+    data[:, 0:3] = positions
+    if normals is not None:
+        data[:, 3:6] = normals
+    if texcoords is not None:
+        data[:, 6:8] = texcoords
+    data[:, 8:12] = rgba(color)
+    data[:, 12] = lit
+    return data
+
+def transformed(data, matrix):
+    # Positions by the matrix and normals by its inverse transpose, like the modelview
+    data = data.copy()
+    data[:, 0:3] = data[:, 0:3] @ matrix[:3, :3].T + matrix[:3, 3]
+    data[:, 3:6] = data[:, 3:6] @ np.linalg.inv(matrix[:3, :3])
+    return data
+
+def primitive(kind, *params, color=(1.0, 1.0, 1.0), lit=1.0):
+    # A meshes.py primitive as vertices and triangle or line indices
+    mode, positions, normals, texcoords, indices = meshes.GENERATORS[kind](*params)
+    if indices is None:
+        indices = np.arange(len(positions))
+    if mode == GL_LINE_LOOP:
+        indices = np.stack([indices, np.roll(indices, -1)], -1).reshape(-1)
+    return vertices(positions, normals, texcoords, color, lit), np.asarray(indices)
+
+def quads(corners, normal, color, lit=1.0):
+    corners = np.array(corners, dtype=float).reshape(-1, 3)
+    first = np.arange(0, len(corners), 4)[:, None]
+    indices = (first + [0, 1, 2, 0, 2, 3]).reshape(-1)
+    return vertices(corners, np.tile(normal, (len(corners), 1)), color=color, lit=lit), indices
+
+def lines(segments, color):
+    segments = np.array(segments, dtype=float).reshape(-1, 3)
+    return vertices(segments, color=color, lit=0.0), np.arange(len(segments))
+
+def merge(parts):
+    data, indices, count = [], [], 0
+    for part_vertices, part_indices in parts:
+        data.append(part_vertices)
+        indices.append(part_indices + count)
+        count += len(part_vertices)
+    if not data:
+        return np.zeros((0, VERTEX_SIZE), dtype=np.float32), np.zeros(0, dtype=int)
+    return np.concatenate(data), np.concatenate(indices)
+
+def split_quad(quad, width):
+    # Pieces at most `width` long of a quad with two corners at each end of its x range
+    corners = np.array(quad, dtype=float)
+    if corners[0, 0] == corners[1, 0]:
+        corners = np.roll(corners, -1, axis=0)  # Start on an edge that runs along x
+    a, b, c, d = corners
+    steps = max(1, math.ceil(abs(b[0] - a[0]) / width))
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    near, far = a + t * (b - a), d + t * (c - d)
+    return [(near[i], near[i + 1], far[i + 1], far[i]) for i in range(steps)]
+
+def extent(points):
+    xs = [point[0] for point in points]
+    return min(xs), max(xs)
+
+def cuboid(matrix, color, edge_color):
+    # The instanced cube from instancing.py, placed in the world. Blocks were always drawn
+    # at their size with unit normals, so the normals are not scaled with the cube.
+    face_vertices, face_indices, edge_vertices, edge_indices = unit_cube()
+    faces = transformed(vertices(face_vertices[:, :3], face_vertices[:, 3:], color=color), matrix)
+    faces[:, 3:6] /= np.linalg.norm(faces[:, 3:6], axis=1, keepdims=True)
+    edges = transformed(vertices(edge_vertices[:, :3], color=edge_color, lit=0.0), matrix)
+    return (faces, face_indices), (edges, edge_indices)
+
+class Geometry:
+    # All vertices and indices of a level in one buffer pair; parts are index ranges along
+    # with the vertices they use
+    def __init__(self):
+        self.vertices = []
+        self.indices = []
+        self.vertex_count = 0
+        self.index_count = 0
+
+    def add(self, mode, part):
+        part_vertices, part_indices = part
+        first, start = self.index_count, self.vertex_count
+        self.vertices.append(part_vertices)
+        self.indices.append(part_indices + self.vertex_count)
+        self.vertex_count += len(part_vertices)
+        self.index_count += len(part_indices)
+        return mode, first, len(part_indices), start, max(self.vertex_count - 1, start)
+
+    def add_culled(self, mode, entries):
+        # (x extent, part) entries merged in x order, along with their SlabIndex and the
+        # index offset each one starts at
+        view = SlabIndex([entry_extent for entry_extent, part in entries])
+        parts = [entries[i][1] for i in view.order]
+        offsets = list(itertools.accumulate((len(indices) for part_vertices, indices in parts), initial=0))
+        return self.add(mode, merge(parts)), view, offsets
+
+    def upload(self):
+        data = np.ascontiguousarray(np.concatenate(self.vertices), dtype=np.float32)
+        indices = np.ascontiguousarray(np.concatenate(self.indices), dtype=np.uint32)
+        return static_buffer(GL_ARRAY_BUFFER, data), static_buffer(GL_ELEMENT_ARRAY_BUFFER, indices)
+
+class Batch:
+    # One draw: an index range of the level geometry over consecutive instance slots. A
+    # batch with a view draws only the run of its objects that overlaps the slab.
+    def __init__(self, vao, part, instances=1, view=None, offsets=None):
+        self.vao = vao
+        self.part = part
+        self.mode, self.first, self.count, self.start, self.end = part
+        self.instances = instances
+        self.view = view
+        self.offsets = offsets
+
+    def cull(self, slab):
+        start, end = self.view.window(slab)
+        self.first = self.part[1] + self.offsets[start]
+        self.count = self.offsets[end] - self.offsets[start]
+
+class ShaderRenderer:
+    def __init__(self, widget, ball_texture):
+        path = widget.path
+        self.locations = attribute_locations()
+        self.program = link_program(VERTEX_SHADER, FRAGMENT_SHADER, self.locations)
+        self.textured = link_program(VERTEX_SHADER, TEXTURED_FRAGMENT_SHADER, self.locations)
+        self.uniforms = {program: {name: glGetUniformLocation(program, name) for name in UNIFORMS}
+                         for program in (self.program, self.textured)}
+        self.vao = None
+
+        # Instance slots: the static geometry's identity, then everything that moves. Each
+        # frame the half spheres (grouped by radius) and stars on screen are packed to the
+        # front of their group's slots.
+        slots = ['static']
+        groups = {}
+        for i, half_sphere in enumerate(path.half_spheres):
+            groups.setdefault(half_sphere.radius, []).append(i)
+        group_slots = {}
+        for radius in sorted(groups):
+            group_slots[radius] = len(slots)
+            slots += ['half_sphere'] * len(groups[radius])
+        slots += ['star'] * len(path.stars)
+        slots += ['portal', 'shadow', 'ball', 'overlay', 'bar', 'border', 'progress']
+        self.slot = {name: slots.index(name) for name in set(slots)}
+        self.instances = np.zeros((len(slots), INSTANCE_SIZE), dtype=np.float32)
+        self.instance_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.instances.nbytes, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        geometry = Geometry()
+        background, static = self.bake(widget, geometry)
+        # Moving primitives at every level of detail, chosen between each frame
+        lod = widget.lod
+        def detailed(kind, params, lit=1.0):
+            return {detail: geometry.add(GL_TRIANGLES, primitive(kind, *detail, lit=lit))
+                    for detail in lod.levels(kind, params)}
+        self.ball_params, self.shadow_params = (widget.ball.radius, 30, 30), (widget.ball.radius, 32, 32)
+        self.portal_params = (0.09, 0.3, 30, 30)
+        half_sphere_parts = {radius: detailed('half_sphere', (radius, 30, 30)) for radius in groups}
+        star = geometry.add(GL_TRIANGLES, primitive('star', 5))
+        portal = detailed('torus', self.portal_params)
+        shadow = detailed('sphere', self.shadow_params, lit=0.0)
+        sphere = detailed('sphere', self.ball_params)
+        unit_square = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]
+        square = geometry.add(GL_TRIANGLES, quads(unit_square, (0, 0, 1), (1.0, 1.0, 1.0), lit=0.0))
+        outline = geometry.add(GL_LINES, lines([unit_square[i] for i in (0, 1, 1, 2, 2, 3, 3, 0)], (1.0, 1.0, 1.0)))
+        self.vertex_buffer, self.index_buffer = geometry.upload()
+
+        vaos = {}
+        def batch(part, slot, instances=1, view=None, offsets=None):
+            if slot not in vaos:
+                vaos[slot] = self.vertex_array(slot)
+            return Batch(vaos[slot], part, instances, view, offsets)
+        def detailed_batches(parts, slot):
+            return {detail: batch(part, slot) for detail, part in parts.items()}
+        self.background = batch(background, 0)
+        self.static = [batch(part, 0, view=view, offsets=offsets) for part, view, offsets in static]
+        # (batches by detail, first slot, members in x order, their SlabIndex) per half sphere radius
+        self.half_sphere_groups = []
+        for radius, members in sorted(groups.items()):
+            view = SlabIndex([path.half_spheres[i].x_extent() for i in members])
+            self.half_sphere_groups.append((detailed_batches(half_sphere_parts[radius], group_slots[radius]),
+                                            group_slots[radius], [members[i] for i in view.order], view))
+        self.stars = batch(star, self.slot['star']) if path.stars else None
+        self.portals = detailed_batches(portal, self.slot['portal'])
+        self.shadows = detailed_batches(shadow, self.slot['shadow'])
+        self.balls = detailed_batches(sphere, self.slot['ball'])
+        self.dynamic = []  # This frame's draws of what moves
+        self.ball = None
+        self.overlay = batch(square, self.slot['overlay'])
+        self.bar = batch(square, self.slot['bar'])
+        self.border = batch(outline, self.slot['border'])
+        self.progress = batch(square, self.slot['progress'])
+        self.vaos = list(vaos.values())
+
+        # Rows that never change, and the ones packed into place each frame
+        self.instances[0] = self.row(np.identity(4), (1.0, 1.0, 1.0))
+        self.half_sphere_rows = np.array([self.row(translate(half_sphere.x, half_sphere.y, half_sphere.z), (1.0, 1.0, 1.0))
+                                          for half_sphere in path.half_spheres]).reshape(-1, INSTANCE_SIZE)
+        self.star_rows = np.array([self.row(translate(star.x, star.y, star.z) @ scale(star.size, star.size, star.size),
+                                            (1.0, 1.0, 1.0)) for star in path.stars]).reshape(-1, INSTANCE_SIZE)
+        self.instances[self.slot['portal']] = self.row(translate(*path.portal['position']) @ rotate(90, 7, 90, 0),
+                                                       (1.0, 1.0, 1.0))
+        self.instances[self.slot['overlay']] = self.row(translate(-1, -1, 0) @ scale(2, 2, 1), (0.0, 0.0, 0.0, 0.6))
+        bar = translate(-0.95, 0.5, 0) @ scale(0.3, 0.1, 1)
+        self.instances[self.slot['bar']] = self.row(bar, (0.8, 0.8, 0.8))
+        self.instances[self.slot['border']] = self.row(bar, (0.0, 0.0, 0.0))
+
+        self.setup(widget, ball_texture)
+
+    @classmethod
+    def create(cls, widget, ball_texture):
+        # None when the context cannot run the program; the widget then draws fixed-function
+        if not (glGenVertexArrays and glDrawElementsInstanced and glVertexAttribDivisor):
+            return None
+        try:
+            return cls(widget, ball_texture)
+        except (GLError, RuntimeError):
+            return None
+
+    def bake(self, widget, geometry):
+        # Background, ground and the obstacles that never move, in world space, each with its
+        # x extent for culling. Faces that edges lie on go in the polygon-offset range so the
+        # edges stay on top.
+        path = widget.path
+        black, white = (0.0, 0.0, 0.0), (1.0, 1.0, 1.0)
+        background = []
+        offset_faces, faces, thin_lines, thick_lines = [], [], [], []
+        if widget.background_texture is not None:
+            texcoords, corners = zip(*widget.background_quad())
+            background.append((vertices(corners, texcoords=texcoords, lit=0.0), np.array([0, 1, 2, 0, 2, 3])))
+        for top_quad in path.top_quads():
+            for piece in split_quad(top_quad, PIECE_WIDTH):
+                offset_faces.append((extent(piece), quads(piece, (0, 1, 0), path.top_color)))
+                thin_lines.append((extent(piece), lines([piece[0], piece[1], piece[2], piece[3]], black)))
+        for side_quad in path.side_quads():
+            for piece in split_quad(side_quad, PIECE_WIDTH):
+                faces.append((extent(piece), quads(piece, (0, 1, 0), path.side_color)))
+        for block in path.blocks:
+            block_faces, block_edges = cuboid(translate(block.x, block.y, block.z) @
+                                              scale(block.size, block.size, block.size), block.color, black)
+            offset_faces.append((block.x_extent(), block_faces))
+            thick_lines.append((block.x_extent(), block_edges))
+        for stair in path.stairs:
+            stair_faces, stair_edges = cuboid(translate(stair.x, stair.y, stair.z) @
+                                              scale(stair.size, stair.height, stair.depth), black, white)
+            offset_faces.append((stair.x_extent(), stair_faces))
+            thin_lines.append((stair.x_extent(), stair_edges))
+        for cone in path.cones:
+            matrix = translate(cone.x, cone.y, cone.z)
+            upright = matrix @ rotate(180, 1, 0, 0) if cone.is_hanging else matrix
+            # Baked once, so detailed for the closest the camera gets
+            distance = widget.lod.closest((cone.x, cone.y, cone.z))
+            cone_faces, cone_indices = primitive('cone', *widget.lod.detail('cone', (cone.base_radius, cone.height, 30, 30),
+                                                                             distance), color=cone.color)
+            faces.append((cone.x_extent(), (transformed(cone_faces, upright), cone_indices)))
+            edges, edge_indices = primitive('cone_edges', cone.base_radius, cone.height, color=black, lit=0.0)
+            thick_lines.append((cone.x_extent(), (transformed(edges, upright), edge_indices)))
+            outline, outline_indices = primitive('circle', *widget.lod.detail('circle', (cone.base_radius, 30), distance),
+                                                 color=black, lit=0.0)
+            thin_lines.append((cone.x_extent(), (transformed(outline, matrix), outline_indices)))
+        return geometry.add(GL_TRIANGLES, merge(background)), \
+            [geometry.add_culled(GL_TRIANGLES, offset_faces), geometry.add_culled(GL_TRIANGLES, faces),
+             geometry.add_culled(GL_LINES, thick_lines), geometry.add_culled(GL_LINES, thin_lines)]
+
+    def vertex_array(self, slot):
+        # Vertex and index buffers plus the instance attributes starting at a slot
+        vao = glGenVertexArrays(1)
+        glBindVertexArray(vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        self.attributes(VERTEX_FORMAT, VERTEX_SIZE, 0, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        self.attributes(INSTANCE_FORMAT, INSTANCE_SIZE, slot * INSTANCE_SIZE * 4, 1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        return vao
+
+    def attributes(self, layout, stride, start, divisor):
+        offset = start
+        for name, size, count in layout:
+            location = self.locations[name]
+            for i in range(count):
+                glEnableVertexAttribArray(location + i)
+                glVertexAttribPointer(location + i, size, GL_FLOAT, GL_FALSE, stride * 4, ctypes.c_void_p(offset))
+                glVertexAttribDivisor(location + i, divisor)
+                offset += size * 4
+
+    def setup(self, widget, ball_texture):
+        # Lighting and material as initializeGL left them in the fixed-function state
+        light = glGetLightfv(GL_LIGHT0, GL_POSITION)[:3]
+        ambient = np.array(glGetFloatv(GL_LIGHT_MODEL_AMBIENT)) + glGetLightfv(GL_LIGHT0, GL_AMBIENT)
+        diffuse = glGetLightfv(GL_LIGHT0, GL_DIFFUSE)
+        # Stairs set a black specular material that every later draw inherits, so with
+        # stairs in the level nothing has a highlight
+        if widget.path.stairs:
+            specular, shininess = (0.0, 0.0, 0.0, 1.0), 0.0
+        else:
+            specular = np.array(glGetLightfv(GL_LIGHT0, GL_SPECULAR)) * glGetMaterialfv(GL_FRONT, GL_SPECULAR)
+            shininess = glGetMaterialfv(GL_FRONT, GL_SHININESS)[0]
+        for program, uniforms in self.uniforms.items():
+            glUseProgram(program)
+            glUniform3f(uniforms['light_direction'], *(light / np.linalg.norm(light)))
+            glUniform4f(uniforms['ambient'], *ambient)
+            glUniform4f(uniforms['diffuse'], *diffuse)
+            glUniform4f(uniforms['specular'], *specular)
+            glUniform1f(uniforms['shininess'], shininess)
+        glUseProgram(0)
+
+        # The textures stay bound to their own units for the life of the context
+        for unit, image in ((BALL_UNIT, ball_texture), (BACKGROUND_UNIT, widget.background_texture)):
+            glActiveTexture(GL_TEXTURE0 + unit)
+            glBindTexture(GL_TEXTURE_2D, image.textureId() if image is not None else 0)
+        glActiveTexture(GL_TEXTURE0)
+
+        # The text is drawn with fixed-function arrays in normalized coordinates, so the
+        # fixed-function matrices stay at identity and lighting stays off
+        glDisable(GL_LIGHTING)
+        glDisable(GL_TEXTURE_2D)
+        glPolygonOffset(1.0, 1.0)
+
+    def row(self, model, color):
+        row = np.zeros(INSTANCE_SIZE, dtype=np.float32)
+        row[0:16] = model.T.reshape(-1)
+        linear = model[:3, :3]
+        normal_matrix = np.linalg.inv(linear).T if abs(np.linalg.det(linear)) > 1e-12 else np.identity(3)
+        row[16:25] = normal_matrix.T.reshape(-1)
+        row[25:29] = rgba(color)
+        return row
+
+    def update(self, widget, alpha, slab):
+        # This frame's draws and instance rows: what is on screen, animated colors, the ball
+        # and the bar
+        path, ball, stats = widget.path, widget.ball, widget.path.stats
+        stats.reset()
+        for batch in self.static:
+            batch.cull(slab)
+        for name in ('blocks', 'stairs', 'cones'):
+            start, end = path.views[name].window(slab)
+            stats.add(end - start, len(path.views[name]) - (end - start))
+
+        lod = widget.lod
+        self.dynamic = []
+        for half_sphere in path.half_spheres:
+            half_sphere.update_color()  # Animates off screen too
+        for batches, first, members, view in self.half_sphere_groups:
+            start, end = view.window(slab)
+            visible = members[start:end]
+            self.instances[first:first + len(visible)] = self.half_sphere_rows[visible]
+            colors = [path.half_spheres[i].color for i in visible]
+            self.instances[first:first + len(visible), 25:28] = np.reshape(colors, (-1, 3))
+            stats.add(len(visible), len(members) - len(visible))
+            if visible:
+                # One draw for the group, as detailed as its nearest member needs
+                half_spheres = [path.half_spheres[i] for i in visible]
+                radius = half_spheres[0].radius
+                distance = min(lod.distance((half_sphere.x, half_sphere.y, half_sphere.z)) for half_sphere in half_spheres)
+                batch = batches[lod.detail('half_sphere', (radius, 30, 30), distance)]
+                batch.instances = len(visible)
+                self.dynamic.append(batch)
+        # Stars and the portal have no material of their own and inherit the last one set
+        inherited = path.inherited_color()[:3]
+        if self.stars is not None:
+            start, end = path.views['stars'].window(slab)
+            visible = [i for i in path.views['stars'].order[start:end] if not path.stars[i].collected]
+            first = self.slot['star']
+            self.instances[first:first + len(visible)] = self.star_rows[visible]
+            self.instances[first:first + len(visible), 25:28] = inherited
+            self.stars.instances = len(visible)
+            self.dynamic.append(self.stars)
+            stats.add(len(visible), len(path.stars) - (end - start))
+        self.instances[self.slot['portal'], 25:28] = inherited
+        if culling.overlaps(path.portal_extent, slab):
+            self.dynamic.append(self.portals[lod.detail('torus', self.portal_params, lod.distance(path.portal['position']))])
+            stats.add(1, 0)
+        else:
+            stats.add(0, 1)
+
+        x = lerp(ball.prev_x, ball.x, alpha)
+        shadow = (x - 0.05, ball.baseHeight - 0.08, ball.z)
+        self.instances[self.slot['shadow']] = self.row(translate(*shadow) @ scale(1.0, 0.0, 1.0), (0.0, 0.0, 0.0, 0.5))
+        self.dynamic.append(self.shadows[lod.detail('sphere', self.shadow_params, lod.distance(shadow))])
+        position = (x, lerp(ball.prev_y, ball.y, alpha), ball.z)
+        self.instances[self.slot['ball']] = self.row(
+            translate(*position) @ rotate(lerp(ball.prev_rotation_angle, ball.rotation_angle, alpha), 0, 0, 1), ball.color)
+        self.ball = self.balls[lod.detail('sphere', self.ball_params, lod.distance(position))]
+
+        progress = translate(-0.95, 0.505, 0) @ scale(0.3 * widget.progress(), 0.09, 1)
+        self.instances[self.slot['progress']] = self.row(progress, (0.0, 0.5, 1.0))
+
+    def draw(self, batch):
+        if not (batch.count and batch.instances):
+            return  # Culled entirely
+        if batch.vao != self.vao:
+            glBindVertexArray(batch.vao)
+            self.vao = batch.vao
+        offset = ctypes.c_void_p(batch.first * 4)
+        if batch.instances == 1:
+            # Bounded draws let the driver transform only this part's vertices
+            glDrawRangeElements(batch.mode, batch.start, batch.end, batch.count, GL_UNSIGNED_INT, offset)
+        else:
+            glDrawElementsInstanced(batch.mode, batch.count, GL_UNSIGNED_INT, offset, batch.instances)
+
+    def camera(self, program, view_projection, view):
+        glUniformMatrix4fv(self.uniforms[program]['view_projection'], 1, GL_TRUE, view_projection)
+        glUniformMatrix3fv(self.uniforms[program]['view'], 1, GL_TRUE, view)
+
+    def paint(self, widget, alpha, view, slab):
+        self.update(widget, alpha, slab)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        # New storage each frame rather than a sub-update, so the upload never waits for
+        # the previous frame's draws to finish reading the old rows
+        glBufferData(GL_ARRAY_BUFFER, self.instances.nbytes, self.instances, GL_STREAM_DRAW)
+        view_projection = (widget.projection @ view).astype(np.float32)
+        view = view[:3, :3].astype(np.float32)
+
+        # The two textured draws first, then everything else untextured
+        offset_faces, faces, thick_lines, thin_lines = self.static
+        glUseProgram(self.textured)
+        self.camera(self.textured, view_projection, view)
+        image = self.uniforms[self.textured]['image']
+        glUniform1i(image, BACKGROUND_UNIT)
+        self.draw(self.background)
+        glUniform1i(image, BALL_UNIT)
+        self.draw(self.ball)
+
+        glUseProgram(self.program)
+        self.camera(self.program, view_projection, view)
+        glEnable(GL_POLYGON_OFFSET_FILL)
+        self.draw(offset_faces)
+        glDisable(GL_POLYGON_OFFSET_FILL)
+        self.draw(faces)
+        glLineWidth(THICK_LINE)
+        self.draw(thick_lines)
+        glLineWidth(THIN_LINE)
+        self.draw(thin_lines)
+        for batch in self.dynamic:
+            self.draw(batch)
+
+        glBindVertexArray(0)
+        self.vao = None
+        glUseProgram(0)
+
+        widget.paint_hud(lambda: self.draw_hud(widget), lambda: self.draw_live_hud(widget))
+        glFlush()
+
+    def draw_hud(self, widget):
+        # Score bar and overlays in normalized device coordinates
+        glUseProgram(self.program)
+        glUniformMatrix4fv(self.uniforms[self.program]['view_projection'], 1, GL_TRUE, np.identity(4, dtype=np.float32))
+        glDisable(GL_DEPTH_TEST)
+        message = 'GAME OVER!' if widget.game_over else 'YOU WIN!' if widget.game_won else None
+        if message is not None:
+            glEnable(GL_BLEND)
+            self.draw(self.overlay)
+            glDisable(GL_BLEND)
+        self.draw(self.bar)
+        glLineWidth(THIN_LINE)
+        self.draw(self.border)
+        glBindVertexArray(0)
+        self.vao = None
+        glUseProgram(0)
+
+        glColor3f(1.0, 1.0, 1.0)
+        if message is not None:
+            widget.text.draw(message, -0.19 if widget.game_over else -0.158, -0.01)
+        for text, x, y in widget.score_labels():
+            widget.text.draw(text, x, y)
+        widget.draw_panels()
+        glEnable(GL_DEPTH_TEST)
+
+    def draw_live_hud(self, widget):
+        # The progress fill and distance, which change every tick, over the retained HUD
+        glUseProgram(self.program)
+        glUniformMatrix4fv(self.uniforms[self.program]['view_projection'], 1, GL_TRUE, np.identity(4, dtype=np.float32))
+        glDisable(GL_DEPTH_TEST)
+        self.draw(self.progress)
+        glBindVertexArray(0)
+        self.vao = None
+        glUseProgram(0)
+
+        glColor3f(1.0, 1.0, 1.0)
+        widget.text.draw(*widget.distance_label())
+        glEnable(GL_DEPTH_TEST)
+
+    def delete(self):
+        glDeleteVertexArrays(len(self.vaos), self.vaos)
+        glDeleteBuffers(3, [self.vertex_buffer, self.index_buffer, self.instance_buffer])
+        glDeleteProgram(self.program)
+        glDeleteProgram(self.textured)
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sys
+import time
+
+import levels
+import simulation
+from timestep import TICK_RATE
+
+FORMAT_VERSION = 1
+# The game's directory, where it is started from and writes its score files. Recordings go
+# here whatever the working directory is.
+RECORDING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def level_version(layout):
+    # Hash of the obstacle layout and physics, so a recording is only replayed on the
+    # exact level it was made on. Assets and labels may change freely.
+    content = [(key, layout[key]) for key in sorted(levels.OBSTACLES)]
+    content.append(('physics', sorted(vars(layout['physics']).items())))
+    return hashlib.sha256(repr(content).encode()).hexdigest()[:16]
+
+class Recording:
+    # A run as the ticks on which jump was pressed plus the result it produced.
+    # A press between ticks N-1 and N is stored as tick N - 1 (the simulation's tick
+    # count at the time) and applied at the start of the next step, exactly as live.
+    def __init__(self, level, version, jump_ticks=(), ticks=0, outcome=None, score=0,
+                 distance_traveled=0.0):
+        self.level = level
+        self.version = version
+        self.jump_ticks = list(jump_ticks)
+        self.ticks = ticks
+        self.outcome = outcome
+        self.score = score
+        self.distance_traveled = distance_traveled
+
+    def result(self):
+        return self.ticks, self.outcome, self.score, self.distance_traveled
+
+    def save(self, filename):
+        data = dict(vars(self), format=FORMAT_VERSION)
+        with open(filename, 'w') as file:
+            json.dump(data, file)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r') as file:
+            data = json.load(file)
+        if data.pop('format', None) != FORMAT_VERSION:
+            raise ValueError(f"{filename}: unsupported recording format")
+        return cls(**data)
+
+class Recorder:
+    def __init__(self, simulation, level):
+        self.simulation = simulation
+        self.level = level
+        self.jump_ticks = []
+
+    def jump(self):
+        if self.simulation.outcome is not None:
+            return
+        tick = self.simulation.ticks
+        if not self.jump_ticks or self.jump_ticks[-1] != tick:  # Repeated presses within a tick act once
+            self.jump_ticks.append(tick)
+        self.simulation.jump()
+
+    def reset(self):
+        self.jump_ticks = []
+
+    def recording(self):
+        sim = self.simulation
+        return Recording(self.level, level_version(getattr(levels, self.level)), self.jump_ticks,
+                         sim.ticks, sim.outcome, sim.score, sim.distance_traveled)
+
+class Replayer:
+    # Feeds a recording's jumps back into a simulation one tick at a time, for live playback
+    def __init__(self, recording, simulation):
+        check_version(recording)
+        self.recording = recording
+        self.simulation = simulation
+        self.jump_ticks = set(recording.jump_ticks)
+
+    @property
+    def finished(self):
+        return self.simulation.outcome is not None or self.simulation.ticks >= self.recording.ticks
+
+    def step(self):
+        if self.finished:
+            return []
+        return self.simulation.step(self.simulation.ticks in self.jump_ticks)
+
+def recording_file(name):
+    return os.path.join(RECORDING_DIR, name)
+
+def check_version(recording):
+    if level_version(getattr(levels, recording.level)) != recording.version:
+        raise ValueError(f"recording was made on a different version of {recording.level}")
+
+def replay(recording, vectorized=False):
+    # Headless playback, as fast as the simulation can tick
+    check_version(recording)
+    layout = getattr(levels, recording.level)
+    sim = simulation.Simulation(simulation.Course(layout), layout['physics'], vectorized=vectorized)
+    sim.run(recording.jump_ticks, max_ticks=recording.ticks)
+    return sim
+
+def verify(recording, vectorized=False):
+    sim = replay(recording, vectorized)
+    return (sim.ticks, sim.outcome, sim.score, sim.distance_traveled) == recording.result()
+
+def main(filenames):
+    ok = True
+    for filename in filenames:
+        recording = Recording.load(filename)
+        start = time.perf_counter()
+        matched = verify(recording)
+        elapsed = time.perf_counter() - start
+        ok = ok and matched
+        speedup = (recording.ticks / TICK_RATE) / elapsed if elapsed > 0 else float('inf')
+        print(f"{filename}: {recording.level} {recording.outcome} score {recording.score} "
+              f"in {recording.ticks} ticks - {'ok' if matched else 'MISMATCH'} "
+              f"({elapsed * 1e3:.1f} ms, {speedup:.0f}x real time)")
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,9 +1,11 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout
-from PyQt5.QtGui import QPixmap, QPainter, QPen, QBrush, QFont, QPainterPath, QColor, QFontMetrics
+from PyQt5.QtGui import QPainter, QPen, QBrush, QFont, QPainterPath, QColor, QFontMetrics
 from PyQt5.QtCore import Qt, QRectF, QTimer
 from PyQt5.QtWidgets import QSpacerItem, QSizePolicy
 
+import pixmaps
+
 class BackgroundWidget(QWidget):
     def __init__(self, image_path, parent=None):
         super().__init__(parent)
@@ -11,8 +13,9 @@ class BackgroundWidget(QWidget):
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        pixmap = QPixmap(self.image_path)
-        painter.drawPixmap(self.rect(), pixmap)
+        # Read and stretched once per size and shared, not on every paint
+        pixmap = pixmaps.cache.get(self.image_path, self.size(), Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        painter.drawPixmap(0, 0, pixmap)
         
 class OutlinedLabel(QLabel):
     def __init__(self, text, parent=None):
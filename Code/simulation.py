@@ -0,0 +1,515 @@
+import math
+
+import continuous
+import kernels
+from broadphase import SweepIndex, TableIndex
+from obstacle_store import ObstacleStore
+
+# Outcome events emitted by Simulation.step, as (kind, obstacle) tuples
+STAR_COLLECTED = 'star_collected'
+GAME_OVER = 'game_over'
+GAME_WON = 'game_won'
+SCENE_RESET = 'scene_reset'
+
+STAR_POINTS = 10
+BROADPHASE_MARGIN = 1e-6  # Pad query windows so float rounding never drops a touching obstacle
+
+class Physics:
+    def __init__(self, gravity=-0.007, horizontal_speed=0.02, jump_velocity=0.113,
+                 double_jump_velocity=0.09 * 2, finish_x=15, start_x=1.2,
+                 stair_landing_offset=0.1, stair_uses_depth=True, fall_velocity=None):
+        self.gravity = gravity
+        self.horizontal_speed = horizontal_speed
+        self.jump_velocity = jump_velocity  # Initial velocity of a normal jump
+        self.double_jump_velocity = double_jump_velocity  # Bounce off a half sphere
+        self.finish_x = finish_x  # The portal: passing this x wins the level
+        self.start_x = start_x
+        self.stair_landing_offset = stair_landing_offset
+        self.stair_uses_depth = stair_uses_depth  # Stair z-extent is depth / 2 (LEVEL1) or width (LEVEL2/3)
+        # Constant drop per tick when falling off a stair without jumping
+        self.fall_velocity = gravity * 15 if fall_velocity is None else fall_velocity
+
+    def replace(self, **changes):
+        # A copy with some constants changed, e.g. a tuned jump_velocity or gravity
+        values = dict(vars(self), **changes)
+        if 'gravity' in changes and 'fall_velocity' not in changes:
+            values['fall_velocity'] = None  # Keep following gravity
+        return Physics(**values)
+
+    def coarse(self, factor):
+        # The same motion with ticks `factor` times longer: velocities scale with the
+        # tick length and gravity with its square. Pair with swept collision. Jump arcs are
+        # integrated in fewer, longer steps, so outcomes approximate the live game's.
+        return Physics(gravity=self.gravity * factor * factor,
+                       horizontal_speed=self.horizontal_speed * factor,
+                       jump_velocity=self.jump_velocity * factor,
+                       double_jump_velocity=self.double_jump_velocity * factor,
+                       finish_x=self.finish_x, start_x=self.start_x,
+                       stair_landing_offset=self.stair_landing_offset,
+                       stair_uses_depth=self.stair_uses_depth,
+                       fall_velocity=self.fall_velocity * factor)
+
+class Star:
+    __slots__ = ('x', 'y', 'z', 'size', 'color', 'collected')
+
+    def __init__(self, x, y, z, size, color):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.size = size
+        self.color = color
+        self.collected = False  # Flag to check if the star is collected
+
+    def x_extent(self):
+        return self.x - self.size, self.x + self.size
+
+class Block:
+    __slots__ = ('x', 'y', 'z', 'size', 'color')
+
+    def __init__(self, x, y, z, size, color):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.size = size
+        self.color = color
+
+    def x_extent(self):
+        # Collision treats size as a half-width around the ball's center
+        return self.x - self.size, self.x + self.size
+
+class StairBlock(Block):
+    __slots__ = ('height', 'depth')
+
+    def __init__(self, x, y, z, width, height, depth, color):
+        super().__init__(x, y, z, width, color)
+        self.height = height
+        self.depth = depth
+
+class Cone:
+    __slots__ = ('x', 'y', 'z', 'base_radius', 'height', 'color', 'is_hanging')
+
+    def __init__(self, x, y, z, base_radius, height, color, is_hanging=False):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.base_radius = base_radius
+        self.height = height
+        self.color = color
+        self.is_hanging = is_hanging  # Hanging cones point down from y
+
+    def x_extent(self):
+        return self.x - self.base_radius, self.x + self.base_radius
+
+class HalfSphere:
+    __slots__ = ('x', 'y', 'z', 'radius', 'color')
+
+    def __init__(self, x, y, z, radius, color):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.radius = radius
+        self.color = color
+
+    def x_extent(self):
+        return self.x - self.radius, self.x + self.radius
+
+class Course:
+    # Subclasses (the GL Path) swap these for classes that know how to draw themselves
+    block_class = Block
+    stair_class = StairBlock
+    star_class = Star
+    cone_class = Cone
+    half_sphere_class = HalfSphere
+
+    def __init__(self, layout, compact=False):
+        if compact:
+            # Obstacles stay rows of contiguous columns, for large generated levels: the
+            # broadphase and the vectorized kernels read the columns, and only obstacles an
+            # event reports become (short-lived) views. Each category iterates in x order,
+            # not level order.
+            self.store = ObstacleStore(layout)
+            self.blocks = self.store.blocks
+            self.stairs = self.store.stairs
+            self.stars = self.store.stars
+            self.cones = self.store.cones
+            self.half_spheres = self.store.half_spheres
+        else:
+            self.store = None
+            self.blocks = [self.block_class(*args) for args in layout['blocks']]
+            self.stairs = [self.stair_class(*args) for args in layout['stairs']]
+            self.stars = [self.star_class(*args) for args in layout['stars']]
+            self.cones = [self.cone_class(*args) for args in layout['cones']]
+            self.half_spheres = [self.half_sphere_class(*args) for args in layout['half_spheres']]
+        self.build_index()
+        self.arrays = None  # Filled in by build_arrays for vectorized collision
+        if self.store is not None:
+            self.build_arrays()  # Shares the columns, no copies
+
+    def build_index(self):
+        # Broadphase over x for each obstacle category
+        if self.store is not None:
+            self.block_index = TableIndex(self.blocks)
+            self.stair_index = TableIndex(self.stairs)
+            self.star_index = TableIndex(self.stars)
+            self.cone_index = TableIndex(self.cones)
+            self.half_sphere_index = TableIndex(self.half_spheres)
+            return
+        self.block_index = SweepIndex(self.blocks)
+        self.stair_index = SweepIndex(self.stairs)
+        self.star_index = SweepIndex(self.stars)
+        self.cone_index = SweepIndex(self.cones)
+        self.half_sphere_index = SweepIndex(self.half_spheres)
+
+    def build_arrays(self):
+        self.arrays = kernels.ObstacleArrays(self)
+
+    def reset(self):
+        if self.store is not None:
+            self.store.stars.columns['collected'][:] = False
+            return
+        for star in self.stars:
+            star.collected = False  # Reset stars collection status
+
+class Ball:
+    def __init__(self, r, h, x, z, path, physics):
+        self.radius = r
+        self.maximumHeight = h
+        self.baseHeight = h
+        self.y = h
+        self.x = x
+        self.z = z + 0.05
+        self.path = path
+        self.physics = physics
+        self.jumping = False
+        self.jump_velocity = 0.0
+        self.gravity = physics.gravity
+        self.horizontal_speed = physics.horizontal_speed
+        self.rotation_angle = 0
+        self.prev_x = self.x  # State at the previous tick, for render interpolation
+        self.prev_y = self.y
+        self.prev_rotation_angle = 0
+        self.waiting_for_start = False
+        self.on_block_or_stair = False
+        self.swept = False  # Continuous collision along each tick's motion segment
+
+    def update(self):
+        # Advance one tick and return the outcome events it produced
+        events = []
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.prev_rotation_angle = self.rotation_angle
+
+        self.on_block_or_stair = False  # Reset the flag
+
+        self.x += self.horizontal_speed
+        self.rotation_angle += 10
+
+        if self.x > self.physics.finish_x:
+            events.append((GAME_WON, None))
+            return events
+
+        if self.jumping:
+            self.y += self.jump_velocity
+            self.jump_velocity += self.gravity
+            if self.y <= self.baseHeight:
+                self.y = self.baseHeight
+                self.jumping = False
+                self.jump_velocity = 0.0
+
+        if self.swept:
+            self.collide_swept(events)
+        elif self.path.arrays is not None:
+            self.collide_arrays(events)
+        else:
+            self.collide(events)
+        return events
+
+    def window(self):
+        # Only obstacles overlapping the ball's x-window can collide this tick
+        return self.x - self.radius - BROADPHASE_MARGIN, self.x + self.radius + BROADPHASE_MARGIN
+
+    def collide(self, events):
+        lo, hi = self.window()
+
+        # Collision detection with blocks
+        for block in self.path.block_index.query(lo, hi):
+            if (block.x - block.size < self.x < block.x + block.size and
+                block.y - block.size < self.y < block.y + block.size and
+                block.z - block.size < self.z < block.z + block.size):
+                events.append((GAME_OVER, block))
+                break
+
+        # Collision detection with stairs
+        for stair in self.path.stair_index.query(lo, hi):
+            half_depth = stair.depth / 2 if self.physics.stair_uses_depth else stair.size
+            if (stair.x - stair.size < self.x < stair.x + stair.size and
+                stair.z - half_depth < self.z < stair.z + half_depth):
+                if stair.y <= self.y <= stair.y + stair.height:
+                    self.on_block_or_stair = True
+                    if self.y > stair.y + stair.height - self.radius:
+                        self.y = stair.y + stair.height - self.radius + self.physics.stair_landing_offset
+                        self.jumping = False  # End the jumping state upon landing
+                        self.jump_velocity = 0.0
+                        break
+
+        self.settle()
+
+        # Collision detection with stars
+        for star in self.path.star_index.query(lo, hi):
+            if not star.collected:
+                distance = math.sqrt((self.x - star.x) ** 2 + (self.y - star.y) ** 2 + (self.z - star.z) ** 2)
+                if distance < self.radius + star.size:
+                    star.collected = True
+                    events.append((STAR_COLLECTED, star))
+
+        for cone in self.path.cone_index.query(lo, hi):
+            if (self.x - cone.x)**2 + (self.z - cone.z)**2 < (self.radius + cone.base_radius)**2:
+                if cone.is_hanging:
+                    if cone.y - cone.height < self.y < cone.y:
+                        events.append((GAME_OVER, cone))
+                        break
+                else:
+                    if self.y < cone.y + cone.height:
+                        events.append((GAME_OVER, cone))
+                        break
+
+        for half_sphere in self.path.half_sphere_index.query(lo, hi):
+            if (self.x - half_sphere.x)**2 + (self.z - half_sphere.z)**2 < (self.radius + half_sphere.radius)**2:
+                if self.y <= half_sphere.y + half_sphere.radius:
+                    self.double_jump()
+
+    def settle(self):
+        # Apply gravity if the ball is not on any block or stair and is above the base height
+        if not self.on_block_or_stair and not self.jumping:
+            self.y += self.physics.fall_velocity
+            if self.y <= self.baseHeight:
+                self.y = self.baseHeight
+                self.jump_velocity = 0.0
+
+        # Allow jumping if on a block or stair
+        if self.on_block_or_stair and not self.jumping:
+            self.jump_velocity = 0.0  # Ensure jump velocity is reset when landing
+
+    def collide_arrays(self, events):
+        # Same rules as collide, evaluated by the vectorized kernels over the broadphase window.
+        # A kernel only runs while the ball is inside its window's bounding box.
+        path = self.path
+        lo, hi = self.window()
+        reach = self.radius + BROADPHASE_MARGIN
+
+        blocks = path.arrays.blocks.window(*path.block_index.window(lo, hi))
+        if kernels.near(blocks.box, self.x, self.y, reach):
+            for i in kernels.hits_in_order(blocks, kernels.block_hits(blocks, self.x, self.y, self.z))[:1]:
+                events.append((GAME_OVER, blocks.item(i)))
+
+        stairs = path.arrays.stairs.window(*path.stair_index.window(lo, hi))
+        if kernels.near(stairs.box, self.x, self.y, reach):
+            inside, landing = kernels.stair_contacts(stairs, self.x, self.y, self.z, self.radius,
+                                                     self.physics.stair_uses_depth)
+            if kernels.any_hits(inside):
+                self.on_block_or_stair = True
+                for i in kernels.hits_in_order(stairs, landing)[:1]:
+                    top = stairs.y[i].item() + stairs.height[i].item()
+                    self.y = top - self.radius + self.physics.stair_landing_offset
+                    self.jumping = False  # End the jumping state upon landing
+                    self.jump_velocity = 0.0
+
+        self.settle()
+
+        stars = path.arrays.stars.window(*path.star_index.window(lo, hi))
+        if kernels.near(stars.box, self.x, self.y, reach):
+            for i in kernels.hits_in_order(stars, kernels.star_hits(stars, self.x, self.y, self.z, self.radius)):
+                star = stars.item(i)
+                if not star.collected:
+                    star.collected = True
+                    events.append((STAR_COLLECTED, star))
+
+        cones = path.arrays.cones.window(*path.cone_index.window(lo, hi))
+        if kernels.near(cones.box, self.x, self.y, reach):
+            for i in kernels.hits_in_order(cones, kernels.cone_hits(cones, self.x, self.y, self.z, self.radius))[:1]:
+                events.append((GAME_OVER, cones.item(i)))
+
+        half_spheres = path.arrays.half_spheres.window(*path.half_sphere_index.window(lo, hi))
+        if kernels.near(half_spheres.box, self.x, self.y, reach):
+            if kernels.any_hits(kernels.half_sphere_hits(half_spheres, self.x, self.y, self.z, self.radius)):
+                self.double_jump()
+
+    def collide_swept(self, events):
+        # The discrete rules at the tick's end, plus contacts with obstacles the ball passed
+        # right through during the tick: ones whose whole contact range along x lies between
+        # its previous and current x, which no end-of-tick test can see. At the live speed no
+        # obstacle is that thin, so results match collide; high speeds or coarse ticks then
+        # cannot tunnel through blocks, stairs or cones.
+        path = self.path
+        start = (self.prev_x, self.prev_y, self.z)
+        lo = min(self.prev_x, self.x) - self.radius - BROADPHASE_MARGIN
+        hi = max(self.prev_x, self.x) + self.radius + BROADPHASE_MARGIN
+        if path.arrays is not None:
+            self.collide_arrays(events)
+        else:
+            self.collide(events)
+        if any(kind == GAME_OVER for kind, obstacle in events):
+            return
+
+        stairs = [stair for stair in path.stair_index.query(lo, hi) if self.passed(stair, 0.0)]
+        if not self.on_block_or_stair:
+            for stair in stairs:
+                if self.land_swept(stair, start, (self.x, self.y, self.z)):
+                    break
+        end = (self.x, self.y, self.z)
+
+        death = None  # (time of impact, obstacle) of the first deadly contact passed through
+        for block in path.block_index.query(lo, hi):
+            if self.passed(block, 0.0):
+                t = continuous.block_toi(block, start, end)
+                if t is not None and (death is None or t < death[0]):
+                    death = (t, block)
+        for cone in path.cone_index.query(lo, hi):
+            if self.passed(cone, self.radius):
+                t = continuous.cone_toi(cone, start, end, self.radius)
+                if t is not None and (death is None or t < death[0]):
+                    death = (t, cone)
+
+        for star in path.star_index.query(lo, hi):
+            if not star.collected and self.passed(star, self.radius):
+                t = continuous.star_toi(star, start, end, self.radius)
+                if t is not None and (death is None or t <= death[0]):
+                    star.collected = True
+                    events.append((STAR_COLLECTED, star))
+
+        if death is not None:
+            events.append((GAME_OVER, death[1]))
+            return
+
+        for half_sphere in path.half_sphere_index.query(lo, hi):
+            if self.passed(half_sphere, self.radius):
+                if continuous.half_sphere_toi(half_sphere, start, end, self.radius) is not None:
+                    self.double_jump()
+
+    def passed(self, obstacle, reach):
+        # Whether the obstacle's x-extent, grown by reach, lies strictly between the ball's
+        # previous and current x
+        left, right = obstacle.x_extent()
+        return min(self.prev_x, self.x) < left - reach and right + reach < max(self.prev_x, self.x)
+
+    def land_swept(self, stair, start, end):
+        half_depth = stair.depth / 2 if self.physics.stair_uses_depth else stair.size
+        t = continuous.stair_toi(stair, start, end, half_depth)
+        if t is None:
+            return False
+        self.on_block_or_stair = True
+        top = stair.y + stair.height
+        if continuous.point_at(start, end, t)[1] > top - self.radius or end[1] > top - self.radius:
+            self.y = top - self.radius + self.physics.stair_landing_offset
+            self.jumping = False  # End the jumping state upon landing
+            self.jump_velocity = 0.0
+            return True
+        return False
+
+    def double_jump(self):
+        if not self.jumping:
+            self.jumping = True
+            self.jump_velocity = self.physics.double_jump_velocity  # Higher initial jump velocity for double jump
+
+    def jump(self):
+        if self.on_block_or_stair or not self.jumping:
+            self.jumping = True
+            self.jump_velocity = self.physics.jump_velocity
+
+    def reset(self):
+        self.x = self.physics.start_x
+        self.y = self.baseHeight
+        self.jumping = False
+        self.jump_velocity = 0.0
+        self.rotation_angle = 0
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.prev_rotation_angle = 0
+        self.waiting_for_start = True
+
+class Simulation:
+    # Runs a level's physics and collisions with no Qt, OpenGL or GLUT dependency
+    def __init__(self, path, physics, ball=None, vectorized=False, swept=False):
+        self.path = path
+        if vectorized and path.arrays is None:
+            path.build_arrays()
+        self.physics = physics
+        self.ball = ball if ball is not None else Ball(0.1, 0.1, physics.start_x, 0.5, path, physics)
+        self.ball.swept = swept
+        self.scene_x = 0
+        self.prev_scene_x = 0
+        self.distance_traveled = 0.0
+        self.score = 0
+        self.ticks = 0
+        self.outcome = None  # GAME_OVER or GAME_WON once the run has ended
+
+    def jump(self):
+        self.ball.jump()
+
+    def step(self, jump=False):
+        if self.outcome is not None:
+            return []
+        if jump:
+            self.ball.jump()
+
+        events = []
+        self.ticks += 1
+        self.prev_scene_x = self.scene_x
+        self.scene_x += self.ball.horizontal_speed  # Camera follows the ball
+        self.distance_traveled += self.ball.horizontal_speed
+        if self.scene_x > self.physics.finish_x:
+            self.reset_scene()
+            events.append((SCENE_RESET, None))
+
+        events.extend(self.ball.update())
+        if self.ball.x <= self.physics.finish_x:
+            self.distance_traveled += self.ball.horizontal_speed
+
+        for kind, obstacle in events:
+            if kind == STAR_COLLECTED:
+                self.score += STAR_POINTS
+            elif kind in (GAME_OVER, GAME_WON) and self.outcome is None:
+                self.outcome = kind
+        return events
+
+    def reset_scene(self):
+        self.scene_x = 0
+        self.prev_scene_x = 0
+        self.score = 0
+        self.ball.reset()
+        self.path.reset()
+
+    def reset(self):
+        self.reset_scene()
+        self.distance_traveled = 0.0
+        self.ticks = 0
+        self.outcome = None
+
+    def snapshot(self):
+        # Everything a step depends on except which stars are collected, for search and rewind
+        ball = self.ball
+        return (ball.x, ball.y, ball.jumping, ball.jump_velocity, ball.on_block_or_stair, ball.rotation_angle,
+                self.scene_x, self.distance_traveled, self.score, self.ticks, self.outcome)
+
+    def restore(self, state):
+        ball = self.ball
+        (ball.x, ball.y, ball.jumping, ball.jump_velocity, ball.on_block_or_stair, ball.rotation_angle,
+         self.scene_x, self.distance_traveled, self.score, self.ticks, self.outcome) = state
+        ball.prev_x = ball.x
+        ball.prev_y = ball.y
+        ball.prev_rotation_angle = ball.rotation_angle
+        self.prev_scene_x = self.scene_x
+
+    def run(self, jump_ticks=(), max_ticks=None):
+        # Play the level to completion, jumping on the given tick numbers
+        jump_ticks = set(jump_ticks)
+        if max_ticks is None:
+            max_ticks = int((self.physics.finish_x - self.physics.start_x) / self.physics.horizontal_speed) + 2
+        while self.outcome is None and self.ticks < max_ticks:
+            self.step(self.ticks in jump_ticks)
+        return self.outcome
+
+def stars_collected(path):
+    if path.store is not None:
+        return int(path.store.stars.columns['collected'].sum())
+    return sum(1 for star in path.stars if star.collected)
@@ -0,0 +1,137 @@
+import json
+import os
+import sys
+import time
+
+import levels
+import simulation
+from replay import level_version
+
+CACHE_DIR = os.path.join(levels.CACHE_DIR, 'solutions')  # On disk, one file per level content hash
+FORMAT_VERSION = 2  # Bumped when what a Solution holds changes, so older files are not used
+
+_cache = {}
+
+class Solution:
+    def __init__(self, level, version, reachable, jump_ticks, collectable_stars, farthest_x, states):
+        self.level = level
+        self.version = version
+        self.reachable = reachable  # Whether any jump timing reaches the portal
+        self.jump_ticks = jump_ticks  # Fewest jumps that win, as ticks for Simulation.run
+        self.collectable_stars = collectable_stars  # Stars some winning run collects, as indices
+        self.farthest_x = farthest_x
+        self.states = states  # Simulation steps taken by the search
+
+    def save(self, filename):
+        with open(filename, 'w') as file:
+            json.dump(vars(self), file)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r') as file:
+            return cls(**json.load(file))
+
+def _key(state):
+    # Only identical ball states share a search node. Nearby states can still part at an
+    # obstacle's edge, so merging them could give jump ticks that do not replay to a win.
+    x, y, jumping, jump_velocity, on_block_or_stair = state[:5]
+    return x, y, jump_velocity, jumping, on_block_or_stair
+
+def search(level):
+    # Breadth-first over ticks. Each layer holds the distinct ball states reachable at that
+    # tick, keeping the path with the fewest jumps into each and the stars collected on any
+    # path into it; both actions (jump or not) are expanded from every state. The layer where
+    # the ball first wins gives the answer.
+    layout = getattr(levels, level)
+    physics = layout['physics']
+    path = simulation.Course(layout)
+    sim = simulation.Simulation(path, physics)
+    ball = sim.ball
+    star_numbers = {id(star): i for i, star in enumerate(path.stars)}
+    max_ticks = int((physics.finish_x - physics.start_x) / physics.horizontal_speed) + 2
+
+    collectable = set()  # From the runs that win
+    farthest_x = ball.x
+    states = 0
+    won = None
+    frontier = [(sim.snapshot(), 0, None, frozenset())]  # (state, jumps, linked list of jump ticks, stars)
+    while frontier and won is None and sim.ticks < max_ticks:
+        layer = {}
+        for state, jumps, history, stars in frontier:
+            for jump in (False, True):
+                sim.restore(state)
+                if jump and ball.jumping and not ball.on_block_or_stair:
+                    continue  # Jump would have no effect in the air
+                events = sim.step(jump)
+                states += 1
+                collected = stars
+                for kind, obstacle in events:
+                    if kind == simulation.STAR_COLLECTED:
+                        collected = collected | {star_numbers[id(obstacle)]}
+                        obstacle.collected = False  # Other branches may still collect it
+                if sim.outcome == simulation.GAME_OVER:
+                    continue
+                node = (sim.snapshot(), jumps + jump, (state[9], history) if jump else history, collected)
+                if sim.outcome == simulation.GAME_WON:
+                    collectable |= collected
+                    if won is None or node[1] < won[1]:
+                        won = node
+                    continue
+                farthest_x = max(farthest_x, ball.x)
+                key = _key(node[0])
+                other = layer.get(key)
+                if other is None:
+                    layer[key] = node
+                elif node[1] < other[1]:
+                    layer[key] = node[:3] + (other[3] | collected,)
+                elif not collected <= other[3]:
+                    layer[key] = other[:3] + (other[3] | collected,)
+        frontier = list(layer.values())
+
+    jump_ticks = []
+    if won is not None:
+        history = won[2]
+        while history is not None:
+            tick, history = history
+            jump_ticks.append(tick)
+        jump_ticks.reverse()
+        farthest_x = physics.finish_x
+    return Solution(level, level_version(layout), won is not None, jump_ticks, sorted(collectable),
+                    farthest_x, states)
+
+def solve(level, cache_dir=CACHE_DIR):
+    # Cached by level content, so an unchanged level is answered without searching
+    version = level_version(getattr(levels, level))
+    key = (level, version)
+    if key in _cache:
+        return _cache[key]
+    filename = os.path.join(cache_dir, f"{level}_{version}.v{FORMAT_VERSION}.json") if cache_dir else None
+    if filename and os.path.exists(filename):
+        solution = Solution.load(filename)
+    else:
+        solution = search(level)
+        if filename:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                solution.save(filename)
+            except OSError:
+                pass  # Read-only install: search every time
+    _cache[key] = solution
+    return solution
+
+def main(names):
+    for level in names or levels.level_names():
+        start = time.perf_counter()
+        solution = solve(level)
+        elapsed = time.perf_counter() - start
+        stars = len(getattr(levels, level)['stars'])
+        if solution.reachable:
+            print(f"{level}: beatable with {len(solution.jump_ticks)} jumps at ticks {solution.jump_ticks}")
+        else:
+            print(f"{level}: NOT beatable, farthest x {solution.farthest_x:.2f}")
+        print(f"  collectable stars {solution.collectable_stars} of {stars}, "
+              f"{solution.states} states searched, {elapsed:.2f} s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
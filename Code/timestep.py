@@ -0,0 +1,45 @@
+import time
+
+# Physics constants (gravity, jump velocities, horizontal speed) are tuned per tick
+# at the original ~60 FPS timer rate, so the simulation keeps ticking at 60 Hz
+TICK_RATE = 60
+
+class FixedTimestep:
+    def __init__(self, rate=TICK_RATE, max_frame_time=0.25, clock=time.perf_counter):
+        self.dt = 1.0 / rate
+        self.max_frame_time = max_frame_time  # Clamp long stalls so we don't spiral catching up
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last_time = None
+        self.ticks = 0
+
+    def reset(self):
+        # Drop any pending time, e.g. while paused or after a restart
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def advance(self, step):
+        now = self.clock()
+        if self.last_time is None:
+            self.last_time = now
+            return 0
+
+        frame_time = min(now - self.last_time, self.max_frame_time)
+        self.last_time = now
+        self.accumulator += frame_time
+
+        steps = 0
+        while self.accumulator >= self.dt:
+            step()
+            self.accumulator -= self.dt
+            steps += 1
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        # Fraction of a tick elapsed since the last step, used to interpolate rendering
+        return self.accumulator / self.dt
+
+def lerp(previous, current, alpha):
+    return previous + (current - previous) * alpha
@@ -0,0 +1,310 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from OpenGL.GL import *
+
+# Video frames decoded and converted on a worker thread, so the GUI thread only ever picks
+# up a finished RGB image. The worker stays a bounded number of frames ahead.
+# A video can also be transcoded ahead of time, by running this module on it, into a cache of
+# raw RGB frames at display size next to it. Playing from the cache maps the file and hands
+# the texture upload views into it, with nothing left to decode.
+
+RING_SIZE = 8  # Decoded frames kept ready ahead of the display
+CACHE_SIZE = (800, 600)  # Cached frames are scaled down to fit, about the intro's window
+DEFAULT_FPS = 30.0  # For files that do not report their frame rate
+DISPLAY_RATE = 60.0  # Frames per second the widget can show; faster sources are thinned
+
+class PlaybackClock:
+    # Which frame is due, from a monotonic clock that only runs between start and stop.
+    # Starting or stopping twice does nothing.
+    def __init__(self, fps):
+        self.fps = fps
+        self.lock = threading.Lock()
+        self.started = None  # time.monotonic() when last started, None while stopped
+        self.elapsed = 0.0  # Seconds played before that
+
+    def start(self):
+        with self.lock:
+            if self.started is None:
+                self.started = time.monotonic()
+
+    def stop(self):
+        with self.lock:
+            if self.started is not None:
+                self.elapsed += time.monotonic() - self.started
+                self.started = None
+
+    def index(self):
+        with self.lock:
+            elapsed = self.elapsed
+            if self.started is not None:
+                elapsed += time.monotonic() - self.started
+        return int(elapsed * self.fps)
+
+    def interval(self):
+        # Milliseconds between checks for a new frame: the frame period, or the display's
+        return max(int(1000 / min(self.fps, DISPLAY_RATE)), 1)
+
+class FrameRing:
+    # Decoded frames as (index, RGB image), oldest first. The decoder waits while it is full;
+    # the GUI takes the newest frame that is due and drops any it has fallen behind on.
+    def __init__(self, size=RING_SIZE):
+        self.frames = deque()
+        self.size = size
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def put(self, index, frame):
+        # False once the ring is closed and the decoder should stop
+        with self.condition:
+            while len(self.frames) >= self.size and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return False
+            self.frames.append((index, frame))
+            return True
+
+    def take(self, index):
+        # The newest frame at or before index, or None if none has been decoded yet
+        with self.condition:
+            frame = None
+            while self.frames and self.frames[0][0] <= index:
+                frame = self.frames.popleft()[1]
+            if frame is not None:
+                self.condition.notify()
+            return frame
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.frames.clear()
+            self.condition.notify_all()
+
+class Decoder(threading.Thread):
+    # Reads the capture from start to end over and over, numbering frames across loops, and
+    # converts each to RGB. Rows stay top to bottom; the texture coordinates flip them.
+    # Frames that will never be shown, because the clock is already past them or the source
+    # is faster than the display, are only grabbed, not decoded.
+    def __init__(self, capture, ring, clock):
+        super().__init__(daemon=True)
+        self.capture = capture
+        self.ring = ring
+        self.clock = clock
+        self.stride = max(round(clock.fps / DISPLAY_RATE), 1)
+
+    def run(self):
+        index = 0
+        while True:
+            shown = index >= self.clock.index() and index % self.stride == 0
+            ret, frame = self.next(shown)
+            if not ret:
+                break  # Nothing decodable even from the start
+            if shown:
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                if not self.ring.put(index, frame_rgb):
+                    break
+            index += 1
+        self.capture.release()
+
+    def next(self, decode):
+        # read() or just grab() the next frame, starting over at the end of the file
+        for attempt in range(2):
+            if decode:
+                ret, frame = self.capture.read()
+            else:
+                ret, frame = self.capture.grab(), None
+            if ret:
+                return ret, frame
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return False, None
+
+    def stop(self):
+        self.ring.close()
+        self.join()
+
+class StreamingTexture:
+    # An RGB texture allocated once for the video's size and refilled with glTexSubImage2D.
+    # Where pixel buffers exist there are two, also allocated once at the frame size: each
+    # upload starts the texture's transfer from the one holding the previous frame, then
+    # copies the new frame into the other, so neither copy waits on the other. The texture
+    # therefore shows each frame one upload late.
+    def __init__(self):
+        self.texture = glGenTextures(1)
+        self.buffers = glGenBuffers(2) if glGenBuffers else None
+        self.next = 0  # The buffer the next frame is copied into
+        self.pending = False  # Whether the other buffer holds a frame not yet in the texture
+        self.size = None
+
+    def upload(self, frame):
+        height, width, _ = frame.shape
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)  # Rows of width * 3 bytes
+        if self.size != (width, height):
+            # Storage only when the size changes, i.e. for the first frame
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, None)
+            glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            if self.buffers is not None:
+                for buffer in self.buffers:
+                    glBindBuffer(GL_PIXEL_UNPACK_BUFFER, buffer)
+                    glBufferData(GL_PIXEL_UNPACK_BUFFER, frame.nbytes, None, GL_STREAM_DRAW)
+                self.pending = False
+            self.size = (width, height)
+        if self.buffers is None:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE, frame)
+        else:
+            if self.pending:
+                glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.buffers[self.next ^ 1])
+                glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE, None)
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.buffers[self.next])
+            glBufferSubData(GL_PIXEL_UNPACK_BUFFER, 0, frame.nbytes, frame)
+            if not self.pending:
+                # The first frame has nothing before it to show, so it goes straight in
+                glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE, None)
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+            self.pending = True
+            self.next ^= 1
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def delete(self):
+        glDeleteTextures(1, [self.texture])
+        if self.buffers is not None:
+            glDeleteBuffers(2, self.buffers)
+
+class CachedVideo:
+    # A transcoded video mapped into memory. Answers take() like a FrameRing, with each frame
+    # a read-only view into the mapping and the end of the file wrapping to the start.
+    def __init__(self, frames_file, index):
+        self.fps = index['fps']
+        with open(frames_file, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        shape = (index['count'], index['height'], index['width'], 3)
+        self.frames = np.frombuffer(self.map, np.uint8).reshape(shape)
+        self.shown = None  # The frame take() last returned, so it is not uploaded twice
+
+    def take(self, index):
+        index %= len(self.frames)
+        if index == self.shown:
+            return None
+        self.shown = index
+        return self.frames[index]
+
+def source_digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()[:16]
+
+def source_stamp(path):
+    # Cheap enough for the GUI thread; the content hash is only taken when building
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def cache_files(path):
+    # The frames and their index, in __pycache__ next to the video
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '__pycache__')
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = os.path.join(cache_dir, f"{stem}.{CACHE_SIZE[0]}x{CACHE_SIZE[1]}")
+    return name + '.frames', name + '.json'
+
+def read_index(index_file):
+    try:
+        with open(index_file) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def open_cache(path):
+    # The cached frames of the video at path, or None if it has not been transcoded or has
+    # changed since. Builds nothing: that is the job of running this module.
+    try:
+        frames_file, index_file = cache_files(path)
+        index = read_index(index_file)
+        if index is None or tuple(index['stamp']) != source_stamp(path):
+            return None
+        return CachedVideo(frames_file, index)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def scaled_size(width, height):
+    # The frame size fitting in CACHE_SIZE with the same aspect, never larger than the source
+    scale = min(CACHE_SIZE[0] / width, CACHE_SIZE[1] / height, 1.0)
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+def write_index(index_file, index):
+    with open(index_file + '.tmp', 'w') as file:
+        json.dump(index, file)
+    os.replace(index_file + '.tmp', index_file)
+
+def build_cache(path):
+    # Decode the whole video once, scale and convert each frame to RGB and write them one after
+    # another, about width * height * 3 bytes a frame. A video whose content hash matches the
+    # cache is not decoded again. The index goes last, so an interrupted build is never used.
+    # Returns the index, or None if the video cannot be read or the cache cannot be written.
+    frames_file, index_file = cache_files(path)
+    try:
+        digest, stamp = source_digest(path), source_stamp(path)
+    except OSError:
+        return None
+    index = read_index(index_file)
+    if index is not None and index.get('digest') == digest and os.path.exists(frames_file):
+        if tuple(index['stamp']) != stamp:
+            index['stamp'] = stamp  # Touched or copied, not changed
+            try:
+                write_index(index_file, index)
+            except OSError:
+                return None
+        return index
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        return None
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    index = {'fps': fps if fps > 0 else DEFAULT_FPS, 'count': 0, 'width': 0, 'height': 0,
+             'digest': digest, 'stamp': stamp}
+    try:
+        os.makedirs(os.path.dirname(frames_file), exist_ok=True)
+        if os.path.exists(index_file):
+            os.remove(index_file)  # The old frames are about to be replaced
+        with open(frames_file + '.tmp', 'wb') as file:
+            while True:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                size = scaled_size(frame.shape[1], frame.shape[0])
+                if size != (frame.shape[1], frame.shape[0]):
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                file.write(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).tobytes())
+                index.update(count=index['count'] + 1, width=size[0], height=size[1])
+        if not index['count']:
+            return None
+        os.replace(frames_file + '.tmp', frames_file)
+        write_index(index_file, index)
+    except OSError:
+        return None  # Read-only install: decode every time
+    finally:
+        capture.release()
+        if os.path.exists(frames_file + '.tmp'):
+            os.remove(frames_file + '.tmp')  # Failed or interrupted
+    return index
+
+if __name__ == '__main__':
+    # Transcode the given videos ahead of time; the intro plays from the cache once it exists
+    for path in sys.argv[1:]:
+        start = time.perf_counter()
+        index = build_cache(path)
+        if index is None:
+            print(f"{path}: could not be cached")
+        else:
+            size = index['count'] * index['width'] * index['height'] * 3
+            print(f"{path}: {index['count']} frames at {index['width']}x{index['height']}, "
+                  f"{size / 2 ** 20:.0f} MB, {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,58 @@
+import pytest
+
+import batch
+import levels
+import simulation
+from test_simulation import WINNING_RUNS
+
+def test_evaluator_reports_the_run():
+    jump_ticks, ticks, score = WINNING_RUNS['LEVEL1']
+    result = batch.Evaluator('LEVEL1').evaluate(jump_ticks)
+    assert result['outcome'] == simulation.GAME_WON
+    assert (result['ticks'], result['score'], result['stars']) == (ticks, score, score // simulation.STAR_POINTS)
+
+def test_evaluator_resets_between_runs():
+    evaluator = batch.Evaluator('LEVEL2')
+    first = evaluator.evaluate(WINNING_RUNS['LEVEL2'][0])
+    evaluator.evaluate([])
+    assert evaluator.evaluate(WINNING_RUNS['LEVEL2'][0]) == first
+
+def test_physics_changes_apply():
+    evaluator = batch.Evaluator('LEVEL1', {'horizontal_speed': 0.04})
+    assert evaluator.simulation.physics.horizontal_speed == 0.04
+
+def test_pool_matches_serial_runs():
+    sequences = list(batch.random_sequences(40, 'LEVEL1', seed=3)) + [WINNING_RUNS['LEVEL1'][0]]
+    evaluator = batch.Evaluator('LEVEL1')
+    expected = {index: evaluator.evaluate(jump_ticks) for index, jump_ticks in enumerate(sequences)}
+    results = dict(batch.run_batch('LEVEL1', iter(sequences), workers=2, chunk_size=8))
+    assert results == expected
+
+def test_random_sequences_are_reproducible():
+    assert list(batch.random_sequences(5, 'LEVEL3', seed=1)) == list(batch.random_sequences(5, 'LEVEL3', seed=1))
+    assert list(batch.random_sequences(5, 'LEVEL3', seed=1)) != list(batch.random_sequences(5, 'LEVEL3', seed=2))
+
+def test_read_sequences(tmp_path):
+    filename = tmp_path / 'sequences.txt'
+    filename.write_text("# comment\n1 2 3\n\n4,5\n")
+    assert list(batch.read_sequences(filename)) == [[1, 2, 3], [4, 5]]
+
+def test_coarse_runs_warn(tmp_path, capsys):
+    filename = tmp_path / 'sequences.txt'
+    filename.write_text("10\n")
+    assert batch.main(['LEVEL1', '--sequences', str(filename), '--coarse', '2', '--workers', '1', '--quiet']) == 0
+    assert 'not game-equivalent' in capsys.readouterr().err
+
+def test_any_level_file_can_be_run(tmp_path, monkeypatch, capsys):
+    level_dir = tmp_path / 'level_data'
+    level_dir.mkdir()
+    (level_dir / 'level4.json').write_text(open(levels.level_file('LEVEL1')).read())
+    monkeypatch.setattr(levels, 'LEVEL_DIR', str(level_dir))
+    monkeypatch.setattr(levels, 'CACHE_DIR', str(level_dir / '__pycache__'))
+    monkeypatch.setattr(levels, '_levels', {})
+    filename = tmp_path / 'sequences.txt'
+    filename.write_text("")
+    assert batch.main(['LEVEL4', '--sequences', str(filename), '--workers', '1', '--quiet']) == 0
+    assert capsys.readouterr().err.startswith("LEVEL4: 0/0 runs won")
+    with pytest.raises(SystemExit):
+        batch.main(['LEVEL1', '--sequences', str(filename)])
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from broadphase import SlabIndex, SweepIndex, TableIndex
+from obstacle_store import ObstacleStore, generate_layout
+import simulation
+
+def brute_force(items, lo, hi):
+    # Every item overlapping [lo, hi], in list order
+    return [item for item in items if item.x_extent()[1] >= lo and item.x_extent()[0] <= hi]
+
+def random_blocks(count, seed):
+    rng = random.Random(seed)
+    return [simulation.Block(rng.uniform(0, 50), 0.2, 0.6, rng.uniform(0.01, 2.0), (1.0, 1.0, 1.0))
+            for _ in range(count)]
+
+def windows(seed, backwards=False):
+    # Ball-sized windows sweeping forward, with the occasional jump back when asked
+    rng = random.Random(seed)
+    x = -1.0
+    for _ in range(500):
+        yield x - 0.1, x + 0.1
+        x += rng.uniform(0.0, 0.3)
+        if backwards and rng.random() < 0.01:
+            x -= rng.uniform(0.0, 10.0)
+
+@pytest.mark.parametrize('backwards', [False, True])
+def test_query_matches_brute_force(backwards):
+    blocks = random_blocks(300, seed=1)
+    index = SweepIndex(blocks)
+    for lo, hi in windows(2, backwards):
+        assert index.query(lo, hi) == brute_force(blocks, lo, hi)
+
+def test_query_keeps_level_order_for_equal_starts():
+    blocks = [simulation.Block(5.0, 0.2, 0.6, 1.0, (1.0, 1.0, 1.0)) for _ in range(3)]
+    assert SweepIndex(blocks).query(4.5, 4.7) == blocks
+
+def test_empty_index():
+    index = SweepIndex([])
+    assert index.query(0.0, 1.0) == []
+    assert index.window(0.0, 1.0) == (0, 0)
+
+def test_table_index_matches_sweep_index():
+    layout = generate_layout(400, seed=4)
+    store = ObstacleStore(layout)
+    course = simulation.Course(layout)
+    for table, items in ((store.blocks, course.blocks), (store.cones, course.cones), (store.stars, course.stars)):
+        table_index, sweep_index = TableIndex(table), SweepIndex(items)
+        for lo, hi in windows(5, backwards=True):
+            rows = [(view.x, view.y, view.z) for view in table_index.query(lo, hi)]
+            assert rows == [(item.x, item.y, item.z) for item in sweep_index.query(lo, hi)]
+
+def test_slab_index_window_covers_every_overlap():
+    rng = random.Random(6)
+    extents = [(x - width, x + width) for x, width in ((rng.uniform(0, 50), rng.uniform(0.01, 3.0))
+                                                       for _ in range(200))]
+    index = SlabIndex(extents)
+    for lo, hi in windows(7, backwards=True):
+        start, end = index.window((lo, hi))
+        covered = set(index.order[start:end])
+        assert {i for i, (left, right) in enumerate(extents) if right >= lo and left <= hi} <= covered
+    assert index.window(None) == (0, 0)
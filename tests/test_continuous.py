@@ -0,0 +1,106 @@
+import math
+import random
+
+import pytest
+
+import continuous
+import simulation
+from test_simulation import WINNING_RUNS, make_simulation, trace
+
+BOX = ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0))
+
+def test_segment_box_entering_from_outside():
+    assert continuous.segment_box_toi((-1.0, 0.5, 0.5), (1.0, 0.5, 0.5), *BOX) == pytest.approx(0.5)
+
+def test_segment_box_starting_inside():
+    assert continuous.segment_box_toi((0.5, 0.5, 0.5), (2.0, 0.5, 0.5), *BOX) == 0.0
+
+def test_segment_box_passing_beside_or_stopping_short():
+    assert continuous.segment_box_toi((-1.0, 1.5, 0.5), (2.0, 1.5, 0.5), *BOX) is None
+    assert continuous.segment_box_toi((-2.0, 0.5, 0.5), (-0.5, 0.5, 0.5), *BOX) is None
+
+def test_segment_box_faces_are_open():
+    # The discrete tests use strict inequalities, so grazing a face is not a hit
+    assert continuous.segment_box_toi((-1.0, 1.0, 0.5), (2.0, 1.0, 0.5), *BOX) is None
+    assert continuous.segment_box_toi((-1.0, 0.5, 0.5), (0.0, 0.5, 0.5), *BOX) is None
+
+def test_segment_box_not_moving():
+    assert continuous.segment_box_toi((0.5, 0.5, 0.5), (0.5, 0.5, 0.5), *BOX) == 0.0
+    assert continuous.segment_box_toi((1.5, 0.5, 0.5), (1.5, 0.5, 0.5), *BOX) is None
+
+def test_segment_sphere_hit_and_miss():
+    center = (0.0, 0.0, 0.0)
+    assert continuous.segment_sphere_toi((-2.0, 0.0, 0.0), (2.0, 0.0, 0.0), center, 1.0) == pytest.approx(0.25)
+    assert continuous.segment_sphere_toi((-2.0, 1.5, 0.0), (2.0, 1.5, 0.0), center, 1.0) is None
+    assert continuous.segment_sphere_toi((0.2, 0.0, 0.0), (3.0, 0.0, 0.0), center, 1.0) == 0.0
+
+def test_segment_sphere_tangent_and_short():
+    center = (0.0, 0.0, 0.0)
+    assert continuous.segment_sphere_toi((-2.0, 1.0, 0.0), (2.0, 1.0, 0.0), center, 1.0) is None
+    assert continuous.segment_sphere_toi((-3.0, 0.0, 0.0), (-2.0, 0.0, 0.0), center, 1.0) is None
+    assert continuous.segment_sphere_toi((-2.0, 0.0, 0.0), (-2.0, 0.0, 0.0), center, 1.0) is None
+
+def test_segment_cylinder_respects_its_height():
+    assert continuous.segment_cylinder_toi((-2.0, 0.5, 0.0), (2.0, 0.5, 0.0), 0.0, 0.0, 1.0, 0.0, 1.0) == \
+        pytest.approx(0.25)
+    assert continuous.segment_cylinder_toi((-2.0, 1.5, 0.0), (2.0, 1.5, 0.0), 0.0, 0.0, 1.0, 0.0, 1.0) is None
+    # Dropping into the top while over the disk
+    assert continuous.segment_cylinder_toi((0.0, 2.0, 0.0), (0.0, 0.0, 0.0), 0.0, 0.0, 1.0, 0.0, 1.0) == \
+        pytest.approx(0.5)
+
+def test_cone_toi_matches_the_discrete_rule_at_the_end_point():
+    rng = random.Random(1)
+    cones = [simulation.Cone(0.0, 0.0, 0.5, 0.1, 0.3, (0, 0, 0)),
+             simulation.Cone(0.0, 1.5, 0.5, 0.1, 0.3, (0, 0, 0), True)]
+    for _ in range(500):
+        end = (rng.uniform(-0.5, 0.5), rng.uniform(-0.2, 1.8), 0.55)
+        for cone in cones:
+            around = (end[0] - cone.x) ** 2 + (end[2] - cone.z) ** 2 < (0.1 + cone.base_radius) ** 2
+            inside = cone.y - cone.height < end[1] < cone.y if cone.is_hanging else end[1] < cone.y + cone.height
+            hit = continuous.cone_toi(cone, end, end, 0.1) is not None
+            assert hit == (around and inside)
+
+def test_point_at():
+    assert continuous.point_at((0.0, 0.0, 0.0), (2.0, 4.0, 6.0), 0.5) == (1.0, 2.0, 3.0)
+
+@pytest.mark.parametrize('level', sorted(WINNING_RUNS))
+def test_swept_runs_match_discrete_at_the_live_speed(level):
+    rng = random.Random(level)
+    sequences = [WINNING_RUNS[level][0]] + [[t for t in range(700) if rng.random() < 0.03] for _ in range(40)]
+    for jump_ticks in sequences:
+        assert trace(make_simulation(level, swept=True), jump_ticks) == trace(make_simulation(level), jump_ticks)
+
+def thin_course(**extra):
+    layout = {'blocks': [], 'stairs': [], 'stars': [], 'cones': [], 'half_spheres': []}
+    for key, rows in extra.items():
+        layout[key] = rows
+    return simulation.Course(layout)
+
+@pytest.mark.parametrize('obstacles', [
+    {'blocks': [(3.0, 0.1, 0.55, 0.05, (1.0, 0.0, 0.0))]},
+    {'cones': [(3.0, 0.0, 0.55, 0.05, 0.3, (0.0, 1.0, 0.0))]},
+])
+def test_swept_mode_does_not_tunnel(obstacles):
+    physics = simulation.Physics(horizontal_speed=0.7)
+    assert simulation.Simulation(thin_course(**obstacles), physics).run() == simulation.GAME_WON
+    sim = simulation.Simulation(thin_course(**obstacles), physics, swept=True)
+    assert sim.run() == simulation.GAME_OVER
+    assert sim.ball.x > 3.0
+
+def test_swept_mode_collects_stars_it_passes():
+    physics = simulation.Physics(horizontal_speed=0.7)
+    stars = [(3.0, 0.1, 0.55, 0.05, (1.0, 1.0, 0.0))]
+    sim = simulation.Simulation(thin_course(stars=stars), physics)
+    sim.run()
+    assert sim.score == 0
+    sim = simulation.Simulation(thin_course(stars=stars), physics, swept=True)
+    sim.run()
+    assert sim.score == simulation.STAR_POINTS
+
+def test_coarse_physics_keeps_the_jump_height():
+    physics = simulation.Physics()
+    coarse = physics.coarse(4)
+    peak = physics.jump_velocity ** 2 / (-2 * physics.gravity)
+    assert coarse.jump_velocity ** 2 / (-2 * coarse.gravity) == pytest.approx(peak)
+    assert coarse.horizontal_speed == pytest.approx(physics.horizontal_speed * 4)
+    assert math.isclose(coarse.fall_velocity, physics.fall_velocity * 4)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import culling
+import levels
+import simulation
+from renderer import look_at, perspective
+
+CAMERA_RAIL = (9.0, 10.0)  # As level_widget.CAMERA_RAIL
+
+def view_projection(scene_x, aspect=4 / 3):
+    eye, center = (-2 + scene_x, *CAMERA_RAIL), (2 + scene_x, 0, 0)
+    return perspective(10.0, aspect, 1.0, 150.0) @ look_at(eye, center, (0.0, 1.0, 0.0))
+
+def seen_xs(matrix, bounds, xs):
+    # The x of every sample point of the box, on a grid, that lands inside the clip volume
+    y_lo, y_hi, z_lo, z_hi = bounds
+    x, y, z = np.meshgrid(xs, np.linspace(y_lo, y_hi, 25), np.linspace(z_lo, z_hi, 25), indexing='ij')
+    points = np.stack([x.ravel(), y.ravel(), z.ravel(), np.ones(x.size)])
+    clip = matrix @ points
+    inside = np.all(np.abs(clip[:3]) <= clip[3], axis=0)
+    return points[0][inside]
+
+@pytest.mark.parametrize('scene_x', [0.0, 7.5, 40.0])
+@pytest.mark.parametrize('aspect', [4 / 3, 2.0])
+def test_slab_covers_everything_the_camera_sees(scene_x, aspect):
+    bounds = (-1.0, 2.0, -0.5, 1.5)
+    matrix = view_projection(scene_x, aspect)
+    lo, hi = culling.visible_slab(matrix, bounds)
+    xs = seen_xs(matrix, bounds, np.linspace(scene_x - 20, scene_x + 30, 1001))
+    assert len(xs)
+    assert lo <= xs.min() and xs.max() <= hi
+    # And not much more than that: the grid is 0.05 apart in x
+    assert xs.min() - lo < culling.CULL_MARGIN + 0.05
+    assert hi - xs.max() < culling.CULL_MARGIN + 0.05
+
+def test_slab_is_none_when_the_level_is_out_of_view():
+    # A box well above the camera, which looks down at the track
+    assert culling.visible_slab(view_projection(0.0), (50.0, 60.0, -0.5, 1.5)) is None
+
+def test_overlaps():
+    slab = (2.0, 5.0)
+    assert culling.overlaps((1.0, 2.0), slab)
+    assert culling.overlaps((3.0, 4.0), slab)
+    assert culling.overlaps((4.5, 9.0), slab)
+    assert not culling.overlaps((5.5, 6.0), slab)
+    assert not culling.overlaps((0.0, 1.9), slab)
+    assert not culling.overlaps((3.0, 4.0), None)
+
+@pytest.mark.parametrize('level', ['LEVEL1', 'LEVEL2', 'LEVEL3'])
+def test_level_bounds_hold_every_obstacle_and_the_portal(level):
+    data = levels.get(level)
+    course = simulation.Course(data)
+    course.portal = data['portal']
+    y_lo, y_hi, z_lo, z_hi = culling.level_bounds(course)
+    assert (y_lo, z_lo) <= (-1.0, 0.0) and (y_hi, z_hi) >= (0.0, 1.5)  # The ground
+    for name in levels.OBSTACLES:
+        for item in getattr(course, name):
+            assert y_lo <= item.y <= y_hi and z_lo <= item.z <= z_hi
+    x, y, z = data['portal']['position']
+    assert y_lo <= y - culling.PORTAL_RADIUS and y + culling.PORTAL_RADIUS <= y_hi
+    assert z_lo <= z - culling.PORTAL_RADIUS and z + culling.PORTAL_RADIUS <= z_hi
+
+def test_level_bounds_pad_by_the_largest_dimension():
+    course = simulation.Course(levels.get('LEVEL1'))
+    course.blocks, course.stairs, course.stars, course.half_spheres = [], [], [], []
+    course.cones = [simulation.Cone(3.0, 4.0, 0.5, 0.2, 1.5, (1, 1, 1))]
+    course.portal = {'position': (10.0, 0.5, 0.5)}
+    assert culling.level_bounds(course) == (-1.0, 5.5, -1.0, 2.0)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import glyphs
+
+class Atlas:
+    # Every glyph 10 pixels wide and 20 high, 15 above the baseline; counts the layouts made
+    def __init__(self):
+        self.made = []
+
+    def layout(self, text):
+        self.made.append(text)
+        quads = [[(10 * i, -5, 0, 1), (10 * i + 10, -5, 1, 1), (10 * i + 10, 15, 1, 0), (10 * i, 15, 0, 0)]
+                 for i in range(len(text))]
+        return np.array(quads, dtype=np.float32).reshape(-1, 4)
+
+def test_strings_are_laid_out_once():
+    text = glyphs.TextRenderer(Atlas())
+    quads = text.layout("Highest: 1.00")
+    assert text.layout("Highest: 1.00") is quads
+    assert text.atlas.made == ["Highest: 1.00"]
+    assert len(quads) == 4 * len("Highest: 1.00")
+
+def test_least_recently_drawn_layouts_are_dropped():
+    text = glyphs.TextRenderer(Atlas())
+    text.layout("Progress :")
+    for i in range(glyphs.LAYOUT_LIMIT - 1):
+        text.layout(f"Dist: {i:.2f}")
+        text.layout("Progress :")  # Drawn every frame, so always kept
+    text.layout("Dist: new")
+    assert len(text.layouts) == glyphs.LAYOUT_LIMIT
+    assert "Progress :" in text.layouts and "Dist: 0.00" not in text.layouts
+    text.layout("Progress :")
+    assert text.atlas.made.count("Progress :") == 1
+    text.layout("Dist: 0.00")
+    assert text.atlas.made.count("Dist: 0.00") == 2
+
+def test_bounds_start_at_the_snapped_raster_position():
+    text = glyphs.TextRenderer(Atlas())
+    text.resize(200, 100)
+    assert text.origin(-1.0, -1.0) == (0, 0)
+    assert text.origin(0.0, 0.0) == (100, 50)
+    # 20 pixels of 200 across, and 5 pixels below and 15 above the baseline, of 100
+    assert text.bounds("ab", 0.0, 0.0) == pytest.approx((0.0, -0.1, 0.2, 0.3))
+    assert text.bounds("", 0.5, 0.5) == (0.5, 0.5, 0.5, 0.5)
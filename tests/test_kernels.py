@@ -0,0 +1,102 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+import kernels
+from obstacle_store import generate_layout
+import simulation
+from test_simulation import WINNING_RUNS, make_simulation, trace
+
+@pytest.fixture(scope='module')
+def arrays():
+    course = simulation.Course(generate_layout(200, seed=1))
+    return course, kernels.ObstacleArrays(course)
+
+def random_points(count, seed=2):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, 40), rng.uniform(0.0, 1.8), rng.uniform(0.4, 0.8)) for _ in range(count)]
+
+def test_block_hits_match_the_scalar_rule(arrays):
+    course, arrays = arrays
+    blocks = arrays.blocks
+    for x, y, z in random_points(300):
+        expected = [b.x - b.size < x < b.x + b.size and b.y - b.size < y < b.y + b.size and
+                    b.z - b.size < z < b.z + b.size for b in blocks.items]
+        assert kernels.block_hits(blocks, x, y, z).tolist() == expected
+
+def test_star_cone_and_half_sphere_hits_match_the_scalar_rules(arrays):
+    course, arrays = arrays
+    radius = 0.1
+    for x, y, z in random_points(300):
+        stars = [math.sqrt((x - s.x) ** 2 + (y - s.y) ** 2 + (z - s.z) ** 2) < radius + s.size
+                 for s in arrays.stars.items]
+        assert kernels.star_hits(arrays.stars, x, y, z, radius).tolist() == stars
+        cones = []
+        for c in arrays.cones.items:
+            around = (x - c.x) ** 2 + (z - c.z) ** 2 < (radius + c.base_radius) ** 2
+            inside = c.y - c.height < y < c.y if c.is_hanging else y < c.y + c.height
+            cones.append(around and inside)
+        assert kernels.cone_hits(arrays.cones, x, y, z, radius).tolist() == cones
+        half_spheres = [(x - h.x) ** 2 + (z - h.z) ** 2 < (radius + h.radius) ** 2 and y <= h.y + h.radius
+                        for h in arrays.half_spheres.items]
+        assert kernels.half_sphere_hits(arrays.half_spheres, x, y, z, radius).tolist() == half_spheres
+
+def test_many_balls_at_once(arrays):
+    course, arrays = arrays
+    points = np.array(random_points(50))
+    hits = kernels.star_hits(arrays.stars, points[:, 0], points[:, 1], points[:, 2], 0.1)
+    assert hits.shape == (50, len(arrays.stars))
+    for row, (x, y, z) in zip(hits, points):
+        assert row.tolist() == kernels.star_hits(arrays.stars, x, y, z, 0.1).tolist()
+
+def test_windows_slice_without_losing_items(arrays):
+    course, arrays = arrays
+    window = arrays.blocks[3:9]
+    assert len(window) == 6
+    assert [window.item(i) for i in range(6)] == arrays.blocks.items[3:9]
+    assert window.x.base is not None  # A view, not a copy
+
+def test_hits_in_order_follows_the_level_list(arrays):
+    course, arrays = arrays
+    mask = np.ones(len(arrays.cones), dtype=bool)
+    ordered = [arrays.cones.item(i) for i in kernels.hits_in_order(arrays.cones, mask)]
+    assert ordered == course.cones
+
+def test_window_boxes_never_hide_a_hit(arrays):
+    course, arrays = arrays
+    radius = 0.1
+    reach = radius + simulation.BROADPHASE_MARGIN
+    indexes = {'blocks': course.block_index, 'stairs': course.stair_index, 'stars': course.star_index,
+               'cones': course.cone_index, 'half_spheres': course.half_sphere_index}
+    kernel = {
+        'blocks': lambda window, x, y, z: kernels.block_hits(window, x, y, z),
+        'stairs': lambda window, x, y, z: kernels.stair_contacts(window, x, y, z, radius, True)[0],
+        'stars': lambda window, x, y, z: kernels.star_hits(window, x, y, z, radius),
+        'cones': lambda window, x, y, z: kernels.cone_hits(window, x, y, z, radius),
+        'half_spheres': lambda window, x, y, z: kernels.half_sphere_hits(window, x, y, z, radius),
+    }
+    found = 0
+    for x, y, z in random_points(2000):
+        for name, index in indexes.items():
+            window = getattr(arrays, name).window(*index.window(x - reach, x + reach))
+            if kernels.any_hits(kernel[name](window, x, y, z)):
+                found += 1
+                assert kernels.near(window.box, x, y, reach)
+    assert found > 100
+    assert arrays.blocks.window(5, 5).box == kernels.EMPTY_BOX
+
+def test_windows_are_kept_while_the_broadphase_stays(arrays):
+    course, arrays = arrays
+    window = arrays.stars.window(2, 6)
+    assert arrays.stars.window(2, 6) is window
+    assert arrays.stars.window(3, 6) is not window
+
+@pytest.mark.parametrize('level', sorted(WINNING_RUNS))
+def test_vectorized_runs_match(level):
+    rng = random.Random(level)
+    sequences = [WINNING_RUNS[level][0]] + [[t for t in range(700) if rng.random() < 0.03] for _ in range(40)]
+    for jump_ticks in sequences:
+        assert trace(make_simulation(level, vectorized=True), jump_ticks) == \
+            trace(make_simulation(level), jump_ticks)
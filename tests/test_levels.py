@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+import levels
+import simulation
+
+SOURCE = {
+    'name': 'TINY',
+    'physics': {'gravity': -0.007, 'finish_x': 5},
+    'palette': {'red': [1.0, 0.0, 0.0], 'blue': [0.0, 0.0, 1.0]},
+    'blocks': [[2.0, 0.2, 0.6, 0.2, 'red']],
+    'stairs': [[3.0, 0.1, 0.6, 0.2, 0.2, 0.2, 'blue']],
+    'stars': [],
+    'cones': [[4.0, 1.5, 0.6, 0.1, 0.3, 'red', True]],
+    'half_spheres': [],
+}
+
+@pytest.fixture
+def level_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(levels, 'CACHE_DIR', str(tmp_path / '__pycache__'))
+    filename = tmp_path / 'tiny.json'
+    filename.write_text(json.dumps(SOURCE))
+    return str(filename)
+
+def cache_files():
+    return sorted(os.listdir(levels.CACHE_DIR))
+
+def test_compile_resolves_the_palette():
+    level = levels.compile_level(json.dumps(SOURCE))
+    assert level['blocks'] == [(2.0, 0.2, 0.6, 0.2, (1.0, 0.0, 0.0))]
+    assert level['stairs'][0][-1] == (0.0, 0.0, 1.0)
+    assert level['cones'] == [(4.0, 1.5, 0.6, 0.1, 0.3, (1.0, 0.0, 0.0), True)]
+    assert level['palette']['blue'] == (0.0, 0.0, 1.0)
+
+def test_load_writes_a_versioned_cache_and_reads_it_back(level_file, monkeypatch):
+    first = levels.load(level_file)
+    assert isinstance(first['physics'], simulation.Physics)
+    [name] = cache_files()
+    assert name.startswith('tiny.') and f".v{levels.FORMAT_VERSION}." in name
+
+    def fail(source):
+        raise AssertionError("compiled again")
+    monkeypatch.setattr(levels, 'compile_level', fail)
+    second = levels.load(level_file)
+    assert {key: value for key, value in second.items() if key != 'physics'} == \
+        {key: value for key, value in first.items() if key != 'physics'}
+    assert vars(second['physics']) == vars(first['physics'])
+
+def test_new_format_version_replaces_old_caches(level_file, monkeypatch):
+    levels.load(level_file)
+    monkeypatch.setattr(levels, 'FORMAT_VERSION', levels.FORMAT_VERSION + 1)
+    levels.load(level_file)
+    [name] = cache_files()
+    assert f".v{levels.FORMAT_VERSION}." in name
+
+def test_edited_level_is_compiled_again(level_file):
+    levels.load(level_file)
+    with open(level_file, 'w') as file:
+        json.dump(dict(SOURCE, blocks=[]), file)
+    assert levels.load(level_file)['blocks'] == []
+    assert len(cache_files()) == 1
+
+def test_other_levels_caches_are_kept(level_file):
+    other = os.path.join(os.path.dirname(level_file), 'tiny2.json')
+    with open(other, 'w') as file:
+        json.dump(SOURCE, file)
+    levels.load(other)
+    levels.load(level_file)
+    assert [name.split('.')[0] for name in cache_files()] == ['tiny', 'tiny2']
+
+def test_corrupt_cache_is_rebuilt(level_file):
+    levels.load(level_file)
+    [name] = cache_files()
+    with open(os.path.join(levels.CACHE_DIR, name), 'wb') as file:
+        file.write(b'not marshal data')
+    assert levels.load(level_file)['blocks'] == [(2.0, 0.2, 0.6, 0.2, (1.0, 0.0, 0.0))]
+
+def test_unwritable_cache_still_loads(level_file, monkeypatch):
+    blocker = os.path.join(os.path.dirname(level_file), 'blocker')
+    open(blocker, 'w').close()
+    monkeypatch.setattr(levels, 'CACHE_DIR', os.path.join(blocker, '__pycache__'))  # Under a file
+    assert levels.load(level_file)['blocks'] == [(2.0, 0.2, 0.6, 0.2, (1.0, 0.0, 0.0))]
+
+def test_shipped_levels_load_by_name():
+    assert levels.level_names() == ['LEVEL1', 'LEVEL2', 'LEVEL3']
+    assert levels.LEVEL1 is levels.get('LEVEL1')
+    with pytest.raises(AttributeError):
+        levels.LEVEL9
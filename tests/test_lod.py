@@ -0,0 +1,61 @@
+import math
+
+import pytest
+
+import lod
+
+PRIMITIVES = [('sphere', (0.2, 30, 30)), ('sphere', (0.2, 32, 32)), ('half_sphere', (0.35, 30, 30)),
+              ('cone', (0.25, 0.6, 30, 30)), ('circle', (0.25, 30)), ('torus', (0.09, 0.3, 30, 30)),
+              ('star', (5,))]
+
+def test_segments_stay_within_the_tolerance():
+    for radius_px in (0.5, 3, 10, 40, 100, 400):
+        count = lod.segments(radius_px, 30, 1.0)
+        if count < 30:
+            assert radius_px * (1 - math.cos(math.pi / count)) <= lod.TOLERANCE
+        coarser = [level for level in lod.SEGMENTS if level < count]
+        if coarser:
+            # The next level down would have been too coarse
+            assert radius_px * (1 - math.cos(math.pi / coarser[-1])) > lod.TOLERANCE
+
+def test_segments_never_exceed_the_primitive_and_grow_with_size():
+    counts = [lod.segments(radius_px, 20, 1.0) for radius_px in range(1, 2000, 7)]
+    assert counts == sorted(counts)
+    assert counts[0] == lod.SEGMENTS[0] and counts[-1] == 20
+    assert lod.segments(1e6, 8, 1.0) == 8
+    assert lod.segments(1e6, 5, 1.0) == 5  # Fewer than any level: kept as written
+
+def test_quality_divides_the_tolerance():
+    assert lod.segments(60, 30, 2.0) == lod.segments(120, 30, 1.0)
+    assert lod.segments(60, 30, 0.5) == lod.segments(30, 30, 1.0)
+
+def test_detail_keeps_proportions():
+    detail = lod.LevelOfDetail(height=600)
+    far = detail.detail('sphere', (0.2, 30, 20), 100.0)
+    assert far[0] == 0.2 and far[1] < 30 and far[2] == 20 * far[1] // 30
+    assert detail.detail('sphere', (0.2, 30, 20), 1e-6) == (0.2, 30, 20)
+    assert detail.detail('star', (5,), 100.0) == (5,)
+
+@pytest.mark.parametrize('kind, params', PRIMITIVES)
+@pytest.mark.parametrize('quality', [0.5, 1.0, 2.0])
+def test_levels_hold_every_detail_at_every_size(kind, params, quality):
+    levels = lod.LevelOfDetail(quality, height=600).levels(kind, params)
+    assert levels == sorted(set(levels))
+    for height in (120, 420, 600, 1080, 2160):
+        detail = lod.LevelOfDetail(quality, height=height)
+        # The same levels at any window height, so resizing never needs a new mesh
+        assert detail.levels(kind, params) == levels
+        for step in range(400):
+            distance = 0.01 * 1.03 ** step
+            assert detail.detail(kind, params, distance) in levels
+
+def test_resize_scales_pixels_per_unit():
+    detail = lod.LevelOfDetail(height=300)
+    small = detail.scale
+    detail.resize(600)
+    assert detail.scale == pytest.approx(2 * small)
+
+def test_closest_is_measured_from_the_rail():
+    detail = lod.LevelOfDetail(rail=(9.0, 10.0))
+    assert detail.closest((50.0, 9.0, 10.0)) == 0.0
+    assert detail.closest((0.0, 6.0, 6.0)) == 5.0
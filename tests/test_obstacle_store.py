@@ -0,0 +1,94 @@
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import levels
+from obstacle_store import ObstacleStore, ObstacleTable, ObstacleView, generate_layout
+import simulation
+from test_simulation import WINNING_RUNS, trace
+
+def run_trace(layout, physics, jump_ticks, **options):
+    compact = options.pop('compact', False)
+    sim = simulation.Simulation(simulation.Course(layout, compact=compact), physics, **options)
+    return trace(sim, jump_ticks), simulation.stars_collected(sim.path)
+
+def sequences(seed, count=30):
+    rng = random.Random(seed)
+    return [[t for t in range(700) if rng.random() < 0.03] for _ in range(count)]
+
+@pytest.mark.parametrize('level', sorted(WINNING_RUNS))
+@pytest.mark.parametrize('options', [{}, {'vectorized': True}, {'swept': True}])
+def test_compact_runs_match(level, options):
+    layout = getattr(levels, level)
+    for jump_ticks in [WINNING_RUNS[level][0]] + sequences(level):
+        assert run_trace(layout, layout['physics'], jump_ticks, compact=True, **options) == \
+            run_trace(layout, layout['physics'], jump_ticks, **options)
+
+def test_compact_generated_course_matches():
+    layout = generate_layout(300, seed=3)
+    physics = simulation.Physics(finish_x=60)
+    for jump_ticks in sequences(4, count=20):
+        assert run_trace(layout, physics, jump_ticks, compact=True) == run_trace(layout, physics, jump_ticks)
+
+def test_compact_course_keeps_no_object_per_obstacle():
+    layout = generate_layout(20000)
+    simulation.Course(layout, compact=True)  # Warm up allocator free lists
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    course = simulation.Course(layout, compact=True)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert used / 20000 < 28  # float32 columns: about 26 bytes, against about 200 for objects
+    assert course.blocks is course.store.blocks
+    assert course.arrays.blocks.x is course.store.blocks.columns['x']
+
+def test_geometry_is_float32_only_where_exact():
+    generated = ObstacleStore(generate_layout(500, seed=8))
+    assert all(table.columns['x'].dtype == np.float32 for table in generated.tables())
+    level = ObstacleStore(levels.LEVEL1)
+    assert level.blocks.columns['x'].dtype == np.float64
+    assert [block.x for block in level.blocks] == sorted(row[0] for row in levels.LEVEL1['blocks'])
+
+def test_compact_collisions_make_views_only_for_events(monkeypatch):
+    made = []
+    original = ObstacleTable.__getitem__
+    monkeypatch.setattr(ObstacleTable, '__getitem__', lambda table, row: made.append(row) or original(table, row))
+    layout = levels.LEVEL1
+    sim = simulation.Simulation(simulation.Course(layout, compact=True), layout['physics'])
+    assert sim.run(WINNING_RUNS['LEVEL1'][0]) == simulation.GAME_WON
+    assert 0 < len(made) < sim.ticks / 20  # Only on the ticks the ball touches one of the three stars
+
+def test_rows_are_in_x_order_with_the_level_order_kept():
+    layout = generate_layout(500, seed=5)
+    table = ObstacleStore(layout).cones
+    starts = [table.starts[row] for row in range(len(table))]
+    assert starts == sorted(starts)
+    assert [view.x_extent() for view in table] == [(start, table.ends[row]) for row, start in enumerate(starts)]
+    for view, order in zip(table, table.columns['order']):
+        row = layout['cones'][order]
+        assert (view.x, view.y, view.base_radius, view.is_hanging) == (row[0], row[1], row[3], row[6])
+
+def test_views_read_and_write_the_columns():
+    store = ObstacleStore(generate_layout(50, seed=6))
+    star = store.stars[0]
+    assert isinstance(star.x, float) and star.collected is False
+    star.collected = True
+    assert store.stars.columns['collected'][0]
+    assert store.stars[0] == star and hash(store.stars[0]) == hash(star)
+    assert store.stars[1] != star
+    assert isinstance(star, ObstacleView)
+
+def test_palette_shares_colors():
+    store = ObstacleStore(generate_layout(1000, seed=7))
+    assert len(store.palette.colors) <= 4
+    assert store.blocks[0].color == (1.0, 1.0, 0.5)
+
+def test_reset_clears_collected_stars():
+    layout = levels.LEVEL1
+    sim = simulation.Simulation(simulation.Course(layout, compact=True), layout['physics'])
+    sim.run(WINNING_RUNS['LEVEL1'][0])
+    assert simulation.stars_collected(sim.path) == 3
+    sim.reset()
+    assert simulation.stars_collected(sim.path) == 0
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+import pixmaps
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    # QPixmap needs a GUI application
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i, color in enumerate(('red', 'green', 'blue')):
+        image = QImage(40, 30, QImage.Format_RGB32)
+        image.fill(QColor(color))
+        path = str(tmp_path / f"{i}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+def test_images_and_sizes_are_read_and_scaled_once(images):
+    cache = pixmaps.PixmapCache()
+    full = cache.get(images[0])
+    assert (full.width(), full.height()) == (40, 30)
+    assert cache.get(images[0]) is full
+    small = cache.get(images[0], QSize(20, 10))
+    assert (small.width(), small.height()) == (20, 10)
+    assert cache.get(images[0], QSize(20, 10)) is small
+    assert cache.get(images[0], QSize(10, 10)) is not small
+    assert len(cache.pixmaps) == 3
+    assert cache.used == sum(pixmaps.nbytes(pixmap) for pixmap in cache.pixmaps.values())
+
+def test_least_recently_used_are_dropped_past_the_budget(images):
+    one = pixmaps.nbytes(pixmaps.PixmapCache().get(images[0]))
+    cache = pixmaps.PixmapCache(budget=2 * one)
+    first, second = cache.get(images[0]), cache.get(images[1])
+    cache.get(images[0])  # Now the most recently used
+    cache.get(images[2])
+    assert list(key[0] for key in cache.pixmaps) == [images[0], images[2]]
+    assert cache.used == 2 * one <= cache.budget
+    assert cache.get(images[0]) is first
+    assert cache.get(images[1]) is not second  # Read again
+
+def test_one_pixmap_over_the_budget_is_still_kept(images):
+    cache = pixmaps.PixmapCache(budget=1)
+    pixmap = cache.get(images[0])
+    assert cache.get(images[0]) is pixmap
+    assert len(cache.pixmaps) == 1
+    cache.clear()
+    assert not cache.pixmaps and cache.used == 0
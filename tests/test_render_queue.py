@@ -0,0 +1,54 @@
+import pytest
+
+import render_queue
+
+@pytest.fixture
+def calls(monkeypatch):
+    # Records the GL calls the queue makes instead of making them; lists are copied, as the
+    # queue reuses its list of display lists
+    made = []
+    def record(name):
+        return lambda *args: made.append((name,) + tuple(list(arg) if isinstance(arg, list) else arg
+                                                         for arg in args))
+    for name in ('glEnable', 'glDisable', 'glBindTexture', 'glPolygonOffset', 'glMaterialfv', 'glColor4f',
+                 'glLineWidth', 'glCallList', 'glCallLists'):
+        monkeypatch.setattr(render_queue, name, record(name))
+    return made
+
+def state_calls(made):
+    return [call for call in made if call[0] not in ('glCallList', 'glCallLists')]
+
+def test_sorted_queue_skips_redundant_calls(calls):
+    queue, cache = render_queue.RenderQueue(), render_queue.StateCache()
+    red, blue = (1.0, 0.0, 0.0), (0.0, 0.0, 1.0)
+    submitted = [(render_queue.lit_fill(red), 1), (render_queue.unlit((0, 0, 0), 3.0), 2),
+                 (render_queue.textured(7), 3), (render_queue.lit_fill(blue), 4),
+                 (render_queue.unlit((0, 0, 0), 3.0), 5), (render_queue.textured(7), 6),
+                 (render_queue.lit_fill(red), 7)]
+    for state, draw in submitted:
+        queue.submit(state, draw)
+    queue.flush(cache)
+    made = state_calls(calls)
+    assert cache.per_object == sum(len(render_queue.state_calls(state)) for state, draw in submitted)
+    assert cache.issued == len(made) < cache.per_object
+    # The texture is bound once for both textured draws, and once more to unbind it
+    assert [call for call in made if call[0] == 'glBindTexture'] == \
+        [('glBindTexture', render_queue.GL_TEXTURE_2D, 7), ('glBindTexture', render_queue.GL_TEXTURE_2D, 0)]
+    # Lines are widened once, and each material and color is set once
+    assert len([call for call in made if call[0] == 'glLineWidth']) == 1
+    assert len([call for call in made if call[0] == 'glMaterialfv']) == 2
+    # Draws in the same state go out together, lit fills first
+    assert [call for call in calls if call[0].startswith('glCallList')] == \
+        [('glCallList', 4), ('glCallLists', [1, 7]), ('glCallLists', [2, 5]), ('glCallLists', [3, 6])]
+    assert not queue.items
+
+def test_no_call_repeats_what_is_set(calls):
+    cache = render_queue.StateCache()
+    state = render_queue.unlit((0, 0, 0), 2.0)
+    cache.apply(state)
+    first = len(calls)
+    cache.apply(state)
+    assert len(calls) == first == cache.issued
+    cache.reset()
+    cache.apply(state)
+    assert len(calls) == 2 * first
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+import levels
+import replay
+from test_simulation import WINNING_RUNS, make_simulation
+
+def record(level, jump_ticks):
+    # Play live through a Recorder, pressing jump on the given ticks
+    sim = make_simulation(level)
+    recorder = replay.Recorder(sim, level)
+    jump_ticks = set(jump_ticks)
+    while sim.outcome is None:
+        if sim.ticks in jump_ticks:
+            recorder.jump()
+        sim.step()
+    return recorder.recording()
+
+@pytest.fixture
+def recording():
+    return record('LEVEL1', WINNING_RUNS['LEVEL1'][0])
+
+def test_recording_holds_the_run(recording):
+    jump_ticks, ticks, score = WINNING_RUNS['LEVEL1']
+    assert recording.jump_ticks == jump_ticks
+    assert (recording.ticks, recording.outcome, recording.score) == (ticks, 'game_won', score)
+
+def test_save_load_verify_round_trip(recording, tmp_path):
+    filename = tmp_path / 'run.json'
+    recording.save(filename)
+    loaded = replay.Recording.load(filename)
+    assert vars(loaded) == vars(recording)
+    assert replay.verify(loaded)
+    assert replay.verify(loaded, vectorized=True)
+    assert replay.main([str(filename)]) == 0
+
+def test_verify_catches_a_different_result(recording):
+    recording.score += 10
+    assert not replay.verify(recording)
+
+def test_replayer_steps_like_the_live_run(recording):
+    sim = make_simulation('LEVEL1')
+    replayer = replay.Replayer(recording, sim)
+    while not replayer.finished:
+        replayer.step()
+    assert (sim.ticks, sim.outcome, sim.score, sim.distance_traveled) == recording.result()
+    assert replayer.step() == []
+
+def test_presses_within_a_tick_act_once():
+    sim = make_simulation('LEVEL1')
+    recorder = replay.Recorder(sim, 'LEVEL1')
+    recorder.jump()
+    recorder.jump()
+    sim.step()
+    recorder.jump()
+    assert recorder.jump_ticks == [0, 1]
+
+def test_other_level_version_is_refused(recording):
+    recording.version = '0' * 16
+    with pytest.raises(ValueError):
+        replay.replay(recording)
+    with pytest.raises(ValueError):
+        replay.Replayer(recording, make_simulation('LEVEL1'))
+
+def test_unknown_format_is_refused(recording, tmp_path):
+    filename = tmp_path / 'run.json'
+    recording.save(filename)
+    data = json.loads(filename.read_text())
+    data['format'] = replay.FORMAT_VERSION + 1
+    filename.write_text(json.dumps(data))
+    with pytest.raises(ValueError):
+        replay.Recording.load(filename)
+
+def test_level_version_ignores_assets_but_not_obstacles():
+    layout = dict(levels.LEVEL1)
+    version = replay.level_version(layout)
+    assert replay.level_version(dict(layout, assets={'music': 'other.mp3'})) == version
+    assert replay.level_version(dict(layout, blocks=layout['blocks'][1:])) != version
+
+def test_recordings_are_kept_in_the_game_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    filename = replay.recording_file(levels.LEVEL1['scores']['last_run'])
+    assert os.path.isabs(filename)
+    assert os.path.dirname(filename) == os.path.dirname(levels.LEVEL_DIR)
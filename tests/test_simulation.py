@@ -0,0 +1,83 @@
+import subprocess
+import sys
+
+import pytest
+
+import levels
+import simulation
+
+# Winning jump ticks found by the solver, with the run each produces in the game
+WINNING_RUNS = {
+    'LEVEL1': ([53, 102, 153, 203, 250, 358, 503], 691, 30),
+    'LEVEL2': ([53, 102, 153, 228, 295, 328, 453, 503], 691, 10),
+    'LEVEL3': ([82, 110, 161, 183, 251, 281, 308, 363, 398, 426], 494, 20),
+}
+
+def make_simulation(level, **options):
+    layout = getattr(levels, level)
+    return simulation.Simulation(simulation.Course(layout), layout['physics'], **options)
+
+def trace(sim, jump_ticks, max_ticks=900):
+    # Ball state and events after every tick
+    jump_ticks = set(jump_ticks)
+    states = []
+    while sim.outcome is None and sim.ticks < max_ticks:
+        events = sim.step(sim.ticks in jump_ticks)
+        ball = sim.ball
+        states.append((ball.x, ball.y, ball.jumping, ball.jump_velocity, sim.score,
+                       tuple(kind for kind, obstacle in events)))
+    return states
+
+def test_imports_without_qt_or_opengl():
+    code = "import sys, simulation; print(any(name.startswith(('PyQt5', 'OpenGL')) for name in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=levels.os.path.dirname(simulation.__file__), check=True)
+    assert result.stdout.strip() == 'False'
+
+@pytest.mark.parametrize('level', sorted(WINNING_RUNS))
+def test_winning_run(level):
+    jump_ticks, ticks, score = WINNING_RUNS[level]
+    sim = make_simulation(level)
+    assert sim.run(jump_ticks) == simulation.GAME_WON
+    assert (sim.ticks, sim.score) == (ticks, score)
+    assert simulation.stars_collected(sim.path) * simulation.STAR_POINTS == score
+
+@pytest.mark.parametrize('level', sorted(WINNING_RUNS))
+def test_no_jumps_dies_on_first_obstacle(level):
+    sim = make_simulation(level)
+    assert sim.run() == simulation.GAME_OVER
+    assert sim.ticks < 100
+
+def test_runs_are_deterministic():
+    jump_ticks = WINNING_RUNS['LEVEL2'][0][:4]
+    assert trace(make_simulation('LEVEL2'), jump_ticks) == trace(make_simulation('LEVEL2'), jump_ticks)
+
+def test_reset_replays_the_same_run():
+    jump_ticks = WINNING_RUNS['LEVEL1'][0]
+    sim = make_simulation('LEVEL1')
+    first = trace(sim, jump_ticks)
+    sim.reset()
+    assert simulation.stars_collected(sim.path) == 0
+    assert trace(sim, jump_ticks) == first
+
+def test_snapshot_restore_rewinds():
+    sim = make_simulation('LEVEL1')
+    for tick in range(60):
+        sim.step(tick == 53)
+    state = sim.snapshot()
+    after = trace(sim, [], max_ticks=90)
+    sim.restore(state)
+    assert trace(sim, [], max_ticks=90) == after
+
+def test_finished_simulation_ignores_steps():
+    sim = make_simulation('LEVEL1')
+    sim.run()
+    ticks = sim.ticks
+    assert sim.step(True) == []
+    assert sim.ticks == ticks
+
+def test_physics_replace_follows_gravity():
+    physics = simulation.Physics()
+    heavier = physics.replace(gravity=physics.gravity * 2)
+    assert heavier.fall_velocity == pytest.approx(physics.fall_velocity * 2)
+    assert physics.replace(jump_velocity=0.2).fall_velocity == physics.fall_velocity
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import levels
+import simulation
+import solver
+from test_simulation import make_simulation
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(solver, '_cache', {})
+
+@pytest.mark.parametrize('level', ['LEVEL1', 'LEVEL2', 'LEVEL3'])
+def test_found_sequences_win(level, tmp_path):
+    solution = solver.solve(level, cache_dir=tmp_path)
+    assert solution.reachable
+    sim = make_simulation(level)
+    assert sim.run(solution.jump_ticks) == simulation.GAME_WON
+    assert solution.farthest_x == levels.get(level)['physics'].finish_x
+    assert set(solution.collectable_stars) <= set(range(len(levels.get(level)['stars'])))
+
+def test_solutions_are_cached_on_disk(tmp_path):
+    first = solver.solve('LEVEL1', cache_dir=tmp_path)
+    files = os.listdir(tmp_path)
+    assert files == [f"LEVEL1_{first.version}.v{solver.FORMAT_VERSION}.json"]
+    solver._cache.clear()
+    assert vars(solver.solve('LEVEL1', cache_dir=tmp_path)) == vars(first)
+
+def test_unreachable_level_reports_how_far_it_got(monkeypatch):
+    # A wall too tall to jump over right after the start
+    layout = dict(levels.LEVEL1, blocks=[(3.0, 0.5, 0.6, 2.0, (1.0, 1.0, 1.0))], stairs=[], cones=[],
+                  half_spheres=[])
+    monkeypatch.setattr(levels, 'WALL', layout, raising=False)
+    solution = solver.search('WALL')
+    assert not solution.reachable
+    assert solution.jump_ticks == []
+    assert solution.farthest_x < 3.0
+
+def test_stars_only_count_on_winning_runs(monkeypatch):
+    # The ball rolls through a star, then every branch dies at the wall
+    layout = dict(levels.LEVEL1, blocks=[(5.0, 0.5, 0.6, 2.0, (1.0, 1.0, 1.0))], stairs=[], cones=[],
+                  half_spheres=[], stars=[(2.0, 0.2, 0.6, 0.1, (1.0, 1.0, 0.5))])
+    monkeypatch.setattr(levels, 'WALL', layout, raising=False)
+    sim = simulation.Simulation(simulation.Course(layout), layout['physics'])
+    events = []
+    while sim.outcome is None:
+        events += sim.step(False)
+    assert simulation.STAR_COLLECTED in [kind for kind, obstacle in events]
+    solution = solver.search('WALL')
+    assert not solution.reachable and solution.collectable_stars == []
+
+def test_default_cache_is_next_to_the_levels():
+    assert os.path.isabs(solver.CACHE_DIR)
+    assert os.path.dirname(solver.CACHE_DIR) == levels.CACHE_DIR
@@ -0,0 +1,79 @@
+import pytest
+
+from timestep import TICK_RATE, FixedTimestep, lerp
+
+class Clock:
+    # Time that only moves when the test says so
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def make_timestep(rate=64, max_frame_time=0.25):
+    # 64 Hz keeps every tick and every time used here exact in binary
+    clock = Clock()
+    return FixedTimestep(rate, max_frame_time, clock), clock
+
+def run(timestep, clock, frame_time):
+    clock.now += frame_time
+    steps = []
+    assert timestep.advance(lambda: steps.append(clock.now)) == len(steps)
+    return len(steps)
+
+def test_first_advance_only_starts_the_clock():
+    timestep, clock = make_timestep()
+    assert run(timestep, clock, 5.0) == 0
+    assert timestep.ticks == 0 and timestep.alpha == 0.0
+
+@pytest.mark.parametrize('frame_time, ticks', [(0.0, 0), (1 / 128, 0), (1 / 64, 1), (3 / 64, 3), (5 / 128, 2)])
+def test_ticks_per_advance(frame_time, ticks):
+    timestep, clock = make_timestep()
+    run(timestep, clock, 0.0)
+    assert run(timestep, clock, frame_time) == ticks
+    assert timestep.ticks == ticks
+
+def test_leftover_time_carries_into_the_next_advance():
+    timestep, clock = make_timestep()
+    run(timestep, clock, 0.0)
+    assert [run(timestep, clock, 3 / 128) for _ in range(4)] == [1, 2, 1, 2]
+    assert timestep.ticks == 6 and timestep.accumulator == 0.0
+
+def test_long_frames_are_clamped():
+    timestep, clock = make_timestep(max_frame_time=0.25)
+    run(timestep, clock, 0.0)
+    assert run(timestep, clock, 10.0) == 16  # 0.25 s of ticks, not 10 s
+    assert run(timestep, clock, 1 / 64) == 1  # And nothing of the stall is left over
+
+@pytest.mark.parametrize('frame_time', [0.001, 0.0123, 1 / 60, 0.02, 0.033, 0.1, 0.7])
+def test_alpha_stays_within_a_tick(frame_time):
+    timestep = FixedTimestep(TICK_RATE, clock=Clock())
+    timestep.clock.now = 0.0
+    timestep.advance(lambda: None)
+    for _ in range(50):
+        timestep.clock.now += frame_time
+        timestep.advance(lambda: None)
+        assert 0.0 <= timestep.alpha < 1.0
+
+def test_alpha_is_the_fraction_of_a_tick_left():
+    timestep, clock = make_timestep()
+    run(timestep, clock, 0.0)
+    run(timestep, clock, 5 / 256)
+    assert timestep.alpha == 0.25
+
+def test_reset_drops_pending_time():
+    timestep, clock = make_timestep()
+    run(timestep, clock, 0.0)
+    run(timestep, clock, 3 / 256)
+    timestep.reset()
+    assert timestep.alpha == 0.0
+    # The time since the last advance, e.g. spent paused, is not made up afterwards
+    assert run(timestep, clock, 1.0) == 0
+    assert run(timestep, clock, 1 / 64) == 1
+    assert timestep.ticks == 1
+
+def test_lerp():
+    assert lerp(2.0, 4.0, 0.0) == 2.0
+    assert lerp(2.0, 4.0, 1.0) == 4.0
+    assert lerp(2.0, 4.0, 0.25) == 2.5
+    assert lerp(4.0, 2.0, 0.5) == 3.0
@@ -0,0 +1,136 @@
+import threading
+
+import numpy as np
+
+import video
+
+def test_ring_hands_out_the_newest_due_frame():
+    ring = video.FrameRing(size=4)
+    for index in range(4):
+        assert ring.put(index, f"frame {index}")
+    assert ring.take(-1) is None  # Nothing due yet
+    assert ring.take(2) == "frame 2"  # Frames 0 and 1 are dropped, too late to show
+    assert ring.take(2) is None
+    assert [index for index, frame in ring.frames] == [3]
+    assert ring.take(10) == "frame 3"
+    assert ring.take(10) is None
+
+def test_full_ring_holds_the_decoder_until_a_frame_is_taken():
+    ring = video.FrameRing(size=2)
+    ring.put(0, "a")
+    ring.put(1, "b")
+    done = threading.Event()
+    def decode():
+        ring.put(2, "c")
+        done.set()
+    thread = threading.Thread(target=decode, daemon=True)
+    thread.start()
+    assert not done.wait(0.1)
+    assert ring.take(0) == "a"
+    assert done.wait(5)
+    assert [index for index, frame in ring.frames] == [1, 2]
+    thread.join()
+
+def test_closing_stops_a_waiting_decoder():
+    ring = video.FrameRing(size=1)
+    ring.put(0, "a")
+    result = []
+    thread = threading.Thread(target=lambda: result.append(ring.put(1, "b")), daemon=True)
+    thread.start()
+    ring.close()
+    thread.join(5)
+    assert result == [False]
+    assert not ring.frames and ring.take(10) is None
+    assert not ring.put(2, "c")
+
+class Monotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_clock_counts_frames_only_while_started(monkeypatch):
+    now = Monotonic()
+    monkeypatch.setattr(video.time, 'monotonic', now)
+    clock = video.PlaybackClock(25.0)
+    now.now += 3.0
+    assert clock.index() == 0  # Not started
+    clock.start()
+    now.now += 1.0
+    assert clock.index() == 25
+    clock.stop()
+    now.now += 60.0
+    assert clock.index() == 25  # Stopped time does not count
+    clock.start()
+    now.now += 0.5
+    assert clock.index() == 37
+
+def test_clock_ignores_repeated_start_and_stop(monkeypatch):
+    now = Monotonic()
+    monkeypatch.setattr(video.time, 'monotonic', now)
+    clock = video.PlaybackClock(10.0)
+    clock.start()
+    now.now += 1.0
+    clock.start()  # Does not restart the count
+    now.now += 1.0
+    clock.stop()
+    now.now += 1.0
+    clock.stop()
+    assert clock.index() == 20
+
+def test_clock_interval_is_capped_at_the_display_rate():
+    assert video.PlaybackClock(25.0).interval() == 40
+    assert video.PlaybackClock(video.DISPLAY_RATE).interval() == 16
+    assert video.PlaybackClock(240.0).interval() == 16
+
+def write_clip(path, count, size=(64, 48)):
+    # A clip whose frames are flat grey levels 0, 20, 40, ...
+    writer = video.cv2.VideoWriter(str(path), video.cv2.VideoWriter_fourcc(*'MJPG'), 24.0, size)
+    for i in range(count):
+        writer.write(np.full((size[1], size[0], 3), 20 * i, np.uint8))
+    writer.release()
+    return str(path)
+
+def test_built_cache_plays_from_the_mapping(tmp_path):
+    path = write_clip(tmp_path / 'clip.avi', 5)
+    assert video.open_cache(path) is None  # Not transcoded yet
+    index = video.build_cache(path)
+    assert (index['count'], index['width'], index['height'], index['fps']) == (5, 64, 48, 24.0)
+    cached = video.open_cache(path)
+    assert cached.frames.shape == (5, 48, 64, 3)
+    assert not cached.frames.flags.writeable
+    assert abs(int(cached.take(2)[0, 0, 0]) - 40) <= 3
+    assert cached.take(2) is None  # Already shown
+    assert abs(int(cached.take(6)[0, 0, 0]) - 20) <= 3  # Wraps to frame 1
+
+def test_large_frames_are_scaled_to_fit(tmp_path, monkeypatch):
+    monkeypatch.setattr(video, 'CACHE_SIZE', (32, 32))
+    index = video.build_cache(write_clip(tmp_path / 'clip.avi', 2, size=(64, 48)))
+    assert (index['width'], index['height']) == (32, 24)
+
+def test_changed_video_invalidates_the_cache(tmp_path):
+    path = write_clip(tmp_path / 'clip.avi', 3)
+    video.build_cache(path)
+    write_clip(path, 4)
+    assert video.open_cache(path) is None
+    assert video.build_cache(path)['count'] == 4
+    assert len(video.open_cache(path).frames) == 4
+
+def test_touched_video_is_restamped_without_decoding(tmp_path, monkeypatch):
+    path = write_clip(tmp_path / 'clip.avi', 3)
+    index = video.build_cache(path)
+    stat = video.os.stat(path)
+    video.os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert video.open_cache(path) is None  # Stamp no longer matches
+    monkeypatch.setattr(video.cv2, 'VideoCapture', None)  # Decoding again would fail
+    again = video.build_cache(path)
+    assert again['digest'] == index['digest'] and tuple(again['stamp']) == video.source_stamp(path)
+    assert len(video.open_cache(path).frames) == 3
+
+def test_unreadable_video_is_not_cached(tmp_path):
+    path = tmp_path / 'clip.avi'
+    path.write_bytes(b'not a video')
+    assert video.build_cache(str(path)) is None
+    assert video.open_cache(str(path)) is None
+    assert video.build_cache(str(tmp_path / 'missing.avi')) is None